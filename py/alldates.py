@@ -0,0 +1,99 @@
+from datetime import datetime
+from bitboard import BitBoard
+
+class AllDatesSolver():
+    """
+    This class solves a calendar puzzle for all its dates in a single search
+    The boards of all the dates only differ by the squares left uncovered (one month square,
+    one day square, and for some puzzles one day of the week square), so instead of solving
+    each date board, the board with all squares available is tiled leaving exactly one
+    square of each group of date squares uncovered, and each tiling found is a solution
+    of the date whose squares are the uncovered ones.
+    Its creation requires the Board with all squares available, the list of Piece, and the
+    list of groups of date squares, each group being the list of positions of its squares.
+    solve() has the sides option of PuzzleSolver.solve(), and returns a dictionary giving for
+    each tuple of uncovered square positions (in the order of the groups) the list of its solutions,
+    each solution being encoded as one byte per available square of this date board, giving
+    the number of the piece put on it (the encoding of encoding.encodeSolutions()).
+    The numbers of tries and pieces put are available in the tries and nbPcsPut attributes.
+    """
+    def __init__(self,board,pieces,groups):
+        self._board = board
+        self._pieces = pieces
+        self._groups = groups
+        self.tries = 0
+        self.nbPcsPut = 0
+
+    def solve(self,sides="front",printProgress=True):
+        self._bitboard = BitBoard(self._board,self._pieces,sides)
+        self._printProgress = printProgress
+        self._startTime = datetime.now()
+        # groupOf[square] is the number of the group of the square, or None
+        self._groupOf = [None]*len(self._bitboard.positions)
+        for groupIdx,group in enumerate(self._groups):
+            for pos in group:
+                square = self._bitboard.index.square(pos)
+                if square is None:
+                    raise ValueError("Date square {} is not an available square of the board".format(pos))
+                self._groupOf[square] = groupIdx
+        self._placed = []
+        self._holes = []
+        self._solutions = {}
+        self._solve(0,self._bitboard.allPieces,0)
+        if self._printProgress:
+            print("\n")
+        return self._solutions
+
+    def _solve(self,occupied,remaining,groupsDone):
+        bitboard = self._bitboard
+        if not remaining:
+            self._solutionFound(occupied)
+            return
+        free = bitboard.full & ~occupied
+        if not free:
+            return
+        squareBit = free & -free
+        square = squareBit.bit_length()-1
+        for pieceIdx,masks in enumerate(bitboard.placements[square]):
+            pieceBit = 1 << pieceIdx
+            if remaining & pieceBit:
+                for mask,trans,origin in masks:
+                    self.tries += 1
+                    if not occupied & mask:
+                        self.nbPcsPut += 1
+                        self._placed.append((pieceIdx,mask))
+                        self._solve(occupied | mask,remaining & ~pieceBit,groupsDone)
+                        self._placed.pop()
+        # Leave this square uncovered if it is the first one of its group
+        groupIdx = self._groupOf[square]
+        if groupIdx is not None and not groupsDone & (1 << groupIdx):
+            if self._printProgress and not groupsDone:
+                print("\r{} - {} solutions found for {} dates after {} tries".format(str(datetime.now()-self._startTime)[:-7],sum(len(sols) for sols in self._solutions.values()),len(self._solutions),self.tries),end="",flush=True)
+            self._holes.append((groupIdx,square))
+            self._solve(occupied | squareBit,remaining,groupsDone | (1 << groupIdx))
+            self._holes.pop()
+
+    def _solutionFound(self,occupied):
+        # Squares still free once all pieces are put are the uncovered squares of the groups left
+        bitboard = self._bitboard
+        holes = list(self._holes)
+        free = bitboard.full & ~occupied
+        groupsDone = 0
+        for groupIdx,square in holes:
+            groupsDone |= 1 << groupIdx
+        while free:
+            square = (free & -free).bit_length()-1
+            groupIdx = self._groupOf[square]
+            if groupIdx is None or groupsDone & (1 << groupIdx):
+                return
+            groupsDone |= 1 << groupIdx
+            holes.append((groupIdx,square))
+            free &= free-1
+        if len(holes) != len(self._groups):
+            return
+        pieceOf = [None]*len(bitboard.positions)
+        for pieceIdx,mask in self._placed:
+            for square in bitboard.maskSquares(mask):
+                pieceOf[square] = pieceIdx
+        key = tuple((bitboard.positions[square].x,bitboard.positions[square].y) for groupIdx,square in sorted(holes))
+        self._solutions.setdefault(key,[]).append(bytes(pieceIdx for pieceIdx in pieceOf if pieceIdx is not None))
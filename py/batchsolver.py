@@ -0,0 +1,204 @@
+from datetime import date, timedelta, datetime
+from importlib import import_module
+import multiprocessing as mp
+import os
+import sqlite3
+import argparse
+from puzzle import Board, Coordinate
+from solver import PuzzleSolver
+from alldates import AllDatesSolver
+from encoding import decodeSolutions, writeSolutionFile
+
+# Calendar puzzles which can be solved for all dates: name -> (module providing GenerateBoard(date)
+# and CreatePieces(), strftime format of the date parts shown on the board, strftime formats of
+# the labels GenerateBoard() writes on the date squares)
+PUZZLES = {
+    "poodle": ("poodlepuzzleDailyCalendarSolver","%m/%d %a",("%b","%d","%a")),
+    "dragonFjord": ("dragonFjordDailyCalendarSolver","%m/%d",("%b","%d")),
+    "jarringWords": ("jarringWordsDailyCalendarSolver","%m/%d",("%b","%d")),
+}
+
+# Table of the solutions database, one row per date of a puzzle solved with given sides
+SOLUTIONS_TABLE = "CREATE TABLE IF NOT EXISTS solutions (puzzle TEXT, sides TEXT, date TEXT, nbSolutions INTEGER, tries INTEGER, nbPcsPut INTEGER, solutions BLOB, PRIMARY KEY (puzzle,sides,date))"
+
+def puzzleDates(puzzle):
+    """
+    Return a dictionary of all the different boards of a calendar puzzle, as date key -> a date giving this board
+    Dates of a leap year give the 366 month and day combinations, and a full 28 years cycle
+    of the calendar gives each of them on each day of the week, for puzzles showing it
+    """
+    dateFormat = PUZZLES[puzzle][1]
+    ret = {}
+    day = date(2000,1,1)
+    while day.year < 2028:
+        ret.setdefault(day.strftime(dateFormat),day)
+        day += timedelta(days=1)
+    return ret
+
+def dateGroups(puzzle):
+    """
+    Return the Board of a calendar puzzle with all its date squares available, and the list of
+    the groups of date squares (months, days, days of the week) as lists of positions
+    """
+    module = import_module(PUZZLES[puzzle][0])
+    labelFormats = PUZZLES[puzzle][2]
+    groups = [{} for labelFormat in labelFormats]
+    board = None
+    for day in puzzleDates(puzzle).values():
+        dayBoard = module.GenerateBoard(day)
+        labelled = dayBoard.labelledPositions()
+        if board is None:
+            board = Board(dayBoard)
+            board.clearSquares(Coordinate(0,0),[pos for pos,label in labelled])
+        for pos,label in labelled:
+            for groupIdx,labelFormat in enumerate(labelFormats):
+                if label == day.strftime(labelFormat):
+                    groups[groupIdx][(pos.x,pos.y)] = pos
+    return board,[list(group.values()) for group in groups]
+
+def solveAllDates(puzzle,sides,printProgress=True):
+    """
+    Solve all the dates of a calendar puzzle at once with an AllDatesSolver, and return
+    a dictionary giving for each date key its solutions encoded by encodeSolutions()
+    """
+    module = import_module(PUZZLES[puzzle][0])
+    labelFormats = PUZZLES[puzzle][2]
+    board,groups = dateGroups(puzzle)
+    solutions = AllDatesSolver(board,module.CreatePieces(),groups).solve(sides,printProgress)
+    ret = {}
+    for key,day in puzzleDates(puzzle).items():
+        labels = {label:(pos.x,pos.y) for pos,label in module.GenerateBoard(day).labelledPositions()}
+        holes = tuple(labels[day.strftime(labelFormat)] for labelFormat in labelFormats)
+        ret[key] = solutions.get(holes,[])
+    return ret
+
+def solveDate(puzzle,key,day,sides,prune,cacheDir=None):
+    """
+    Solve one date of a puzzle with the bitboard engine, and return its key with the results,
+    the solutions being encoded by encodeSolutions()
+    With cacheDir set, the compiled puzzle of the date is read from this directory (see CompiledBitBoard)
+    """
+    module = import_module(PUZZLES[puzzle][0])
+    solver = PuzzleSolver(module.GenerateBoard(day),module.CreatePieces())
+    solutions = list(solver.iterSolutions(sides=sides,prune=prune,cacheDir=cacheDir))
+    return key,len(solutions),solver.tries,solver.nbPcsPut,b"".join(solutions)
+
+def _solveDate(args):
+    return solveDate(*args)
+
+class BatchSolver():
+    """
+    This class solves a calendar puzzle of PUZZLES for all its dates, and stores the results
+    in a SQLite database, one row per date written as soon as the date is solved
+    Its creation requires the puzzle name and the database file name, and the following options:
+    - sides : "front" by default, "back" or "both", as in PuzzleSolver.solve()
+    - prune : False by default, set to True to use dead regions pruning, as in PuzzleSolver.solve()
+    - cacheDir : None by default, a directory in which the compiled puzzle of each date is kept, so that
+                 the next runs read it instead of computing the placements again, see PuzzleSolver.solve()
+    The run() method solves on a pool of nbProcesses processes (the number of CPU cores by default)
+    all the dates not already in the database, so an interrupted run resumes where it stopped.
+    With its shared option, all dates are instead solved by a single search with AllDatesSolver,
+    which is faster than solving each date, but can't be resumed, and doesn't count tries per date.
+    Results are read back with count() and solutions(), and export() writes them to a solutions file
+    (see encoding.SolutionFile) giving a fast random access to the solutions of any date.
+    """
+    def __init__(self,puzzle,database,sides="front",prune=False,cacheDir=None):
+        if puzzle not in PUZZLES:
+            raise ValueError("Unknown puzzle '{}'".format(puzzle))
+        self._puzzle = puzzle
+        self._sides = sides
+        self._prune = prune
+        self._cacheDir = cacheDir
+        self._db = sqlite3.connect(database)
+        self._db.execute(SOLUTIONS_TABLE)
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def doneDates(self):
+        """
+        Return the set of date keys already solved in the database
+        """
+        rows = self._db.execute("SELECT date FROM solutions WHERE puzzle=? AND sides=?",(self._puzzle,self._sides))
+        return set(row[0] for row in rows)
+
+    def run(self,nbProcesses=None,dates=None,verbose=True,shared=False):
+        """
+        Solve all the dates not already in the database, or only the ones of the dates list if given,
+        and return the number of dates solved by this call
+        """
+        allDates = puzzleDates(self._puzzle)
+        if dates is not None:
+            dateFormat = PUZZLES[self._puzzle][1]
+            allDates = {day.strftime(dateFormat):day for day in dates}
+        done = self.doneDates()
+        todo = [(self._puzzle,key,day,self._sides,self._prune,self._cacheDir) for key,day in allDates.items() if key not in done]
+        if verbose:
+            print("{} dates to solve, {} already solved".format(len(todo),len(allDates)-len(todo)))
+        if not todo:
+            return 0
+        if shared:
+            solutions = solveAllDates(self._puzzle,self._sides,verbose)
+            for puzzle,key,day,sides,prune,cacheDir in todo:
+                self._db.execute("INSERT OR REPLACE INTO solutions VALUES (?,?,?,?,?,?,?)",(self._puzzle,self._sides,key,len(solutions[key]),None,None,b"".join(solutions[key])))
+            self._db.commit()
+            return len(todo)
+        if nbProcesses is None:
+            nbProcesses = os.cpu_count() or 1
+        startTime = datetime.now()
+        nbDone = 0
+        with mp.Pool(min(nbProcesses,len(todo))) as pool:
+            for key,nbSol,tries,nbPcsPut,data in pool.imap_unordered(_solveDate,todo):
+                self._db.execute("INSERT OR REPLACE INTO solutions VALUES (?,?,?,?,?,?,?)",(self._puzzle,self._sides,key,nbSol,tries,nbPcsPut,data))
+                self._db.commit()
+                nbDone += 1
+                if verbose:
+                    print("{} - {}/{} - {} solutions found for {}".format(str(datetime.now()-startTime)[:-7],nbDone,len(todo),nbSol,key),flush=True)
+        return nbDone
+
+    def count(self,day):
+        """
+        Return the number of solutions stored for the date day, or None if it has not been solved
+        """
+        row = self._db.execute("SELECT nbSolutions FROM solutions WHERE puzzle=? AND sides=? AND date=?",(self._puzzle,self._sides,day.strftime(PUZZLES[self._puzzle][1]))).fetchone()
+        return None if row is None else row[0]
+
+    def solutions(self,day):
+        """
+        Return the list of Board of the solutions stored for the date day, or None if it has not been solved
+        """
+        row = self._db.execute("SELECT solutions FROM solutions WHERE puzzle=? AND sides=? AND date=?",(self._puzzle,self._sides,day.strftime(PUZZLES[self._puzzle][1]))).fetchone()
+        if row is None:
+            return None
+        module = import_module(PUZZLES[self._puzzle][0])
+        return decodeSolutions(module.GenerateBoard(day),module.CreatePieces(),row[0])
+
+    def export(self,path):
+        """
+        Write all the solutions of the database to a solutions file read by encoding.SolutionFile,
+        with the date keys as keys, and return the number of dates written
+        """
+        module = import_module(PUZZLES[self._puzzle][0])
+        size = len(module.GenerateBoard(date(2000,1,1)).availablePositions())
+        rows = self._db.execute("SELECT date,solutions FROM solutions WHERE puzzle=? AND sides=?",(self._puzzle,self._sides))
+        solutions = {key:data for key,data in rows}
+        writeSolutionFile(path,solutions,size)
+        return len(solutions)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a calendar puzzle for all dates, storing the solutions in a SQLite database")
+    parser.add_argument("puzzle",choices=sorted(PUZZLES))
+    parser.add_argument("database",help="SQLite database file, created if needed, and completed if it already exists")
+    parser.add_argument("--sides",default="front",choices=["front","back","both"])
+    parser.add_argument("--prune",action="store_true",help="use dead regions pruning")
+    parser.add_argument("--processes",type=int,default=None,help="number of processes, number of CPU cores by default")
+    parser.add_argument("--shared",action="store_true",help="solve all dates in a single search")
+    parser.add_argument("--export",metavar="FILE",help="write all the solutions to a solutions file once solved")
+    parser.add_argument("--cache-dir",help="directory keeping the compiled puzzle of each date for the next runs")
+    args = parser.parse_args()
+    solver = BatchSolver(args.puzzle,args.database,args.sides,args.prune,args.cache_dir)
+    solver.run(args.processes,shared=args.shared)
+    if args.export:
+        print("{} dates written to {}".format(solver.export(args.export),args.export))
+    solver.close()
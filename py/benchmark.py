@@ -0,0 +1,199 @@
+from datetime import date, datetime
+from importlib import import_module
+from time import perf_counter
+import multiprocessing as mp
+import argparse
+import json
+import os
+import platform
+import sys
+try:
+    import resource
+except ImportError:
+    resource = None
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+from dlxsolver import DLXPuzzleSolver
+from batchsolver import PUZZLES
+
+# Dates solved for each calendar puzzle, all having solutions
+DATES = (date(2024,1,1),date(2024,7,14),date(2025,2,28))
+# Puzzles of the benchmark: name -> sides used to solve it
+SIDES = {"poodle":"front","dragonFjord":"both","jarringWords":"both","hema":"front"}
+# Solvers and modes benchmarked: (solver,mode)
+# - "puzzle" is PuzzleSolver with the bitboard engine, "board" PuzzleSolver with the board engine,
+#   "multi" MultiThreadPuzzleSolver with the bitboard engine on 2 processes, and "dlx" DLXPuzzleSolver
+# - "first" looks for the first solution, "all" for all solutions, and "count" only counts them
+# The board engine is too slow to find all solutions in a benchmark
+BENCHMARKS = (("puzzle","first"),("puzzle","all"),("puzzle","count"),("board","first"),("multi","all"),("dlx","first"),("dlx","all"))
+# Measures compared with the baseline, the higher the worse
+MEASURES = ("time","tries","peakMemoryKB")
+# Cases run in spawned processes, which don't start with the memory of the benchmark process
+_SPAWN = mp.get_context("spawn")
+
+def benchmarkCases(puzzles=None,solvers=None,modes=None):
+    """
+    Return the list of benchmark cases, as dictionaries giving the puzzle, date (None for HEMA),
+    sides, solver and mode, of the puzzles, solvers and modes given (all of them by default)
+    """
+    cases = []
+    for puzzle,sides in SIDES.items():
+        if puzzles is not None and puzzle not in puzzles:
+            continue
+        for day in ((None,) if puzzle == "hema" else DATES):
+            for solver,mode in BENCHMARKS:
+                if (solvers is None or solver in solvers) and (modes is None or mode in modes):
+                    cases.append({"puzzle":puzzle,"date":None if day is None else day.isoformat(),"sides":sides,"solver":solver,"mode":mode})
+    return cases
+
+def caseName(case):
+    return "{} {} {} {}".format(case["puzzle"],case["date"] or "-",case["solver"],case["mode"])
+
+def _puzzle(case):
+    """
+    Return the Board and pieces list of the puzzle of a benchmark case
+    """
+    if case["puzzle"] == "hema":
+        module = import_module("hemapuzzleSolver")
+        return module.GenerateHemaBoard(),module.CreateHemaPieces()
+    module = import_module(PUZZLES[case["puzzle"]][0])
+    return module.GenerateBoard(date.fromisoformat(case["date"])),module.CreatePieces()
+
+def _peakMemoryKB():
+    """
+    Return the peak resident memory in kB of this process and of its ended children, None if unknown
+    These are high-water marks over the whole life of the processes, so runCase() measures each run in
+    a new spawned process, whose peak is then the one of its run and of the processes it started
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in bytes on macOS, and in kB elsewhere
+    unit = 1024 if sys.platform == "darwin" else 1
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss//unit
+    try:
+        # On Linux, ru_maxrss keeps the peak of the process which started this one, even once it executed
+        # a new program, but VmHWM is the peak of the memory of this program only
+        with open("/proc/self/status") as status:
+            peak = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+    except (OSError,StopIteration):
+        pass
+    return max(peak,resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss//unit)
+
+def _runCase(case,pipe):
+    # The solvers and their processes print their progress, which would be mixed with the benchmark report
+    sys.stdout.flush()
+    os.dup2(os.open(os.devnull,os.O_WRONLY),sys.stdout.fileno())
+    board,pieces = _puzzle(case)
+    findAll = case["mode"] == "all"
+    sides = case["sides"]
+    startTime = perf_counter()
+    if case["solver"] == "dlx":
+        solutions,tries,nbPcsPut = DLXPuzzleSolver(board,pieces).solve(findAll,False,sides)
+        nbSolutions = len(solutions)
+    elif case["solver"] == "multi":
+        solutions,tries,nbPcsPut = MultiThreadPuzzleSolver(board,pieces).solve(findAll,False,sides,"bitboard",True,nbProcesses=2)
+        nbSolutions = len(solutions)
+    elif case["mode"] == "count":
+        nbSolutions,tries,nbPcsPut = PuzzleSolver(board,pieces).count(sides,True)
+    else:
+        engine = "board" if case["solver"] == "board" else "bitboard"
+        solutions,tries,nbPcsPut = PuzzleSolver(board,pieces).solve(findAll,False,sides,engine,True)
+        nbSolutions = len(solutions)
+    elapsed = perf_counter()-startTime
+    pipe.send({"solutions":nbSolutions,"time":elapsed,"tries":tries,"nbPcsPut":nbPcsPut,"triesPerSecond":tries/elapsed if elapsed else None,"peakMemoryKB":_peakMemoryKB()})
+    pipe.close()
+
+def runCase(case,repeat=1):
+    """
+    Run a benchmark case repeat times, each time in a new spawned process so that its peak memory is its own
+    and not the one of this process, which a forked process would start with,
+    and return its results: the case, its name, the number of solutions, the best time (in seconds),
+    the tries, pieces put and tries per second of the run with the best time, and the highest peak memory
+    """
+    ret = None
+    peaks = []
+    for run in range(repeat):
+        parentPipe,childPipe = _SPAWN.Pipe(duplex=False)
+        # The multi solver starts its own processes, which a daemon process can't
+        proc = _SPAWN.Process(target=_runCase,args=(case,childPipe))
+        proc.start()
+        childPipe.close()
+        result = parentPipe.recv()
+        proc.join()
+        if result["peakMemoryKB"] is not None:
+            peaks.append(result["peakMemoryKB"])
+        if ret is None or result["time"] < ret["time"]:
+            ret = dict(case,name=caseName(case),**result)
+    ret["peakMemoryKB"] = max(peaks) if peaks else None
+    return ret
+
+def runBenchmarks(cases,repeat=1,verbose=True):
+    """
+    Run the benchmark cases, and return the results file content, as a dictionary giving the
+    date and platform of the run, and the list of the results of each case
+    """
+    results = []
+    for case in cases:
+        result = runCase(case,repeat)
+        results.append(result)
+        if verbose:
+            print("{:<40} {:>6} sol. {:>8.3f} s {:>10} tries {:>10.0f} tries/s {:>8} kB".format(result["name"],result["solutions"],result["time"],result["tries"],result["triesPerSecond"] or 0,result["peakMemoryKB"] or "-"),flush=True)
+    return {"date":datetime.now().isoformat(timespec="seconds"),"python":platform.python_version(),"platform":platform.platform(),"repeat":repeat,"results":results}
+
+def writeResults(path,results):
+    with open(path,"w") as resultsFile:
+        json.dump(results,resultsFile,indent=1)
+
+def readResults(path):
+    with open(path) as resultsFile:
+        return json.load(resultsFile)
+
+def compareResults(results,baseline,threshold=0.2,minTime=0.1):
+    """
+    Compare the results of runBenchmarks() with the ones of a baseline run, and return the list of the
+    regressions, as dictionaries giving the case name, the measure (time, tries or peakMemoryKB), its
+    baseline and new values, and their ratio, for the measures more than threshold (0.2 = 20%) higher than
+    in the baseline. A case which finds a different number of solutions is a regression of "solutions".
+    Times shorter than minTime seconds in the baseline are too noisy to be compared, and cases missing
+    from the baseline are not compared.
+    """
+    baselineResults = {result["name"]:result for result in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        previous = baselineResults.get(result["name"])
+        if previous is None:
+            continue
+        if result["solutions"] != previous["solutions"]:
+            regressions.append({"name":result["name"],"measure":"solutions","baseline":previous["solutions"],"value":result["solutions"],"ratio":None})
+        for measure in MEASURES:
+            if result.get(measure) is None or not previous.get(measure) or (measure == "time" and previous[measure] < minTime):
+                continue
+            ratio = result[measure]/previous[measure]
+            if ratio > 1+threshold:
+                regressions.append({"name":result["name"],"measure":measure,"baseline":previous[measure],"value":result[measure],"ratio":ratio})
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the solvers on the bundled puzzles, and compare the results with a baseline")
+    parser.add_argument("--puzzles",nargs="+",choices=list(SIDES),help="puzzles to benchmark, all by default")
+    parser.add_argument("--solvers",nargs="+",choices=sorted(set(solver for solver,mode in BENCHMARKS)),help="solvers to benchmark, all by default")
+    parser.add_argument("--modes",nargs="+",choices=sorted(set(mode for solver,mode in BENCHMARKS)),help="modes to benchmark, all by default")
+    parser.add_argument("--repeat",type=int,default=1,help="number of runs of each case, the best time being kept")
+    parser.add_argument("--output",default="benchmark_results.json",help="results file written, benchmark_results.json by default")
+    parser.add_argument("--baseline",help="results file of a previous run to compare with")
+    parser.add_argument("--threshold",type=float,default=0.2,help="increase of a measure over the baseline reported as a regression, 0.2 (20%%) by default")
+    parser.add_argument("--min-time",type=float,default=0.1,help="baseline time in seconds under which times are not compared, 0.1 by default")
+    args = parser.parse_args()
+    results = runBenchmarks(benchmarkCases(args.puzzles,args.solvers,args.modes),args.repeat)
+    writeResults(args.output,results)
+    print("Results written to {}".format(args.output))
+    if args.baseline:
+        regressions = compareResults(results,readResults(args.baseline),args.threshold,args.min_time)
+        for regression in regressions:
+            if regression["ratio"] is None:
+                print("REGRESSION {}: {} solutions instead of {}".format(regression["name"],regression["value"],regression["baseline"]))
+            else:
+                print("REGRESSION {}: {} {:.4g} instead of {:.4g} (+{:.0%})".format(regression["name"],regression["measure"],regression["value"],regression["baseline"],regression["ratio"]-1))
+        print("{} regressions over the {:.0%} threshold compared with {}".format(len(regressions),args.threshold,args.baseline))
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,594 @@
+from datetime import datetime
+from time import monotonic
+from puzzle import Coordinate
+from placement import PlacementIndex
+from pruning import RegionPruner
+from symmetry import BoardSymmetry
+from encoding import EMPTY
+from checkpoint import fingerprint
+
+def runEnds(candidates):
+    """
+    Return for each (pieceIdx,pieceBit,mask) of candidates the number of the first next one of another piece,
+    so that the search skips at once the placements of a piece already put
+    """
+    ret = [len(candidates)]*len(candidates)
+    for idx in range(len(candidates)-2,-1,-1):
+        ret[idx] = ret[idx+1] if candidates[idx][0] == candidates[idx+1][0] else idx+1
+    return ret
+
+def neighbourMask(index,pos):
+    """
+    Return the mask of the squares of index (a PlacementIndex) next to pos
+    """
+    mask = 0
+    for x,y in ((pos.x+1,pos.y),(pos.x-1,pos.y),(pos.x,pos.y+1),(pos.x,pos.y-1)):
+        square = index.square(Coordinate(x,y))
+        if square is not None:
+            mask |= 1 << square
+    return mask
+
+class BitBoard():
+    """
+    This class is a compact representation of a Board and of the Piece list to put on it
+    Each available square of the board is numbered, in the order Board.nextAvailablePos()
+    runs through them (line by line from the top left corner), and a board occupation is
+    then a single integer in which bit number n is set when square number n is filled.
+    Every way to put every piece on every square is taken once from a PlacementIndex as an
+    integer mask when the BitBoard is created, so trying to put a piece during the solving
+    is a single AND between the board occupation and the piece mask, and putting it a single OR.
+    The Board used to build the BitBoard is kept to print the solutions.
+    With the symmetry option set to "classes" or "all", the placements of one piece are restricted
+    so that solutions which are the same once the board is rotated or flipped are searched only once
+    (see BoardSymmetry): the search then finds one solution per class with "classes", and all of them,
+    by moving each solution found with the board symmetries, with "all".
+    The placements are taken from index if given, e.g. a CompiledPuzzle, instead of a new PlacementIndex.
+    """
+    def __init__(self,board,pieces,sides="front",symmetry=None,index=None):
+        self.board = board
+        self.pieces = pieces
+        self.sides = sides
+        self.index = index if index is not None else PlacementIndex(board,pieces,sides)
+        self.positions = self.index.positions
+        self.full = (1 << len(self.positions))-1
+        self.allPieces = (1 << len(pieces))-1
+        self.symmetry = None
+        self.expandSymmetry = symmetry == "all"
+        if symmetry in ("classes","all"):
+            self.symmetry = BoardSymmetry(self.index,sides)
+        elif symmetry is not None:
+            raise ValueError("Unknown symmetry option '{}'".format(symmetry))
+        # neighbours[square] is the mask of the squares next to square
+        # placements[square][pieceIdx] is the list of (mask,trans,origin) putting the piece on square
+        # candidates[square] is the list of (pieceIdx,pieceBit,mask) of placements, in the order of the search
+        self.neighbours,self.placements,self.candidates,self.candidateEnds = self._tables()
+
+    def _tables(self):
+        """
+        Return the neighbours, placements, candidates and candidateEnds tables, built from index
+        (CompiledBitBoard reads them from its compiled file)
+        """
+        neighbours = [neighbourMask(self.index,pos) for pos in self.positions]
+        placements = [[[(placement.mask,placement.trans,placement.origin) for placement in placements] for placements in square] for square in self.index.anchored]
+        if self.symmetry is not None:
+            placements = self.symmetry.restrict(placements)
+        candidates = [[(pieceIdx,1 << pieceIdx,mask) for pieceIdx,masks in enumerate(square) for mask,trans,origin in masks] for square in placements]
+        return neighbours,placements,candidates,[runEnds(squareCandidates) for squareCandidates in candidates]
+
+    def firstSquare(self,occupied):
+        """
+        Return the number of the first available square, -1 if the board is full
+        """
+        free = self.full & ~occupied
+        return (free & -free).bit_length()-1
+
+    def regionSizes(self,occupied):
+        """
+        Return the sizes of all the regions of available squares connected by their sides
+        """
+        neighbours = self.neighbours
+        free = self.full & ~occupied
+        sizes = []
+        while free:
+            region = free & -free
+            grown = region
+            while grown:
+                around = 0
+                while grown:
+                    bit = grown & -grown
+                    around |= neighbours[bit.bit_length()-1]
+                    grown ^= bit
+                grown = around & free & ~region
+                region |= grown
+            sizes.append(bin(region).count("1"))
+            free &= ~region
+        return sizes
+
+    def maskSquares(self,mask):
+        """
+        Return the list of the numbers of the squares set in mask
+        """
+        ret = []
+        while mask:
+            ret.append((mask & -mask).bit_length()-1)
+            mask &= mask-1
+        return ret
+
+    def maskPositions(self,mask):
+        """
+        Return the list of the board positions of the squares set in mask
+        """
+        return [self.positions[square] for square in self.maskSquares(mask)]
+
+    def encode(self,placed):
+        """
+        Return the solution made of the (pieceIdx,mask) of placed as one byte per square, giving the
+        number of the piece put on it, or EMPTY (as encoding.encodeSolutions())
+        """
+        ret = bytearray([EMPTY]*len(self.positions))
+        for pieceIdx,mask in placed:
+            for square in self.maskSquares(mask):
+                ret[square] = pieceIdx
+        return bytes(ret)
+
+    def decode(self,data):
+        """
+        Return the Board of a solution encoded by encode()
+        """
+        return self.toBoard(self.decodePlaced(data))
+
+    def decodePlaced(self,data):
+        """
+        Return the list of (pieceIdx,mask) of the pieces of a solution encoded by encode()
+        """
+        masks = {}
+        for square,pieceIdx in enumerate(data):
+            if pieceIdx != EMPTY:
+                masks[pieceIdx] = masks.get(pieceIdx,0) | (1 << square)
+        return list(masks.items())
+
+    def toBoard(self,placed):
+        """
+        Return the Board with all the (pieceIdx,mask) of placed put on it
+        """
+        board = self.board
+        for pieceIdx,mask in placed:
+            board = board.putSquares(self.pieces[pieceIdx].name,self.maskPositions(mask))
+        return board
+
+class BitBoardSearch():
+    """
+    This class is the puzzle solving algorithm of PuzzleSolver and MultiThreadPuzzleSolver
+    working on a BitBoard: it looks for the first available square of the board,
+    tries to put all remaining pieces on it, and recursively solves the resulting board.
+    The remaining pieces are a mask of piece numbers and the board occupation an integer,
+    so the recursion does not allocate anything until a solution is found.
+    The options are the ones of PuzzleSolver.solve(), and the counters (tries, nbPcsPut)
+    and found solutions (list of Board) are available as attributes once solve() returned.
+    stopCheck can be set to a function called every checkInterval tries, which returns
+    True when the search shall be stopped (at the first check when solve() is called).
+    With prune set to True, boards with holes that the remaining pieces can't fill are
+    given up as soon as they appear (see RegionPruner), which counts them in pruner.prunes.
+    memo can be set to a TranspositionCache, in which solve() and iterSolve() record the boards from which no
+    solution can be found, to give them up at once when they are found again. It is bound to the fingerprint
+    of the BitBoard, so that it can't be used by the search of another puzzle (see TranspositionCache.bind()).
+    count() only counts the solutions, without building nor printing them, and records in memo the
+    number of solutions from each board, so that it is reused when the board is found again.
+    checkpoint can be set to a function called by iterSolve() every checkInterval tries with the search
+    frontier, the numbers of tries and pieces put, and True when the search is stopped, from which
+    iterSolve() can resume the search (see Checkpoint): the solutions yielded before are not found again.
+    solve(), count() and iterSolve() all run the same steps on each board: _frame() lists the candidates
+    to try on it, and _next() gives each one which fits in turn, counting the tries and pieces put, running
+    the checks and the pruner. The other searches only override these steps, e.g. _candidates() to choose
+    the square to fill, so that all the options are available with all of them.
+    """
+    def __init__(self,bitboard,findAll=False,printSol=True,startTime=None,name=None,prune=False,checkInterval=1024):
+        self.bitboard = bitboard
+        self.findAll = findAll
+        self.printSol = printSol
+        self.startTime = startTime if startTime is not None else datetime.now()
+        self.name = name
+        self.tries = 0
+        self.nbPcsPut = 0
+        self.solutions = []
+        self.stop = False
+        self.stopCheck = None
+        self.checkInterval = checkInterval
+        self._nextCheck = 0
+        self.pruner = None
+        if prune and RegionPruner.isRelevant(bitboard.pieces,len(bitboard.positions)):
+            self.pruner = RegionPruner(bitboard.pieces)
+        self.memo = None
+        self._boundMemo = None
+        self._fingerprint = None
+        self.checkpoint = None
+        self._stack = None
+        self._nbFound = 0
+        self._placed = []
+        self._classes = set()
+
+    def solve(self,prefix=()):
+        """
+        Run the search on the empty board, or only on the part of the search tree starting
+        with the pieces put by prefix, as returned by prefixes()
+        """
+        self._bindMemo()
+        occupied,remaining = self._putPrefix(prefix)
+        self._solve(occupied,remaining)
+        del self._placed[:]
+        return self.solutions
+
+    def count(self,prefix=()):
+        """
+        Return the number of solutions of the search tree, or of its part starting with prefix
+        The BitBoard shall not have the symmetry option, as only the solutions found are counted
+        """
+        self._bindMemo()
+        occupied,remaining = self._putPrefix(prefix)
+        ret = self._count(occupied,remaining)
+        del self._placed[:]
+        return ret
+
+    def _bindMemo(self):
+        """
+        Bind memo to the fingerprint of the BitBoard: the boards it records depend on its squares, pieces
+        order and placements, sides and symmetry option, but not on the search nor its pruning
+        """
+        if self.memo is not None and self.memo is not self._boundMemo:
+            if self._fingerprint is None:
+                self._fingerprint = fingerprint(self.bitboard)
+            self.memo.bind(self._fingerprint)
+            self._boundMemo = self.memo
+
+    def _frame(self,occupied,remaining):
+        """
+        Return the state of the search on the board with the occupied squares and the remaining pieces, as the
+        list [occupied,remaining,candidates,their runEnds(),number of the next candidate to try,solutions found
+        before it], or None if no piece can be put on it
+        """
+        candidates = self._candidates(occupied,remaining)
+        if candidates is None:
+            return None
+        return [occupied,remaining,candidates[0],candidates[1],0,self._nbFound]
+
+    def _candidates(self,occupied,remaining):
+        """
+        Return the list of (pieceIdx,pieceBit,mask) of the placements to try on the board, in the order of
+        the search, and its runEnds(): the ones anchored on its first available square, or None if the board is full
+        """
+        free = self.bitboard.full & ~occupied
+        if not free:
+            return None
+        square = (free & -free).bit_length()-1
+        return self.bitboard.candidates[square],self.bitboard.candidateEnds[square]
+
+    def _next(self,frame):
+        """
+        Return the next candidate of frame (see _frame()) which fits on its board and is not pruned, as
+        (pieceIdx,pieceBit,mask), or None once all of them are tried or the search is stopped
+        Each candidate of a remaining piece is a try, and _check() is called every checkInterval tries
+        """
+        occupied,remaining,candidates,ends,idx = frame[0],frame[1],frame[2],frame[3],frame[4]
+        pruner = self.pruner
+        nbCandidates = len(candidates)
+        while idx < nbCandidates:
+            candidate = candidates[idx]
+            pieceIdx,pieceBit,mask = candidate
+            if not remaining & pieceBit:
+                idx = ends[idx]
+                continue
+            idx += 1
+            if self.stop:
+                break
+            self.tries += 1
+            if self.tries >= self._nextCheck:
+                self._nextCheck = self.tries+self.checkInterval
+                frame[4] = idx
+                if self._check():
+                    self.stop = True
+                    break
+            if occupied & mask:
+                continue
+            self.nbPcsPut += 1
+            if pruner is not None and pruner.isDead(self.bitboard.regionSizes(occupied | mask),remaining & ~pieceBit):
+                continue
+            frame[4] = idx
+            return candidate
+        frame[4] = idx
+        return None
+
+    def _check(self):
+        """
+        Return True when the search shall be stopped, called every checkInterval tries
+        Within iterSolve(), the frontier of the search is given to checkpoint, in which the current
+        candidate is counted, but not tried yet
+        """
+        stop = self.stopCheck is not None and self.stopCheck()
+        if self.checkpoint is not None and self._stack is not None:
+            stack = self._stack
+            self.checkpoint([frame[4] for frame in stack[:-1]]+[stack[-1][4]-1],self.tries-1,self.nbPcsPut,stop)
+        return stop
+
+    def _move(self,occupied,remaining,pieceIdx,mask):
+        """
+        Return the move putting the piece on mask on the board, as the (pieceIdx,placementIdx) of prefixes()
+        """
+        masks = self.bitboard.placements[self.bitboard.firstSquare(occupied)][pieceIdx]
+        return (pieceIdx,[placement[0] for placement in masks].index(mask))
+
+    def _solve(self,occupied,remaining):
+        if not remaining:
+            self._solutionFound()
+            return
+        memo = self.memo
+        if memo is not None and memo.get(occupied,remaining) == 0:
+            return
+        nbFound = self._nbFound
+        frame = self._frame(occupied,remaining)
+        if frame is not None:
+            placed = self._placed
+            candidate = self._next(frame)
+            while candidate is not None:
+                pieceIdx,pieceBit,mask = candidate
+                placed.append((pieceIdx,mask))
+                self._solve(occupied | mask,remaining & ~pieceBit)
+                placed.pop()
+                candidate = self._next(frame)
+        # Only the boards fully searched are recorded
+        if memo is not None and self._nbFound == nbFound and not self.stop:
+            memo.put(occupied,remaining,0)
+
+    def _count(self,occupied,remaining):
+        if not remaining:
+            return 1
+        memo = self.memo
+        if memo is not None:
+            ret = memo.get(occupied,remaining)
+            if ret is not None:
+                return ret
+        ret = 0
+        frame = self._frame(occupied,remaining)
+        if frame is not None:
+            candidate = self._next(frame)
+            while candidate is not None:
+                pieceIdx,pieceBit,mask = candidate
+                ret += self._count(occupied | mask,remaining & ~pieceBit)
+                candidate = self._next(frame)
+        if memo is not None and not self.stop:
+            memo.put(occupied,remaining,ret)
+        return ret
+
+    def _putPrefix(self,prefix):
+        occupied = 0
+        remaining = self.bitboard.allPieces
+        for pieceIdx,placementIdx in prefix:
+            square = self.bitboard.firstSquare(occupied)
+            mask = self.bitboard.placements[square][pieceIdx][placementIdx][0]
+            self._placed.append((pieceIdx,mask))
+            occupied |= mask
+            remaining &= ~(1 << pieceIdx)
+        self._nextCheck = self.tries
+        return occupied,remaining
+
+    def iterSolve(self,prefix=(),resume=None):
+        """
+        Generator version of solve(), yielding each solution as soon as it is found, encoded by
+        BitBoard.encode(), instead of keeping them as Board in the solutions attribute
+        The search goes on until all solutions are found, or stopCheck stops it, or the caller stops iterating
+        It uses a stack of _frame() instead of recursion, so that it can be suspended at each solution
+        With resume set to a frontier given to checkpoint, the search starts again from there
+        """
+        bitboard = self.bitboard
+        self._bindMemo()
+        memo = self.memo
+        placed = self._placed
+        occupied,remaining = self._putPrefix(prefix)
+        rootDepth = len(placed)
+        try:
+            if not remaining:
+                self._nbFound += 1
+                for image in self._newSolutions():
+                    yield bitboard.encode(image)
+                return
+            frame = self._frame(occupied,remaining)
+            if frame is None:
+                return
+            self._stack = stack = [frame]
+            if resume is not None:
+                self._resumeStack(stack,resume)
+            while stack:
+                frame = stack[-1]
+                candidate = self._next(frame)
+                if candidate is None:
+                    if self.stop:
+                        return
+                    stack.pop()
+                    # Only the boards fully searched are recorded
+                    if memo is not None and self._nbFound == frame[5]:
+                        memo.put(frame[0],frame[1],0)
+                    if len(placed) > rootDepth:
+                        placed.pop()
+                    continue
+                pieceIdx,pieceBit,mask = candidate
+                occupied = frame[0] | mask
+                remaining = frame[1] & ~pieceBit
+                placed.append((pieceIdx,mask))
+                if not remaining:
+                    self._nbFound += 1
+                    for image in self._newSolutions():
+                        yield bitboard.encode(image)
+                    placed.pop()
+                    continue
+                child = None
+                if memo is None or memo.get(occupied,remaining) != 0:
+                    child = self._frame(occupied,remaining)
+                if child is None:
+                    placed.pop()
+                    continue
+                stack.append(child)
+        finally:
+            del placed[:]
+            self._stack = None
+
+    def prefixes(self,depth):
+        """
+        Return the list of all the ways to put the first depth pieces, each one as a tuple of
+        (pieceIdx,placementIdx) which can be given to solve() to search only from there
+        Ways filling the board with less pieces are also returned, and the tries and pieces
+        put to find them are counted as if solve() had been run
+        """
+        ret = []
+        self._prefixes(0,self.bitboard.allPieces,depth,(),ret)
+        return ret
+
+    def _prefixes(self,occupied,remaining,depth,prefix,ret):
+        free = self.bitboard.full & ~occupied
+        if not depth or not remaining or not free:
+            ret.append(prefix)
+            return
+        square = (free & -free).bit_length()-1
+        for pieceIdx,masks in enumerate(self.bitboard.placements[square]):
+            pieceBit = 1 << pieceIdx
+            if remaining & pieceBit:
+                for placementIdx,(mask,trans,origin) in enumerate(masks):
+                    self.tries += 1
+                    if not occupied & mask:
+                        self.nbPcsPut += 1
+                        if self.pruner is not None and self.pruner.isDead(self.bitboard.regionSizes(occupied | mask),remaining & ~pieceBit):
+                            continue
+                        self._prefixes(occupied | mask,remaining & ~pieceBit,depth-1,prefix+((pieceIdx,placementIdx),),ret)
+
+    def _resumeStack(self,stack,frontier):
+        """
+        Put back on the stack of iterSolve() the pieces placed when the frontier was given to checkpoint
+        The tries and pieces put to get there are already counted, and the frames resumed are not recorded
+        in memo, as the solutions found from them before are not known
+        """
+        tries,nbPcsPut = self.tries,self.nbPcsPut
+        for depth,idx in enumerate(frontier):
+            frame = stack[-1]
+            frame[4] = idx
+            frame[5] = None
+            if depth == len(frontier)-1:
+                break
+            pieceIdx,pieceBit,mask = frame[2][idx-1]
+            self._placed.append((pieceIdx,mask))
+            stack.append(self._frame(frame[0] | mask,frame[1] & ~pieceBit))
+        self.tries,self.nbPcsPut = tries,nbPcsPut
+
+    def restoreSolutions(self,solutions):
+        """
+        Record the solutions (encoded by BitBoard.encode()) found before the search was resumed, so that
+        their symmetry classes are not found again
+        """
+        symmetry = self.bitboard.symmetry
+        if symmetry is not None:
+            for data in solutions:
+                self._classes.add(symmetry.key(self.bitboard.decodePlaced(data)))
+
+    def _newSolutions(self):
+        """
+        Return the list of the solutions given by the pieces placed, as lists of (pieceIdx,mask):
+        the placed pieces, followed by their images by the board symmetries if they are expanded,
+        or nothing if the class of this solution has already been found
+        """
+        symmetry = self.bitboard.symmetry
+        if symmetry is None:
+            return [self._placed]
+        # A solution moved onto its own placements by a symmetry is found once per image
+        key = symmetry.key(self._placed)
+        if key in self._classes:
+            return []
+        self._classes.add(key)
+        if self.bitboard.expandSymmetry:
+            return symmetry.images(self._placed)
+        return [self._placed]
+
+    def _solutionFound(self):
+        self._nbFound += 1
+        images = self._newSolutions()
+        if not images:
+            return
+        board = self.bitboard.toBoard(self._placed)
+        if self.printSol:
+            by = "" if self.name is None else " by {}".format(self.name)
+            print("\nSolution found{} in {} after testing {} combinations and putting {} pieces:".format(by,str(datetime.now()-self.startTime)[:-7],self.tries,self.nbPcsPut))
+            print(board,flush=True)
+        self.solutions.append(board)
+        for image in images[1:]:
+            self.solutions.append(self.bitboard.toBoard(image))
+        if not self.findAll:
+            self.stop = True
+
+class MeteredBitBoardSearch(BitBoardSearch):
+    """
+    This class is the BitBoardSearch collecting statistics in a SearchMetrics while solving
+    It is a separate class so that the search does not pay for the statistics when they are not needed.
+    It only overrides the steps of the search (see _frame() and _next()), so that it can be combined with
+    the other searches (see ordering.newSearch()).
+    Branches are timed by solve() for each way to put the first piece when solving the whole search tree,
+    or for each prefix given to solve().
+    """
+    def __init__(self,bitboard,metrics,findAll=False,printSol=True,startTime=None,name=None,prune=False,checkInterval=1024):
+        super().__init__(bitboard,findAll,printSol,startTime,name,prune,checkInterval)
+        self.metrics = metrics
+        self._branchDepth = None
+        # Solutions are found once all the pieces are put
+        metrics.addDepth(len(bitboard.pieces))
+
+    def solve(self,prefix=()):
+        if not prefix:
+            self._branchDepth = 0
+            super().solve(prefix)
+            self._branchDepth = None
+            return self.solutions
+        # The whole prefix is the branch
+        startTime = monotonic()
+        tries = self.tries
+        nbSol = len(self.solutions)
+        super().solve(prefix)
+        self.metrics.branch(list(prefix),monotonic()-startTime,self.tries-tries,len(self.solutions)-nbSol)
+        return self.solutions
+
+    def _solve(self,occupied,remaining):
+        if self._branchDepth is None or len(self._placed) != self._branchDepth+1:
+            super()._solve(occupied,remaining)
+            return
+        startTime = monotonic()
+        tries = self.tries
+        nbSol = len(self.solutions)
+        super()._solve(occupied,remaining)
+        pieceIdx,mask = self._placed[-1]
+        move = self._move(occupied & ~mask,remaining | (1 << pieceIdx),pieceIdx,mask)
+        self.metrics.branch([move],monotonic()-startTime,self.tries-tries,len(self.solutions)-nbSol)
+
+    def _frame(self,occupied,remaining):
+        # Searches may count tries when listing the candidates
+        tries = self.tries
+        frame = super()._frame(occupied,remaining)
+        self.metrics.tries[len(self._placed)] += self.tries-tries
+        if frame is not None:
+            # Whether a piece has been put on the board
+            frame.append(False)
+        return frame
+
+    def _next(self,frame):
+        metrics = self.metrics
+        depth = len(self._placed)
+        tries = self.tries
+        nbPcsPut = self.nbPcsPut
+        prunes = self.pruner.prunes if self.pruner is not None else 0
+        candidate = super()._next(frame)
+        metrics.tries[depth] += self.tries-tries
+        metrics.placements[depth] += self.nbPcsPut-nbPcsPut
+        if self.pruner is not None:
+            metrics.prunes[depth] += self.pruner.prunes-prunes
+        if candidate is not None:
+            frame[6] = True
+        elif not frame[6] and not self.stop:
+            metrics.backtracks[depth] += 1
+        return candidate
+
+    def _check(self):
+        self.metrics.progress(self.tries,len(self.solutions))
+        return super()._check()
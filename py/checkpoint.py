@@ -0,0 +1,79 @@
+import hashlib
+import os
+import struct
+
+# Checkpoint file: header, then the parts of the search, then the encoded solutions
+_MAGIC = b"PUZCKPT1"
+# magic, fingerprint, tries, pieces put, number of solutions, size of an encoded solution, number of parts
+_HEADER = struct.Struct("<8s32sQQIHI")
+# Part of the search: solved flag, number of moves of its prefix, length of its frontier
+_PART = struct.Struct("<BBH")
+
+def fingerprint(bitboard,*options):
+    """
+    Return the fingerprint of a search on bitboard with options (e.g. prune), which tells if a checkpoint
+    was written by the same search: the sides, symmetry and placements of the pieces, in search order
+    """
+    state = (bitboard.sides,bitboard.symmetry is not None,bitboard.expandSymmetry,bitboard.candidates,options)
+    return hashlib.sha256(repr(state).encode()).digest()
+
+class Checkpoint():
+    """
+    This class is the state of a BitBoardSearch (or of several ones, each solving a part of the search
+    given by a prefix) saved to a file, from which the search can be resumed where it was
+    - frontiers[prefix] is the frontier of the part of the search of prefix being solved, as given to
+      BitBoardSearch.checkpoint: the number of the next candidate to try at each depth of the search
+    - done is the set of the prefixes whose part of the search is solved
+    - solutions is the list of the solutions found so far, encoded by BitBoard.encode()
+    - tries and nbPcsPut are the numbers of tries and pieces put so far
+    The fingerprint identifies the search, see fingerprint(). save() writes the checkpoint in a compact
+    binary file, replacing it only once fully written, and load() reads it back.
+    """
+    def __init__(self,fingerprint,size):
+        self.fingerprint = fingerprint
+        self.size = size
+        self.frontiers = {}
+        self.done = set()
+        self.solutions = []
+        self.tries = 0
+        self.nbPcsPut = 0
+
+    def save(self,path):
+        parts = [(prefix,1,()) for prefix in sorted(self.done)]
+        parts += [(prefix,0,frontier) for prefix,frontier in sorted(self.frontiers.items()) if prefix not in self.done]
+        data = [_HEADER.pack(_MAGIC,self.fingerprint,self.tries,self.nbPcsPut,len(self.solutions),self.size,len(parts))]
+        for prefix,solved,frontier in parts:
+            data.append(_PART.pack(solved,len(prefix),len(frontier)))
+            data.append(struct.pack("<{}H".format(2*len(prefix)),*(value for move in prefix for value in move)))
+            data.append(struct.pack("<{}I".format(len(frontier)),*frontier))
+        data.extend(self.solutions)
+        temporary = path+".tmp"
+        with open(temporary,"wb") as checkpointFile:
+            checkpointFile.write(b"".join(data))
+        os.replace(temporary,path)
+
+    @classmethod
+    def load(cls,path):
+        with open(path,"rb") as checkpointFile:
+            data = checkpointFile.read()
+        magic,fingerprint,tries,nbPcsPut,nbSolutions,size,nbParts = _HEADER.unpack_from(data,0)
+        if magic != _MAGIC:
+            raise ValueError("'{}' is not a checkpoint file".format(path))
+        ret = cls(fingerprint,size)
+        ret.tries = tries
+        ret.nbPcsPut = nbPcsPut
+        offset = _HEADER.size
+        for part in range(nbParts):
+            solved,prefixLength,frontierLength = _PART.unpack_from(data,offset)
+            offset += _PART.size
+            values = struct.unpack_from("<{}H".format(2*prefixLength),data,offset)
+            offset += 4*prefixLength
+            prefix = tuple(zip(values[::2],values[1::2]))
+            frontier = list(struct.unpack_from("<{}I".format(frontierLength),data,offset))
+            offset += 4*frontierLength
+            if solved:
+                ret.done.add(prefix)
+            else:
+                ret.frontiers[prefix] = frontier
+        ret.solutions = [data[start:start+size] for start in range(offset,offset+nbSolutions*size,size)]
+        return ret
@@ -0,0 +1,236 @@
+import hashlib
+import mmap
+import os
+import struct
+from itertools import compress
+from puzzle import Coordinate, Trans
+from placement import Placement, PlacementIndex
+from symmetry import BoardSymmetry
+from bitboard import BitBoard, neighbourMask
+
+# Directory of the compiled puzzles when none is given
+CACHE_DIR = os.path.join(os.path.expanduser("~"),".cache","puzzlesolver")
+
+# Compiled puzzle file: header, square positions, neighbours of each square, first placement of each
+# (square,piece) among all the placements and among the ones kept by BoardSymmetry.restrict(), then
+# the fixed-size fields of the placements as columns (piece numbers, Trans values, origins, kept flags
+# and masks), and the squares of the placements. Masks are little endian 64 bits words.
+_MAGIC = b"PUZCMPL2"
+# magic, number of squares, pieces and placements, number of words of a mask
+_HEADER = struct.Struct("<8sHHIH")
+_POSITION = struct.Struct("<hh")
+# Trans value -> Trans
+_TRANS = {trans.value:trans for trans in Trans}
+
+def _words(mask,nbWords):
+    """
+    Return the list of the nbWords 64 bits words of mask, lowest first
+    """
+    return [(mask >> (64*word)) & 0xFFFFFFFFFFFFFFFF for word in range(nbWords)]
+
+def compileKey(board,pieces,sides="front"):
+    """
+    Return the content hash of a puzzle definition, as hexadecimal string: the available squares of
+    board and the squares and transformations used on sides of the pieces, in their order
+    """
+    # The squares of every transformation of a piece are given by its squares without transformation
+    shapes = [(tuple((pos.x,pos.y) for pos in piece.squares(Trans.UpFront)),tuple(trans.value for trans in piece.relevantTrans() if trans.isOnSide(sides))) for piece in pieces]
+    definition = (_MAGIC,sides,[(pos.x,pos.y) for pos in board.availablePositions()],shapes)
+    return hashlib.sha256(repr(definition).encode()).hexdigest()
+
+def compilePuzzle(board,pieces,sides="front",cacheDir=None):
+    """
+    Return the path of the compiled puzzle file of board, pieces and sides in cacheDir (CACHE_DIR by
+    default), named by its content hash, and write it from a PlacementIndex if it is not there yet
+    """
+    if cacheDir is None:
+        cacheDir = CACHE_DIR
+    path = os.path.join(cacheDir,compileKey(board,pieces,sides)+".puz")
+    if not os.path.exists(path):
+        os.makedirs(cacheDir,exist_ok=True)
+        writeCompiled(PlacementIndex(board,pieces,sides),path)
+    return path
+
+def writeCompiled(index,path):
+    """
+    Write the compiled puzzle file of a PlacementIndex, replacing it only once fully written
+    """
+    placements = index.allPlacements()
+    nbWords = (len(index.positions)+63)//64
+    data = [_HEADER.pack(_MAGIC,len(index.positions),len(index.pieces),len(placements),nbWords)]
+    data.extend(_POSITION.pack(pos.x,pos.y) for pos in index.positions)
+    neighbours = [word for pos in index.positions for word in _words(neighbourMask(index,pos),nbWords)]
+    data.append(struct.pack("<{}Q".format(len(neighbours)),*neighbours))
+    symmetry = BoardSymmetry(index,index.sides)
+    kept = [placement.piece != symmetry.piece or symmetry.isKept(placement.mask) for placement in placements]
+    # starts[square*nbPieces+pieceIdx] is the number of the first placement of the piece anchored on square
+    starts = [0]
+    keptStarts = [0]
+    for square in index.anchored:
+        for piecePlacements in square:
+            starts.append(starts[-1]+len(piecePlacements))
+            keptStarts.append(keptStarts[-1]+sum(kept[starts[-2]:starts[-1]]))
+    data.append(struct.pack("<{}I".format(len(starts)),*starts))
+    data.append(struct.pack("<{}I".format(len(keptStarts)),*keptStarts))
+    data.append(struct.pack("<{}H".format(len(placements)),*(placement.piece for placement in placements)))
+    data.append(bytes(placement.trans.value for placement in placements))
+    data.append(bytes(placement.origin for placement in placements))
+    data.append(bytes(kept))
+    masks = [word for placement in placements for word in _words(placement.mask,nbWords)]
+    data.append(struct.pack("<{}Q".format(len(masks)),*masks))
+    squares = [square for placement in placements for square in placement.squares]
+    data.append(struct.pack("<{}H".format(len(squares)),*squares))
+    temporary = "{}.{}.tmp".format(path,os.getpid())
+    with open(temporary,"wb") as compiledFile:
+        compiledFile.write(b"".join(data))
+    os.replace(temporary,path)
+
+class CompiledPuzzle():
+    """
+    This class is the PlacementIndex of a compiled puzzle file (see compilePuzzle()), memory mapped,
+    instead of being computed from the board and pieces geometry.
+    The piece, transformation, origin and mask of the placements, and whether BoardSymmetry.restrict()
+    keeps them, are fixed-size fields of the file, read at once as columns, so the tables of a BitBoard
+    are built from them by tables() without parsing. The Placement objects (anchored), which also need
+    the squares of each placement, are only built when first used, e.g. by allPlacements().
+    It has the positions and anchored attributes and the square(), allPlacements() methods of
+    PlacementIndex, and the neighbours of each square as BitBoard.neighbours.
+    The pieces are the ones of the compiled puzzle, used to put them on the board and by BoardSymmetry.
+    """
+    def __init__(self,path,pieces,sides="front"):
+        self.path = path
+        self.pieces = pieces
+        self.sides = sides
+        with open(path,"rb") as compiledFile:
+            self._data = mmap.mmap(compiledFile.fileno(),0,access=mmap.ACCESS_READ)
+        magic,nbSquares,nbPieces,nbPlacements,self._nbWords = _HEADER.unpack_from(self._data,0)
+        if magic != _MAGIC or nbPieces != len(pieces):
+            raise ValueError("'{}' is not a compiled puzzle of these pieces".format(path))
+        offset = _HEADER.size
+        self.positions = [Coordinate(x,y) for x,y in _POSITION.iter_unpack(self._data[offset:offset+nbSquares*_POSITION.size])]
+        offset += nbSquares*_POSITION.size
+        self.neighbours = self._readMasks(offset,nbSquares)
+        offset += 8*nbSquares*self._nbWords
+        self._starts = struct.unpack_from("<{}I".format(nbSquares*nbPieces+1),self._data,offset)
+        offset += 4*len(self._starts)
+        self._keptStarts = struct.unpack_from("<{}I".format(nbSquares*nbPieces+1),self._data,offset)
+        offset += 4*len(self._keptStarts)
+        self._pieceIdxs = struct.unpack_from("<{}H".format(nbPlacements),self._data,offset)
+        offset += 2*nbPlacements
+        self._trans = self._data[offset:offset+nbPlacements]
+        offset += nbPlacements
+        self._origins = self._data[offset:offset+nbPlacements]
+        offset += nbPlacements
+        self._kept = self._data[offset:offset+nbPlacements]
+        offset += nbPlacements
+        self._masks = self._readMasks(offset,nbPlacements)
+        self._squaresStart = offset+8*nbPlacements*self._nbWords
+        self._squareOf = {(pos.x,pos.y):square for square,pos in enumerate(self.positions)}
+
+    def __getattr__(self,name):
+        # anchored is only read from the file when used
+        if name == "anchored":
+            self.anchored = self._readAnchored()
+            return self.anchored
+        raise AttributeError(name)
+
+    def _readMasks(self,offset,count):
+        """
+        Return the list of the count masks of the file from offset
+        """
+        words = struct.unpack_from("<{}Q".format(count*self._nbWords),self._data,offset)
+        if self._nbWords == 1:
+            return list(words)
+        return [sum(words[idx+word] << (64*word) for word in range(self._nbWords)) for idx in range(0,len(words),self._nbWords)]
+
+    def _readAnchored(self):
+        sizes = [len(piece) for piece in self.pieces]
+        squares = struct.unpack_from("<{}H".format(sum(sizes[pieceIdx] for pieceIdx in self._pieceIdxs)),self._data,self._squaresStart)
+        placements = []
+        start = 0
+        for pieceIdx,trans,origin,mask in zip(self._pieceIdxs,self._trans,self._origins,self._masks):
+            end = start+sizes[pieceIdx]
+            placements.append(Placement(pieceIdx,_TRANS[trans],origin,squares[start:end],mask))
+            start = end
+        return self._bySquare(placements,self._starts)
+
+    def _bySquare(self,items,starts):
+        """
+        Return the items of the placements, in the order of the file, as lists by square and by piece,
+        starts being the number of the first one of each (square,piece)
+        """
+        nbPieces = len(self.pieces)
+        return [[items[starts[first+pieceIdx]:starts[first+pieceIdx+1]] for pieceIdx in range(nbPieces)] for first in range(0,len(starts)-1,nbPieces)]
+
+    def tables(self,restricted=False):
+        """
+        Return the placements, candidates and candidateEnds tables of a BitBoard, with only the placements
+        kept by BoardSymmetry.restrict() if restricted
+        """
+        nbPieces = len(self.pieces)
+        columns = (self._pieceIdxs,self._trans,self._origins,self._masks)
+        starts = self._starts
+        if restricted:
+            columns = [list(compress(column,self._kept)) for column in columns]
+            starts = self._keptStarts
+        pieceIdxs,trans,origins,masks = columns
+        placements = self._bySquare(list(zip(masks,map(_TRANS.__getitem__,trans),origins)),starts)
+        pieceBits = [1 << pieceIdx for pieceIdx in range(nbPieces)]
+        allCandidates = list(zip(pieceIdxs,map(pieceBits.__getitem__,pieceIdxs),masks))
+        candidates = []
+        candidateEnds = []
+        for first in range(0,len(starts)-1,nbPieces):
+            candidates.append(allCandidates[starts[first]:starts[first+nbPieces]])
+            # The candidates of a square are sorted by piece, so each one ends the run of its piece (see runEnds())
+            ends = []
+            for pieceIdx in range(nbPieces):
+                ends += [starts[first+pieceIdx+1]-starts[first]]*(starts[first+pieceIdx+1]-starts[first+pieceIdx])
+            candidateEnds.append(ends)
+        return placements,candidates,candidateEnds
+
+    def square(self,pos):
+        """
+        Return the number of the available square at pos, or None if it is not an available square
+        """
+        return self._squareOf.get((pos.x,pos.y))
+
+    def allPlacements(self):
+        return [placement for square in self.anchored for placements in square for placement in placements]
+
+    def __len__(self):
+        return len(self.positions)
+
+class CompiledBitBoard(BitBoard):
+    """
+    This class is the BitBoard built from the compiled puzzle file of its board, pieces and sides in
+    cacheDir (CACHE_DIR by default), compiled the first time (see compilePuzzle()), so that the
+    placements of puzzles solved again, e.g. by successive batch runs or by several processes, are not
+    computed again. Its tables are read from the fields of the file (see CompiledPuzzle), without
+    building the Placement objects, computing the neighbours of the squares nor restricting the
+    placements with its symmetry.
+    It is pickled as its creation options and the path of its compiled file (the board, pieces, sides,
+    symmetry, cacheDir and path), so that the processes it is sent to map the file instead of unpickling
+    all the placements, without computing its content hash, and compile it again if it is not on their
+    host.
+    """
+    def __init__(self,board,pieces,sides="front",symmetry=None,cacheDir=None,path=None):
+        self.cacheDir = cacheDir
+        self._symmetryOption = symmetry
+        if path is None or not os.path.exists(path):
+            path = compilePuzzle(board,pieces,sides,cacheDir)
+        self.path = path
+        super().__init__(board,pieces,sides,symmetry,CompiledPuzzle(path,pieces,sides))
+
+    def _tables(self):
+        return (self.index.neighbours,)+self.index.tables(self.symmetry is not None)
+
+    def __reduce__(self):
+        return (CompiledBitBoard,(self.board,self.pieces,self.sides,self._symmetryOption,self.cacheDir,self.path))
+
+def bitBoard(board,pieces,sides="front",symmetry=None,cacheDir=None):
+    """
+    Return the BitBoard of board and pieces, a CompiledBitBoard cached in cacheDir if it is set
+    """
+    if cacheDir is None:
+        return BitBoard(board,pieces,sides,symmetry)
+    return CompiledBitBoard(board,pieces,sides,symmetry,cacheDir)
@@ -0,0 +1,314 @@
+from collections import deque
+from datetime import datetime
+from time import monotonic, sleep
+from multiprocessing.connection import Listener, Client, wait
+import multiprocessing as mp
+import argparse
+import os
+import queue
+import threading
+from bitboard import BitBoard, BitBoardSearch
+from ordering import orderPieces
+
+# TCP port on which the coordinator listens by default
+PORT = 6021
+# Number of parts of the search sent in advance to each worker, so that it does not wait for the next one
+PREFETCH = 2
+
+def _connectAddress(address):
+    """
+    Return the address to connect to a listener bound to address, which may be on all interfaces
+    """
+    host,port = address
+    return ("127.0.0.1" if host in ("","0.0.0.0") else host,port)
+
+def runWorker(address,authkey,retry=None):
+    """
+    Worker of a DistributedPuzzleSolver: connect to its coordinator listening on address (host,port)
+    with authkey, and solve the parts of the search it sends until the end of its solve()
+    With retry set, connect again every retry seconds after the end of a solve or while the coordinator
+    can't be reached, to take part in its next solves until stopped, otherwise return after one solve
+    Return the number of parts of the search solved
+    """
+    nbParts = 0
+    while True:
+        try:
+            conn = Client(_connectAddress(address),authkey=authkey)
+        except OSError:
+            if retry is None:
+                raise
+            sleep(retry)
+            continue
+        try:
+            nbParts += _serve(conn)
+        except (EOFError,OSError):
+            # The coordinator ended its solve, or was stopped
+            pass
+        finally:
+            conn.close()
+        if retry is None:
+            return nbParts
+        sleep(retry)
+
+def _serve(conn):
+    """
+    Solve the parts of the search sent on conn by the coordinator, until it sends None
+    The coordinator first sends the job, then {"task":prefix} messages, each answered once solved by a
+    {"part":prefix,"tries":tries,"nbPcsPut":nbPcsPut,"solutions":solutions} message giving the tries and
+    pieces put of the part and its solutions encoded by BitBoard.encode(), and {"stop":True} when the
+    search shall be stopped: the part being solved is answered with what was found so far, and the next
+    ones with nothing. While solving, {"alive":True} is sent every heartbeat seconds.
+    """
+    job = conn.recv()
+    if job is None:
+        return 0
+    findAll = job["findAll"]
+    search = BitBoardSearch(job["bitboard"],findAll,False,prune=job["prune"],checkInterval=job["checkInterval"])
+    # Messages received while solving, handled once the part is solved
+    inbox = deque()
+    heartbeat = job["heartbeat"]
+    nextBeat = monotonic()+heartbeat
+    def stopCheck():
+        nonlocal nextBeat
+        while conn.poll():
+            inbox.append(conn.recv())
+        if monotonic() >= nextBeat:
+            conn.send({"alive":True})
+            nextBeat = monotonic()+heartbeat
+        return any(message is None or "stop" in message for message in inbox)
+    search.stopCheck = stopCheck
+    nbParts = 0
+    stopped = False
+    while True:
+        message = inbox.popleft() if inbox else conn.recv()
+        if message is None:
+            return nbParts
+        if "stop" in message:
+            stopped = True
+            continue
+        prefix = message["task"]
+        tries,nbPcsPut = search.tries,search.nbPcsPut
+        solutions = []
+        if not stopped:
+            for solution in search.iterSolve(prefix):
+                solutions.append(solution)
+                if not findAll:
+                    break
+            stopped = search.stop or (len(solutions) > 0 and not findAll)
+            nbParts += 1
+        conn.send({"part":prefix,"tries":search.tries-tries,"nbPcsPut":search.nbPcsPut-nbPcsPut,"solutions":solutions})
+
+def _accept(listener,arrivals,closing):
+    """
+    Accept the connections of the workers, until closing is set
+    """
+    while True:
+        try:
+            conn = listener.accept()
+        except (OSError,EOFError,mp.AuthenticationError):
+            # A client without the authkey is refused
+            if closing.is_set():
+                return
+            continue
+        if closing.is_set():
+            conn.close()
+            return
+        arrivals.put((conn,"{}:{}".format(*listener.last_accepted[:2])))
+
+class DistributedPuzzleSolver():
+    """
+    This class is the distributed version of the puzzle solver, using the bitboard engine: its solve()
+    coordinates workers, which can run on any host, connected to it over TCP. The search tree is split
+    in parts, each one starting with the pieces put by a prefix (see BitBoardSearch.prefixes()), which
+    are sent to the workers as they solve them. A worker which disconnects, or which sends nothing during
+    workerTimeout seconds while solving, is given up, and its parts are given to the other workers.
+    Its creation requires a Board, a list of Piece it will try to put on the Board, the authkey (bytes)
+    shared with the workers, and the address (host,port) on which solve() listens, on all interfaces
+    and port PORT by default. Port 0 picks a free port, given by the address attribute during solve().
+    Only the hosts knowing authkey can connect, as the coordinator and its workers trust each other.
+    Workers are started with runWorker(), or from the command line with:
+        python distributedsolver.py --host <coordinator host> --port <port> --authkey <key> --processes <n>
+    which starts n workers on the host, connecting again to take part in each new solve of the coordinator.
+    The solve() method has the options of MultiThreadPuzzleSolver.solve(), except engine, nbProcesses,
+    metrics, memo, and the checkpoint ones, and the following ones:
+    - nbLocalWorkers : 0 by default, number of workers started as processes of this host for this solve
+    - workerTimeout : 60 by default, number of seconds without any message from a worker solving a part
+                      after which it is given up (workers send a message every quarter of it)
+    The "constrained" strategy is not available. Once stopped (first solution found unless findAll,
+    timeout or cancel()), the parts being solved are stopped and their results are counted, but without
+    findAll only the first solution received is returned.
+    The solve() method returns a tuple containing:
+        - The solutions as list of Board objects
+        - The number of tries used (tries to put a piece on a square)
+        - The number of pieces successfully put on the puzzle board
+    The numbers of parts given to another worker is in the reassigned attribute.
+    """
+    def __init__(self,board,pieces,authkey,address=("",PORT)):
+        self._board = board
+        self._pieces = pieces
+        self._authkey = authkey
+        self._address = address
+        self._stopEvent = threading.Event()
+        self.address = None
+        self.tries = 0
+        self.nbPcsPut = 0
+        self.reassigned = 0
+
+    def cancel(self):
+        """
+        Stop a running solve() (e.g. from another thread), which then returns the solutions found so far
+        """
+        self._stopEvent.set()
+
+    def solve(self,findAll=False,printSol=True,sides="front",prune=False,nbLocalWorkers=0,splitDepth=2,timeout=None,checkInterval=1024,symmetry=None,strategy="first",workerTimeout=60):
+        if strategy == "constrained":
+            raise ValueError("The constrained strategy is not available with the distributed solver")
+        startTime = datetime.now()
+        self._stopEvent.clear()
+        bitboard = BitBoard(self._board,orderPieces(self._board,self._pieces,sides,strategy),sides,symmetry)
+        search = BitBoardSearch(bitboard,prune=prune)
+        pending = deque(search.prefixes(splitDepth))
+        self.tries = search.tries
+        self.nbPcsPut = search.nbPcsPut
+        self.reassigned = 0
+        job = {"bitboard":bitboard,"findAll":findAll,"prune":prune,"checkInterval":checkInterval,"heartbeat":workerTimeout/4}
+        deadline = None
+        if timeout is not None:
+            deadline = monotonic()+timeout
+        listener = Listener(self._address,authkey=self._authkey)
+        self.address = listener.address
+        # Local workers are started before the thread accepting the connections
+        local = [mp.Process(target=runWorker,args=(self.address,self._authkey),daemon=True) for i in range(nbLocalWorkers)]
+        for proc in local:
+            proc.start()
+        arrivals = queue.Queue()
+        closing = threading.Event()
+        acceptThread = threading.Thread(target=_accept,args=(listener,arrivals,closing),daemon=True)
+        acceptThread.start()
+        workers = []
+        solutions = []
+        stopping = False
+        try:
+            while (pending and not stopping) or any(worker["tasks"] for worker in workers):
+                lost = []
+                while not arrivals.empty():
+                    conn,name = arrivals.get()
+                    worker = {"conn":conn,"name":name,"tasks":deque(),"lastSeen":monotonic()}
+                    workers.append(worker)
+                    if not self._send(worker,job,lost):
+                        continue
+                    print("Worker {} joined after {}".format(name,str(datetime.now()-startTime)[:-7]))
+                    if stopping:
+                        self._send(worker,{"stop":True},lost)
+                if not stopping and (self._stopEvent.is_set() or (deadline is not None and monotonic() >= deadline)):
+                    if deadline is not None and monotonic() >= deadline:
+                        print("Timeout reached after {} seconds, stopping all workers".format(timeout))
+                    stopping = True
+                    for worker in workers:
+                        self._send(worker,{"stop":True},lost)
+                if not stopping:
+                    for worker in workers:
+                        while pending and len(worker["tasks"]) < PREFETCH and worker not in lost:
+                            if not worker["tasks"]:
+                                # The timeout of a worker only runs while it solves
+                                worker["lastSeen"] = monotonic()
+                            worker["tasks"].append(pending.popleft())
+                            self._send(worker,{"task":worker["tasks"][-1]},lost)
+                # Wake up regularly to welcome new workers and check the timeouts
+                waitTimeout = 0.1
+                if deadline is not None and not stopping:
+                    waitTimeout = max(0,min(waitTimeout,deadline-monotonic()))
+                ready = wait([worker["conn"] for worker in workers if worker not in lost],waitTimeout)
+                for worker in workers:
+                    if worker in lost:
+                        continue
+                    if worker["conn"] in ready:
+                        try:
+                            while worker["conn"].poll():
+                                message = worker["conn"].recv()
+                                worker["lastSeen"] = monotonic()
+                                if "part" not in message:
+                                    continue
+                                worker["tasks"].remove(message["part"])
+                                self.tries += message["tries"]
+                                self.nbPcsPut += message["nbPcsPut"]
+                                for data in message["solutions"]:
+                                    # Other workers may find a solution before being stopped: only the first one is kept
+                                    if solutions and not findAll:
+                                        break
+                                    board = bitboard.decode(data)
+                                    if printSol:
+                                        print("\nSolution found by worker {} in {}:".format(worker["name"],str(datetime.now()-startTime)[:-7]))
+                                        print(board,flush=True)
+                                    solutions.append(board)
+                                if message["solutions"] and not findAll and not stopping:
+                                    stopping = True
+                                    for other in workers:
+                                        self._send(other,{"stop":True},lost)
+                        except (EOFError,OSError):
+                            lost.append(worker)
+                    elif worker["tasks"] and monotonic()-worker["lastSeen"] > workerTimeout:
+                        print("Worker {} sent nothing for {} seconds".format(worker["name"],workerTimeout))
+                        lost.append(worker)
+                for worker in lost:
+                    workers.remove(worker)
+                    worker["conn"].close()
+                    print("Worker {} lost, giving its {} parts of the search to the other workers".format(worker["name"],len(worker["tasks"])))
+                    # Parts are only counted once solved, so they are solved again from the start
+                    if not stopping:
+                        self.reassigned += len(worker["tasks"])
+                        pending.extendleft(reversed(worker["tasks"]))
+        finally:
+            closing.set()
+            # Wake up the thread waiting for a connection
+            try:
+                Client(_connectAddress(self.address),authkey=self._authkey).close()
+            except OSError:
+                pass
+            acceptThread.join(5)
+            listener.close()
+            while not arrivals.empty():
+                workers.append({"conn":arrivals.get()[0]})
+            for worker in workers:
+                try:
+                    worker["conn"].send(None)
+                except OSError:
+                    pass
+                worker["conn"].close()
+            for proc in local:
+                proc.join(5)
+                if proc.is_alive():
+                    proc.terminate()
+                    proc.join()
+        return solutions,self.tries,self.nbPcsPut
+
+    def _send(self,worker,message,lost):
+        """
+        Send message to worker, adding it to lost if it is not reachable anymore
+        """
+        try:
+            worker["conn"].send(message)
+            return True
+        except OSError:
+            if worker not in lost:
+                lost.append(worker)
+            return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run workers of a DistributedPuzzleSolver, solving the parts of the searches sent by its coordinator")
+    parser.add_argument("--host",default="127.0.0.1",help="host of the coordinator")
+    parser.add_argument("--port",type=int,default=PORT)
+    parser.add_argument("--authkey",required=True,help="key shared with the coordinator")
+    parser.add_argument("--processes",type=int,default=None,help="number of workers, number of CPU cores by default")
+    parser.add_argument("--retry",type=float,default=1,help="seconds between two connections to the coordinator")
+    args = parser.parse_args()
+    address = (args.host,args.port)
+    workers = [mp.Process(target=runWorker,args=(address,args.authkey.encode(),args.retry)) for i in range(args.processes or os.cpu_count() or 1)]
+    for proc in workers:
+        proc.start()
+    print("{} workers solving for {}:{}".format(len(workers),*address))
+    try:
+        for proc in workers:
+            proc.join()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,151 @@
+from datetime import datetime
+from placement import PlacementIndex
+
+class DLXPuzzleSolver():
+    """
+    This class is a puzzle solver using Dancing Links (Knuth's Algorithm X), using Piece and Board
+    Its creation requires a Board, and a list of Piece it will try to put on the Board
+    The puzzle is seen as an exact cover problem: each row of the cover matrix is one way to put
+    a piece on the board (taken from a PlacementIndex), and it covers one column for the piece
+    and one column for each square of the board it fills. A solution is a set of rows covering
+    each column exactly once.
+    Instead of always filling the top left available square, the column with the fewest rows
+    left (the square which can be filled in the fewest ways, or the piece which can be put in
+    the fewest ways) is chosen at each step, which prunes the search much more.
+    When the pieces cannot fill all the board squares, squares are not required to be covered.
+    The solve() method has the same options and returns the same tuple as PuzzleSolver.solve(),
+    but as every row tried fits on the board, the number of tries is also the number of pieces put
+    """
+    def __init__(self,board,pieces):
+        self._board = board
+        self._pieces = pieces
+        self._startTime = None
+        self._nbTries = 0
+        self._nbPcsPut = 0
+        self._findAll = False
+        self._print = True
+        self._stop = False
+
+    def solve(self,findAll=False,printSol=True,sides="front"):
+        self._findAll = findAll
+        self._print = printSol
+        self._startTime = datetime.now()
+        self._index = PlacementIndex(self._board,self._pieces,sides)
+        self._buildMatrix(self._index.allPlacements())
+        solutions = []
+        self._search([],solutions)
+        return solutions,self._nbTries,self._nbPcsPut
+
+    def _buildMatrix(self,placements):
+        """
+        Build the dancing links as arrays: node number 0 is the root, nodes 1 to nbColumns are
+        the column headers (pieces first, then squares), and each following node is a 1 of a row
+        """
+        nbPieces = len(self._pieces)
+        nbSquares = len(self._index)
+        nbColumns = nbPieces+nbSquares
+        area = sum(len(piece) for piece in self._pieces)
+        nbPrimary = nbColumns if area == nbSquares else nbPieces
+        self._L = [0]*(nbColumns+1)
+        self._R = [0]*(nbColumns+1)
+        self._U = list(range(nbColumns+1))
+        self._D = list(range(nbColumns+1))
+        self._C = list(range(nbColumns+1))
+        self._S = [0]*(nbColumns+1)
+        self._rows = [None]*(nbColumns+1)
+        # Only primary columns are linked to the root, secondary ones are linked to themselves
+        for col in range(nbColumns+1):
+            self._L[col] = col
+            self._R[col] = col
+        for col in range(1,nbPrimary+1):
+            self._L[col] = col-1
+            self._R[col-1] = col
+        self._L[0] = nbPrimary
+        self._R[nbPrimary] = 0
+        for placement in placements:
+            columns = [placement.piece+1]+[nbPieces+square+1 for square in placement.squares]
+            first = len(self._C)
+            for idx,col in enumerate(columns):
+                node = first+idx
+                self._C.append(col)
+                self._rows.append(placement)
+                self._U.append(self._U[col])
+                self._D.append(col)
+                self._D[self._U[col]] = node
+                self._U[col] = node
+                self._S[col] += 1
+                self._L.append(first+idx-1 if idx else first+len(columns)-1)
+                self._R.append(first+idx+1 if idx < len(columns)-1 else first)
+
+    def _cover(self,col):
+        L,R,U,D,C,S = self._L,self._R,self._U,self._D,self._C,self._S
+        R[L[col]] = R[col]
+        L[R[col]] = L[col]
+        i = D[col]
+        while i != col:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self,col):
+        L,R,U,D,C,S = self._L,self._R,self._U,self._D,self._C,self._S
+        i = U[col]
+        while i != col:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[col]] = col
+        L[R[col]] = col
+
+    def _search(self,chosen,solutions):
+        R,D,S = self._R,self._D,self._S
+        if R[0] == 0:
+            self._solutionFound(chosen,solutions)
+            return
+        # Choose the column with the fewest remaining rows
+        col = R[0]
+        best = col
+        while col != 0:
+            if S[col] < S[best]:
+                best = col
+                if S[best] == 0:
+                    return
+            col = R[col]
+        self._cover(best)
+        row = D[best]
+        while row != best and not self._stop:
+            self._nbTries += 1
+            self._nbPcsPut += 1
+            chosen.append(row)
+            j = R[row]
+            while j != row:
+                self._cover(self._C[j])
+                j = R[j]
+            self._search(chosen,solutions)
+            j = self._L[row]
+            while j != row:
+                self._uncover(self._C[j])
+                j = self._L[j]
+            chosen.pop()
+            row = D[row]
+        self._uncover(best)
+
+    def _solutionFound(self,chosen,solutions):
+        board = self._board
+        for node in chosen:
+            placement = self._rows[node]
+            board = board.putSquares(self._pieces[placement.piece].name,[self._index.positions[square] for square in placement.squares])
+        if self._print:
+            print("\nSolution found in {} after testing {} combinations and putting {} pieces:".format(str(datetime.now()-self._startTime)[:-7],self._nbTries,self._nbPcsPut))
+            print(board,flush=True)
+        solutions.append(board)
+        if not self._findAll:
+            self._stop = True
@@ -36,7 +36,7 @@ def CreatePieces():
     return [O,t,Q,BigS,SmallsTail,BigL,U,Lequal]
     
 if __name__ == "__main__":
-    userDate = input('Calendar puzzle date to solve (ex: 31/01/2022), leave empty for today's date): ")
+    userDate = input("Calendar puzzle date to solve (ex: 31/01/2022), leave empty for today's date): ")
     if len(userDate)== 0:
         userDate = datetime.now().strftime("%d/%m/%Y")
         print("Solving current date {}".format(userDate))
@@ -51,6 +51,6 @@ if __name__ == "__main__":
         solver = PuzzleSolver(puzzle,pieces)
         print("Start solving puzzle for {}".format(prettyDate))
         starttime = datetime.now()
-        solutions,tries,nbPcsPut= solver.solve(findAll=True,printSol=True,sides="both")
+        solutions,tries,nbPcsPut= solver.solve(findAll=True,printSol=True,sides="both",engine="bitboard")
         print("{} solutions found for {} in {} after {} tries and placing {} pieces".format(len(solutions),prettyDate,datetime.now() - starttime,tries,nbPcsPut))
      
@@ -0,0 +1,156 @@
+import mmap
+import struct
+
+# Number written for a square left empty by a solution
+EMPTY = 255
+
+def encodeSolutions(board,pieces,solutions):
+    """
+    Encode solutions of board as one byte per available square of board (in the order of
+    Board.availablePositions()), giving the number of the piece put on it, or EMPTY
+    All the solutions are encoded one after the other in a single bytes object
+    The squares of each solution are read at once by Board.squaresAt(), and their names turned
+    into numbers by a single mapping over them
+    """
+    numbers = {piece.name:pieceIdx for pieceIdx,piece in enumerate(pieces)}
+    numbers[None] = EMPTY
+    positions = board.availablePositions()
+    return b"".join(bytes(map(numbers.__getitem__,solution.squaresAt(positions))) for solution in solutions)
+
+def splitSolutions(data,size):
+    """
+    Return the list of the solutions encoded in data, each one being size bytes long
+    """
+    return [data[start:start+size] for start in range(0,len(data),size)]
+
+def decodeSolutions(board,pieces,data):
+    """
+    Return the list of Board of the solutions encoded by encodeSolutions()
+    The numbers of each solution are turned into names by a single mapping over them, which are put
+    at once on a copy of board by Board.putNames()
+    """
+    positions = board.availablePositions()
+    names = {pieceIdx:piece.name for pieceIdx,piece in enumerate(pieces)}
+    names[EMPTY] = None
+    return [board.putNames(positions,map(names.__getitem__,encoded)) for encoded in splitSolutions(data,len(positions))]
+
+# Solutions file: header, then index of the keys (sorted), then the encoded solutions of each key
+_MAGIC = b"PUZSOLS1"
+# magic, size of an encoded solution, size of a key, number of keys
+_HEADER = struct.Struct("<8sHHI")
+# Index entry after the key: offset of the first solution in the file, number of solutions
+_ENTRY = struct.Struct("<QI")
+
+def writeSolutionFile(path,solutions,size):
+    """
+    Write a solutions file giving for each key (e.g. a date) of the solutions dictionary its
+    solutions, given as a list of encoded solutions or as all of them in a single bytes object,
+    each encoded solution being size bytes long
+    """
+    keys = sorted(key.encode() for key in solutions)
+    keySize = max([len(key) for key in keys]+[1])
+    entrySize = keySize+_ENTRY.size
+    offset = _HEADER.size+len(keys)*entrySize
+    with open(path,"wb") as solutionFile:
+        solutionFile.write(_HEADER.pack(_MAGIC,size,keySize,len(keys)))
+        blobs = []
+        for key in keys:
+            blob = solutions[key.decode()]
+            if not isinstance(blob,(bytes,bytearray)):
+                blob = b"".join(blob)
+            if len(blob) % size:
+                raise ValueError("Solutions of '{}' are not {} bytes long".format(key.decode(),size))
+            solutionFile.write(key.ljust(keySize,b"\0")+_ENTRY.pack(offset,len(blob)//size))
+            offset += len(blob)
+            blobs.append(blob)
+        for blob in blobs:
+            solutionFile.write(blob)
+
+class SolutionFile():
+    """
+    This class reads a solutions file written by writeSolutionFile()
+    The file is memory mapped and its keys index is searched by bisection, so the solutions of any
+    key are read without loading the file: count() gives the number of solutions of a key,
+    solution() one of them, and solutions() all of them, as encoded by encodeSolutions(). They raise
+    KeyError for a key which is not in the file, which "key in solutionFile" tells.
+    It is a context manager closing the file on exit, otherwise close() has to be called.
+    """
+    def __init__(self,path):
+        self._file = open(path,"rb")
+        self._data = mmap.mmap(self._file.fileno(),0,access=mmap.ACCESS_READ)
+        magic,self.size,self._keySize,self._nbKeys = _HEADER.unpack_from(self._data,0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError("'{}' is not a solutions file".format(path))
+        self._entrySize = self._keySize+_ENTRY.size
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,excType,excValue,traceback):
+        self.close()
+
+    def __len__(self):
+        return self._nbKeys
+
+    def _key(self,idx):
+        start = _HEADER.size+idx*self._entrySize
+        return self._data[start:start+self._keySize].rstrip(b"\0")
+
+    def keys(self):
+        return [self._key(idx).decode() for idx in range(self._nbKeys)]
+
+    def __contains__(self,key):
+        return self._find(key) is not None
+
+    def _find(self,key):
+        """
+        Return the (offset,count) of the solutions of key, or None if key is not in the file
+        """
+        key = key.encode()
+        low,high = 0,self._nbKeys
+        while low < high:
+            middle = (low+high)//2
+            if self._key(middle) < key:
+                low = middle+1
+            else:
+                high = middle
+        if low < self._nbKeys and self._key(low) == key:
+            return _ENTRY.unpack_from(self._data,_HEADER.size+low*self._entrySize+self._keySize)
+        return None
+
+    def _entry(self,key):
+        """
+        Return the (offset,count) of the solutions of key, KeyError is raised if key is not in the file
+        """
+        entry = self._find(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def count(self,key):
+        """
+        Return the number of solutions of key, KeyError is raised if key is not in the file
+        """
+        return self._entry(key)[1]
+
+    def solution(self,key,idx):
+        """
+        Return the solution number idx of key, KeyError is raised if key is not in the file
+        """
+        offset,count = self._entry(key)
+        if not 0 <= idx < count:
+            raise IndexError("'{}' has {} solutions".format(key,count))
+        start = offset+idx*self.size
+        return self._data[start:start+self.size]
+
+    def solutions(self,key):
+        """
+        Return the list of the solutions of key, KeyError is raised if key is not in the file
+        """
+        offset,count = self._entry(key)
+        return splitSolutions(self._data[offset:offset+count*self.size],self.size)
@@ -0,0 +1,119 @@
+import json
+from time import monotonic
+
+class SearchMetrics():
+    """
+    This class collects statistics of a search, to find which parts of the search tree take the solving time
+    It is given to the solve() method of the solvers with their metrics option, and it counts for each
+    depth of the search tree (number of pieces already put):
+    - tries : tries to put a piece on the first available square
+    - placements : pieces put on the board
+    - prunes : pieces put and immediately removed because of a hole that can't be filled (see RegionPruner)
+    - backtracks : boards on which no piece could be put, so the search goes back to the previous depth
+    and it times each branch of the search: the parts of the search tree starting with each way to put the
+    first piece, or the parts solved by the processes of MultiThreadPuzzleSolver.
+    Events are reported as dictionaries with an "event" key, to the callback function if given, and as
+    JSON lines appended to the jsonLines file if given:
+    - "progress" : every progressInterval seconds at most, with the tries, tries per second and solutions so far
+    - "branch" : each time a branch has been searched, with its moves, duration, tries and solutions
+    - "worker" : summary() of each process of MultiThreadPuzzleSolver once it ended
+    - "end" : summary() of the whole search
+    The counters are only updated by the solvers when a SearchMetrics is given, as the search is then
+    done by a separate instrumented version of the search, so they cost nothing otherwise.
+    """
+    def __init__(self,callback=None,jsonLines=None,progressInterval=1.0):
+        self.callback = callback
+        self.jsonLines = jsonLines
+        self.progressInterval = progressInterval
+        self.tries = []
+        self.placements = []
+        self.prunes = []
+        self.backtracks = []
+        self.branches = []
+        self.workers = []
+        self.start()
+
+    def start(self):
+        """
+        Start timing the search, called by the solvers when solving starts
+        """
+        self._startTime = monotonic()
+        self._nextProgress = self._startTime+self.progressInterval
+
+    def elapsed(self):
+        return monotonic()-self._startTime
+
+    def addDepth(self,depth):
+        """
+        Make the per depth counters long enough to count at depth
+        """
+        while len(self.tries) <= depth:
+            self.tries.append(0)
+            self.placements.append(0)
+            self.prunes.append(0)
+            self.backtracks.append(0)
+
+    def progress(self,tries,nbSol):
+        """
+        Report the progress of the search if progressInterval seconds have passed since the last report
+        """
+        now = monotonic()
+        if now >= self._nextProgress:
+            self._nextProgress = now+self.progressInterval
+            seconds = now-self._startTime
+            self.report("progress",seconds=seconds,tries=tries,triesPerSecond=tries/seconds if seconds else 0,solutions=nbSol)
+
+    def branch(self,moves,seconds,tries,nbSol):
+        """
+        Record and report the search of the branch starting with moves
+        """
+        branch = {"branch":moves,"seconds":seconds,"tries":tries,"solutions":nbSol}
+        self.branches.append(branch)
+        self.report("branch",**branch)
+
+    def addWorker(self,worker,summary):
+        """
+        Add the summary() of the metrics of a process to these metrics, and report it
+        """
+        for depth,counters in enumerate(summary["depths"]):
+            self.addDepth(depth)
+            self.tries[depth] += counters["tries"]
+            self.placements[depth] += counters["placements"]
+            self.prunes[depth] += counters["prunes"]
+            self.backtracks[depth] += counters["backtracks"]
+        for branch in summary["branches"]:
+            self.branches.append(branch)
+            self.report("branch",**branch)
+        self.workers.append(dict(summary,worker=worker))
+        self.report("worker",worker=worker,**summary)
+
+    def summary(self):
+        """
+        Return a dictionary of all the statistics collected
+        """
+        seconds = self.elapsed()
+        tries = sum(self.tries)
+        return {
+            "seconds":seconds,
+            "tries":tries,
+            "placements":sum(self.placements),
+            "prunes":sum(self.prunes),
+            "backtracks":sum(self.backtracks),
+            "triesPerSecond":tries/seconds if seconds else 0,
+            "depths":[{"tries":self.tries[depth],"placements":self.placements[depth],"prunes":self.prunes[depth],"backtracks":self.backtracks[depth]} for depth in range(len(self.tries))],
+            "branches":list(self.branches),
+        }
+
+    def end(self,nbSol):
+        """
+        Report the summary() once the search has ended
+        """
+        self.report("end",solutions=nbSol,**self.summary())
+
+    def report(self,event,**values):
+        record = dict(values,event=event)
+        if self.callback is not None:
+            self.callback(record)
+        if self.jsonLines is not None:
+            with open(self.jsonLines,"a") as jsonFile:
+                jsonFile.write(json.dumps(record)+"\n")
@@ -1,66 +1,179 @@
-from copy import deepcopy
 from datetime import datetime
-from time import sleep
+from time import monotonic
 import multiprocessing as mp
+from multiprocessing.connection import wait
+import os
+from puzzle import Board
+from metrics import SearchMetrics
+from transposition import TranspositionCache
+from pruning import RegionPruner
+from ordering import orderPieces, newSearch
+from checkpoint import Checkpoint, fingerprint
+from compiledpuzzle import bitBoard
 
-def recursiveSolve(board,pieces,pid,tries,nbPcsPut,nbSol,side,startTime,findAll,printSol,pipe,stop,solutions):
-    if len(pieces):
+def recursiveSolve(board,pieces,shapes,used,pid,tries,nbPcsPut,nbSol,startTime,findAll,printSol,stopEvent,stop,solutions,pruner=None,checkInterval=1024):
+    """
+    Recursively put the pieces not set in the used mask on the first available square of board,
+    in place, using the squares given by shapes[pieceIdx] = pieces[pieceIdx].shapes()
+    Boards on which pruner finds a hole that can't be filled are given up
+    stopEvent is checked every checkInterval tries, and set when the first solution is found if not findAll
+    """
+    if used != (1 << len(pieces))-1:
         pos = board.nextAvailablePos()
-        for piece in pieces:
-            for origin in range(len(piece)):
-                piece.setOrigin(origin)
-                relTrans = piece.relevantTrans()
-                for trans in relTrans:
-                    if  ( (side=="front" and trans.isFront()) or (side=="back" and trans.isBack()) or side=="both"):
-                        piece.transform(trans)
-                        newBoard = board.putPiece(piece,pos)
+        for pieceIdx,piece in enumerate(pieces):
+            pieceBit = 1 << pieceIdx
+            if used & pieceBit:
+                continue
+            for origin in shapes[pieceIdx]:
+                for squares in origin:
+                    if squares is not None:
                         tries += 1
-                        if pipe.poll():
-                            signal = pipe.recv()
-                            if "stop" in signal:
-                                stop = True
-                        if newBoard is not None and not stop:
+                        if not tries % checkInterval and stopEvent.is_set():
+                            stop = True
+                        if not stop and board.fillSquares(piece.name,pos,squares):
                             nbPcsPut+=1
-                            newPieces=deepcopy(pieces)
-                            newPieces.remove(piece)
-                            tries,nbPcsPut,nbSol,stop,solutions = recursiveSolve(newBoard,newPieces,pid,tries,nbPcsPut,nbSol,side,startTime,findAll,printSol,pipe,stop,solutions)
+                            if pruner is None or not pruner.isDead(board.emptyRegionSizes(),((1 << len(pieces))-1) & ~(used | pieceBit)):
+                                tries,nbPcsPut,nbSol,stop,solutions = recursiveSolve(board,pieces,shapes,used | pieceBit,pid,tries,nbPcsPut,nbSol,startTime,findAll,printSol,stopEvent,stop,solutions,pruner,checkInterval)
+                            board.clearSquares(pos,squares)
     else:
         if printSol==True:
             print("\nSolution found by process {} in {} after testing {} combinations and putting {} pieces:".format(pid,str(datetime.now()-startTime)[:-7],tries,nbPcsPut))
             print(board,flush=True)
-        solutions.append(board)
+        solutions.append(Board(board))
         if not findAll:
-            pipe.send({"stop":True})
+            stopEvent.set()
             stop = True
         nbSol += 1
     return tries,nbPcsPut,nbSol,stop,solutions
 
-def pieceSolve(board,pieces,piece,side,startTime,findAll,printSol,pid,pipe):
+def boardPrefixes(board,pieces,shapes,used,depth,pruner=None,prefix=(),ret=None):
+    """
+    List all the ways to put the first depth pieces on board, each one as a tuple of
+    (pieceIdx,origin,transIdx) moves, each move putting a piece on the first available square
+    Return the list, and the tries and pieces put used to build it
+    """
+    if ret is None:
+        ret = []
+    tries = 0
+    nbPcsPut = 0
+    pos = board.nextAvailablePos()
+    if not depth or used == (1 << len(pieces))-1 or pos is None:
+        ret.append(prefix)
+        return ret,tries,nbPcsPut
+    for pieceIdx,piece in enumerate(pieces):
+        pieceBit = 1 << pieceIdx
+        if used & pieceBit:
+            continue
+        for origin,originShapes in enumerate(shapes[pieceIdx]):
+            for transIdx,squares in enumerate(originShapes):
+                if squares is not None:
+                    tries += 1
+                    if board.fillSquares(piece.name,pos,squares):
+                        nbPcsPut += 1
+                        if pruner is None or not pruner.isDead(board.emptyRegionSizes(),((1 << len(pieces))-1) & ~(used | pieceBit)):
+                            ret,subTries,subPcsPut = boardPrefixes(board,pieces,shapes,used | pieceBit,depth-1,pruner,prefix+((pieceIdx,origin,transIdx),),ret)
+                            tries += subTries
+                            nbPcsPut += subPcsPut
+                        board.clearSquares(pos,squares)
+    return ret,tries,nbPcsPut
+
+def poolSolve(engine,data,side,startTime,findAll,printSol,prune,pid,tasks,pipe,stopEvent,checkInterval=1024,metered=False,stream=False,memoMemory=None,countOnly=False,strategy="first",checkpointInterval=None,restored=()):
+        """
+        Process of the MultiThreadPuzzleSolver pool: takes from the tasks queue the prefixes of the
+        parts of the search tree to solve, until it gets None, and then sends its results on pipe
+        data is the BitBoard for the "bitboard" and "numpy" engines, and the tuple (board,pieces) for the "board" one
+        The search stops within checkInterval tries once stopEvent is set, and stopEvent is set when
+        the first solution is found if not findAll
+        With metered set, the search collects a SearchMetrics whose summary() is sent with the results
+        With stream set ("bitboard" engine only), each solution is sent on pipe as soon as it is found, encoded
+        by BitBoard.encode(), in a {"solution":data} message, and all solutions are searched whatever findAll
+        With memoMemory set, the search uses a TranspositionCache of this size, whose stats() are sent with the results
+        With countOnly set ("bitboard" engine only), the solutions are only counted with BitBoardSearch.count()
+        strategy is the one of the search, see ordering.newSearch()
+        With checkpointInterval set ("bitboard" and "numpy" engines only), the tasks are (prefix,frontier) tuples, the search
+        is resumed from frontier if not None, each solution is streamed as with stream, and the frontier of the
+        search is sent every checkpointInterval seconds and when stopped, in a {"checkpoint":prefix,"frontier":
+        frontier,"tries":tries,"nbPcsPut":nbPcsPut} message, whose frontier is None once the prefix is solved
+        restored is the list of the solutions of the resumed checkpoint, whose symmetry classes are not searched again
+        """
         tries=0
-        nbSol=0
         nbPcsPut=0
         stop=False
         solutions=[]
-        pos = board.nextAvailablePos()
-        relTrans = piece.relevantTrans()
-        for trans in relTrans:
-            if  ( (side=="front" and trans.isFront()) or (side=="back" and trans.isBack()) or side=="both"):
-                piece.transform(trans)
-                for origin in range(len(piece)):
-                    piece.setOrigin(origin)
-                    newBoard = board.putPiece(piece,pos)
-                    tries += 1
-                    if pipe.poll():
-                        signal = pipe.recv()
-                        if "stop" in signal:
-                            stop = True
-                    if newBoard is not None and not stop:
-                        nbPcsPut+=1
-                        newPieces=deepcopy(pieces)
-                        newPieces.remove(piece)
-                        tries,nbPcsPut,nbSol,stop,solutions = recursiveSolve(newBoard,newPieces,pid,tries,nbPcsPut,nbSol,side,startTime,findAll,printSol,pipe,stop,solutions)
-        pipe.send({"tries":tries,"nbSol":nbSol,"nbPcsPut":nbPcsPut,"solutions":solutions})
-        print("End of process {} after {} with {} sol. found using {} tries and putting {} pieces".format(pid,str(datetime.now()-startTime)[:-7],nbSol,tries,nbPcsPut))
+        if engine in ("bitboard","numpy"):
+            metrics = SearchMetrics() if metered else None
+            search = newSearch(data,engine,strategy,metrics,findAll,printSol,startTime,"process {}".format(pid),prune,checkInterval)
+            search.stopCheck = stopEvent.is_set
+            if checkpointInterval is not None:
+                nextCheckpoint = monotonic()+checkpointInterval
+                def checkpoint(frontier,tries,nbPcsPut,stopped):
+                    nonlocal nextCheckpoint
+                    if stopped or monotonic() >= nextCheckpoint:
+                        pipe.send({"checkpoint":part,"frontier":frontier,"tries":tries,"nbPcsPut":nbPcsPut})
+                        nextCheckpoint = monotonic()+checkpointInterval
+                search.checkpoint = checkpoint
+                search.restoreSolutions(restored)
+            if memoMemory is not None:
+                search.memo = TranspositionCache(memoMemory)
+        else:
+            board = Board(data[0])
+            pieces = data[1]
+            shapes = [piece.shapes(side) for piece in pieces]
+            pruner = None
+            if prune and RegionPruner.isRelevant(pieces,len(board.availablePositions())):
+                pruner = RegionPruner(pieces)
+        nbTasks = 0
+        nbStreamed = 0
+        nbCounted = 0
+        prefix = tasks.get()
+        while prefix is not None and not stop and not stopEvent.is_set():
+            nbTasks += 1
+            if engine in ("bitboard","numpy"):
+                if countOnly:
+                    nbCounted += search.count(prefix)
+                elif checkpointInterval is not None:
+                    part,frontier = prefix
+                    for solution in search.iterSolve(part,frontier):
+                        pipe.send({"solution":solution})
+                        nbStreamed += 1
+                    if not search.stop:
+                        pipe.send({"checkpoint":part,"frontier":None,"tries":search.tries,"nbPcsPut":search.nbPcsPut})
+                elif stream:
+                    for solution in search.iterSolve(prefix):
+                        pipe.send({"solution":solution})
+                        nbStreamed += 1
+                else:
+                    search.solve(prefix)
+                stop = search.stop
+                if stop and not findAll and len(search.solutions):
+                    stopEvent.set()
+            else:
+                used = 0
+                put = []
+                for pieceIdx,origin,transIdx in prefix:
+                    pos = board.nextAvailablePos()
+                    squares = shapes[pieceIdx][origin][transIdx]
+                    board.fillSquares(pieces[pieceIdx].name,pos,squares)
+                    put.append((pos,squares))
+                    used |= 1 << pieceIdx
+                tries,nbPcsPut,nbSol,stop,solutions = recursiveSolve(board,pieces,shapes,used,pid,tries,nbPcsPut,len(solutions),startTime,findAll,printSol,stopEvent,stop,solutions,pruner,checkInterval)
+                for pos,squares in reversed(put):
+                    board.clearSquares(pos,squares)
+            if not stop:
+                prefix = tasks.get()
+        summary = None
+        memoStats = None
+        if engine in ("bitboard","numpy"):
+            tries = search.tries
+            nbPcsPut = search.nbPcsPut
+            solutions = search.solutions
+            if metrics is not None:
+                summary = metrics.summary()
+            if search.memo is not None:
+                memoStats = search.memo.stats()
+        nbSol = len(solutions)+nbStreamed+nbCounted
+        pipe.send({"tries":tries,"nbSol":nbSol,"nbPcsPut":nbPcsPut,"solutions":solutions,"metrics":summary,"memo":memoStats})
+        print("End of process {} after {} with {} sol. found in {} parts of the search using {} tries and putting {} pieces".format(pid,str(datetime.now()-startTime)[:-7],nbSol,nbTasks,tries,nbPcsPut))
 
 class MultiThreadPuzzleSolver():
     """
@@ -68,16 +181,57 @@ class MultiThreadPuzzleSolver():
     Its creation requires a Board, and a list of Piece it will try to put on the Board
     The puzzle solving is launch by calling its solve() method, which have the following options:
     - findAll : False by default, set to True if you want the solver run until all solutions
-                have been found
+                have been found. Otherwise only the first solution found is returned, as by PuzzleSolver,
+                although the other processes may print the one they found before being stopped
     - printSol : True by dafault, set to False to not print the solutions as they are found.
     All solutions as always returned as list of Board at the end of execution of all threads
     - sides : "front" by default, set to "back" or "both" depending on how the pieces shall
               be used to solve the puzzle. "front" and "back" definition are related to
               the way each pieces have been defined and the coordinate system of the board
+    - engine : "board" by default, set to "bitboard" to use the much faster BitBoard based solving,
+               or to "numpy" to use it testing pieces positions with NumPy, see PuzzleSolver for details
+    - prune : False by default, set to True to give up boards with holes that can't be filled,
+              see PuzzleSolver for details
+    - nbProcesses : number of processes solving the puzzle, the number of CPU cores by default
+    - splitDepth : 2 by default, number of pieces put before queuing the parts of the search to the processes
+    - timeout : None by default, number of seconds after which all the processes are stopped,
+                returning only the solutions found so far
+    - checkInterval : 1024 by default, number of tries between two checks of the stop signal shared by
+                      all processes, set when the first solution is found (unless findAll), on timeout
+                      or when cancel() is called
+    - symmetry : None by default, "classes" or "all" to search only once the solutions which are the same
+                 once the board is rotated or flipped, see PuzzleSolver. Only available with the "bitboard" engine
+    - metrics : None by default, a SearchMetrics collecting the statistics of the search (see PuzzleSolver),
+                with the summary of each process in its workers attribute and a "worker" event. Each part
+                of the search solved by a process is a branch. The tries done to split the search before
+                starting the processes are not counted in it. Only available with the "bitboard" and "numpy" engines
+    - memo : None by default, a TranspositionCache recording the boards from which no solution can be found,
+             see PuzzleSolver. Each process uses its own cache of the same size, and their stats are added
+             to this one. Only available with the "bitboard" and "numpy" engines
+    - strategy : "first" by default, the order in which the pieces and squares are tried, see PuzzleSolver.
+                 With "constrained", the search is split on the squares chosen by this strategy.
+                 Only available with the "bitboard" and "numpy" engines, and "constrained" only with the
+                 "bitboard" one
+    - checkpoint, checkpointInterval and resume : write the state of the search to a checkpoint file every
+                 checkpointInterval seconds, and resume the search from a checkpoint file, see PuzzleSolver.
+                 The state is the frontier of the search of each part of the search tree being solved, the
+                 parts solved and the solutions found. The same splitDepth has to be used to resume.
+                 Only available with the "bitboard" and "numpy" engines
+    - cacheDir : None by default, a directory in which the placements of the pieces are compiled once, see
+                 PuzzleSolver. The processes started without fork (e.g. on macOS and Windows) then read them
+                 from the compiled file instead of receiving them all. Only used by the "bitboard" and "numpy" engines
       The solve() method returns a tuple containing:
           - The solutions as list of Board objects
           - The number of tries used (tries to put a piece on a square)
           - The number of pieces successfully put on the puzzle board
+    The count() method takes the same options as iterSolutions(), except symmetry and metrics, and only counts
+    the solutions in each process, without building nor sending them (see PuzzleSolver.count()). It
+    returns the same tuple as PuzzleSolver.count(), the numbers of all processes being added.
+    The iterSolutions() generator takes the same options, except findAll, printSol and engine, and solves
+    with the "bitboard" engine, yielding each solution encoded by BitBoard.encode() as soon as a process
+    finds it, so solutions are neither kept in memory nor sent at once at the end (see decode()).
+    Stopping the iteration stops all the processes, and the numbers of tries and pieces put are in
+    the tries and nbPcsPut attributes once the iteration has ended.
     Using this version of the puzzle solver is interesting on multi-core system, because on single
     core system, the use of multiple threads on a single core may slow down the solving of the puzzle
     """
@@ -88,41 +242,209 @@ class MultiThreadPuzzleSolver():
         self._processes = []
         self._findAll=False
         self._printSol=False
+        self._stopEvent = mp.Event()
+
+    def cancel(self):
+        """
+        Stop all the processes of a running solve() (e.g. from another thread or a signal handler),
+        which then returns the solutions found so far
+        """
+        self._stopEvent.set()
         
-    def solve(self,findAll=False,printSol=True,sides="front"):
-        self._sides = sides
+    def solve(self,findAll=False,printSol=True,sides="front",engine="board",prune=False,nbProcesses=None,splitDepth=2,timeout=None,checkInterval=1024,symmetry=None,metrics=None,memo=None,strategy="first",checkpoint=None,checkpointInterval=60,resume=None,cacheDir=None):
         self._findAll = findAll
         self._printSol=printSol
+        solutions = []
+        checkpointed = checkpoint is not None or resume is not None
+        for solution in self._run(sides,engine,prune,nbProcesses,splitDepth,timeout,checkInterval,symmetry,metrics,solutions,False,memo,False,strategy,checkpoint,checkpointInterval,resume,cacheDir):
+            # With checkpoints, the solutions are streamed by the processes, and only the first one is kept
+            # unless findAll, as by PuzzleSolver
+            if solutions and not findAll:
+                continue
+            board = self._bitboard.decode(solution)
+            if printSol:
+                print("\nSolution found in {}:".format(str(datetime.now()-self._startTime)[:-7]))
+                print(board,flush=True)
+            solutions.append(board)
+        if checkpointed:
+            solutions[:0] = [self._bitboard.decode(solution) for solution in self._restored]
+            if not findAll:
+                del solutions[1:]
+        return solutions,self.tries,self.nbPcsPut
+
+    def count(self,sides="front",prune=False,nbProcesses=None,splitDepth=2,timeout=None,checkInterval=1024,memo=None,cacheDir=None):
+        self._findAll = True
+        self._printSol = False
+        for solution in self._run(sides,"bitboard",prune,nbProcesses,splitDepth,timeout,checkInterval,None,None,[],False,memo,True,cacheDir=cacheDir):
+            pass
+        return self.nbSolutions,self.tries,self.nbPcsPut
+
+    def iterSolutions(self,sides="front",prune=False,nbProcesses=None,splitDepth=2,timeout=None,checkInterval=1024,symmetry=None,metrics=None,cacheDir=None):
+        self._findAll = True
+        self._printSol = False
+        return self._run(sides,"bitboard",prune,nbProcesses,splitDepth,timeout,checkInterval,symmetry,metrics,[],True,cacheDir=cacheDir)
+
+    def decode(self,solution):
+        """
+        Return the Board of a solution yielded by iterSolutions()
+        """
+        return self._bitboard.decode(solution)
+
+    def _run(self,sides,engine,prune,nbProcesses,splitDepth,timeout,checkInterval,symmetry,metrics,solutions,stream,memo=None,countOnly=False,strategy="first",checkpoint=None,checkpointInterval=60,resume=None,cacheDir=None):
+        """
+        Generator running the processes, which adds the solutions they return to solutions, and yields
+        the ones they stream
+        With checkpoint or resume, the solutions are streamed, and each one is yielded once the frontier
+        sent after it is recorded in the checkpoint, the ones of the resumed checkpoint being in _restored
+        """
+        self._sides = sides
         self._startTime = datetime.now()
-        for piece in self._pieces:
+        if nbProcesses is None:
+            nbProcesses = os.cpu_count() or 1
+        self._stopEvent.clear()
+        deadline = None
+        if timeout is not None:
+            deadline = monotonic()+timeout
+        if metrics is not None:
+            metrics.start()
+        checkpointed = checkpoint is not None or resume is not None
+        if engine in ("bitboard","numpy"):
+            data = bitBoard(self._board,orderPieces(self._board,self._pieces,self._sides,strategy),self._sides,symmetry,cacheDir)
+            self._bitboard = data
+            # A NumpyBitBoardSearch splits the search the same way, and fails here if NumPy is missing
+            search = newSearch(data,engine,strategy,prune=prune)
+            prefixes = search.prefixes(splitDepth)
+            splitTries,splitPcsPut = search.tries,search.nbPcsPut
+        elif engine == "board":
+            if symmetry is not None:
+                raise ValueError("The symmetry option requires the bitboard engine")
+            if metrics is not None:
+                raise ValueError("The metrics option requires the bitboard engine")
+            if strategy != "first":
+                raise ValueError("The strategy option requires the bitboard or numpy engine")
+            if memo is not None or checkpointed:
+                raise ValueError("The memo, checkpoint and resume options require the bitboard or numpy engine")
+            data = (self._board,self._pieces)
+            pruner = None
+            if prune and RegionPruner.isRelevant(self._pieces,len(self._board.availablePositions())):
+                pruner = RegionPruner(self._pieces)
+            shapes = [piece.shapes(self._sides) for piece in self._pieces]
+            prefixes,splitTries,splitPcsPut = boardPrefixes(Board(self._board),self._pieces,shapes,0,splitDepth,pruner)
+        else:
+            raise ValueError("Unknown solving engine '{}'".format(engine))
+        state = None
+        if checkpointed:
+            state = Checkpoint(fingerprint(data,prune,engine,strategy == "constrained",splitDepth),len(data.positions))
+            state.tries,state.nbPcsPut = splitTries,splitPcsPut
+            if resume is not None:
+                saved = Checkpoint.load(resume)
+                if saved.fingerprint != state.fingerprint:
+                    raise ValueError("'{}' is not a checkpoint of this search".format(resume))
+                state = saved
+                # The tries to split the search are already counted in the checkpoint
+                splitTries,splitPcsPut = state.tries,state.nbPcsPut
+            self._restored = list(state.solutions)
+            prefixes = [(prefix,state.frontiers.get(prefix)) for prefix in prefixes if prefix not in state.done]
+            # Tries and pieces put of each process when it sent its last frontier
+            committed = {}
+            nextSave = monotonic()+checkpointInterval
+        tasks = mp.Queue()
+        for prefix in prefixes:
+            tasks.put(prefix)
+        for pid in range(min(nbProcesses,len(prefixes))):
+                tasks.put(None)
                 parentPipe, childPipe= mp.Pipe()
-                p = mp.Process(target=pieceSolve, \
-                    args=(self._board,self._pieces,piece,self._sides,self._startTime,self._findAll,self._printSol,len(self._processes),childPipe))
-                self._processes.append({"proc":p,"pipe":parentPipe})
+                p = mp.Process(target=poolSolve, \
+                    args=(engine,data,self._sides,self._startTime,self._findAll,self._printSol,prune,pid,tasks,childPipe,self._stopEvent,checkInterval,metrics is not None,stream,None if memo is None else memo.maxMemory,countOnly,strategy,checkpointInterval if checkpointed else None,self._restored if checkpointed and symmetry is not None else ()))
+                self._processes.append({"proc":p,"pipe":parentPipe,"pid":pid,"pending":[]})
                 p.start()
-        tries = 0
+        self.tries = splitTries
+        self.nbPcsPut = splitPcsPut
         nbSol = 0
-        nbPcsPut = 0
-        solutions = []
-        while len(self._processes):
-            stoppedProc = []
-            for p in self._processes:
-                if p["pipe"].poll():
-                    answer = p["pipe"].recv()
-                    if "tries" in answer:
-                        tries += answer["tries"]
-                        nbSol += answer["nbSol"]
-                        nbPcsPut += answer["nbPcsPut"]
-                        solutions.extend(answer["solutions"])
-                        stoppedProc.append(p)
-                    elif "stop" in answer:
-                        for p in self._processes:
-                            if p["proc"].is_alive():
-                                try:
-                                    p["pipe"].send({"stop":True})
-                                except BrokenPipeError:
-                                    pass#process terminated since is_alive() called
-            sleep(1)
-            for p in stoppedProc:
-                self._processes.remove(p)
-        return solutions,tries,nbPcsPut
\ No newline at end of file
+        try:
+            while len(self._processes):
+                # Wait until a process sends its results or ends, without delaying any message
+                waitTimeout = None
+                if deadline is not None:
+                    waitTimeout = max(0,deadline-monotonic())
+                ready = wait([p["pipe"] for p in self._processes]+[p["proc"].sentinel for p in self._processes],waitTimeout)
+                if deadline is not None and monotonic() >= deadline:
+                    print("Timeout reached after {} seconds, stopping all processes".format(timeout))
+                    self._stopEvent.set()
+                    deadline = None
+                stoppedProc = []
+                for p in self._processes:
+                    if p["pipe"] in ready or p["proc"].sentinel in ready:
+                        answer = None
+                        ended = False
+                        try:
+                            # Streamed solutions come before the results
+                            while answer is None and p["pipe"].poll():
+                                answer = p["pipe"].recv()
+                                if "solution" in answer:
+                                    if state is None:
+                                        yield answer["solution"]
+                                    else:
+                                        p["pending"].append(answer["solution"])
+                                        if not self._findAll:
+                                            self._stopEvent.set()
+                                    answer = None
+                                elif "checkpoint" in answer:
+                                    # The solutions found before a frontier are recorded with it
+                                    if answer["frontier"] is None:
+                                        state.done.add(answer["checkpoint"])
+                                        state.frontiers.pop(answer["checkpoint"],None)
+                                    else:
+                                        state.frontiers[answer["checkpoint"]] = answer["frontier"]
+                                    state.solutions.extend(p["pending"])
+                                    committed[p["pid"]] = (answer["tries"],answer["nbPcsPut"])
+                                    state.tries = splitTries+sum(tries for tries,nbPcsPut in committed.values())
+                                    state.nbPcsPut = splitPcsPut+sum(nbPcsPut for tries,nbPcsPut in committed.values())
+                                    if checkpoint is not None and monotonic() >= nextSave:
+                                        state.save(checkpoint)
+                                        nextSave = monotonic()+checkpointInterval
+                                    for solution in p["pending"]:
+                                        yield solution
+                                    p["pending"] = []
+                                    answer = None
+                        except EOFError:
+                            ended = True
+                        if answer is None:
+                            if ended or (not p["proc"].is_alive() and not p["pipe"].poll()):
+                                print("Process {} ended without sending its results".format(p["pid"]))
+                                stoppedProc.append(p)
+                        else:
+                            self.tries += answer["tries"]
+                            nbSol += answer["nbSol"]
+                            self.nbPcsPut += answer["nbPcsPut"]
+                            # Other processes may find a solution before being stopped: unless findAll, only
+                            # the solutions of the first one are kept, with their images when symmetry is "all"
+                            if self._findAll or not solutions:
+                                solutions.extend(answer["solutions"])
+                            if metrics is not None and answer["metrics"] is not None:
+                                metrics.addWorker(p["pid"],answer["metrics"])
+                            if memo is not None and answer["memo"] is not None:
+                                memo.addStats(answer["memo"])
+                            stoppedProc.append(p)
+                for p in stoppedProc:
+                    p["proc"].join()
+                    self._processes.remove(p)
+                    # Solutions sent by a process which stopped before sending their frontier are not recorded
+                    for solution in p["pending"]:
+                        yield solution
+        finally:
+            # Stopped by the caller of iterSolutions() before the end
+            if len(self._processes):
+                self._stopEvent.set()
+                for p in self._processes:
+                    p["proc"].terminate()
+                    p["proc"].join()
+                del self._processes[:]
+            # Parts of the search tree left when stopped at the first solution are not needed anymore
+            tasks.close()
+            tasks.cancel_join_thread()
+        self.nbSolutions = nbSol
+        if checkpoint is not None:
+            state.save(checkpoint)
+        if metrics is not None:
+            metrics.end(nbSol)
@@ -0,0 +1,71 @@
+from bitboard import BitBoardSearch
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class NumpyBitBoardSearch(BitBoardSearch):
+    """
+    This class is a BitBoardSearch testing at once, with NumPy, all the placements anchored on the
+    first available square, instead of testing them one by one
+    For each square, the placements anchored on it are kept as an array of 64 bits words (one per
+    placement, with a bit per piece and per board square from this one), and the filled squares and
+    put pieces as one word, so the placements of the remaining pieces which fit are found with a single
+    AND, and the search only tries them (see _candidates()). As the BitBoardSearch tests are already
+    single integer operations, this mostly pays off when there are many placements per square.
+    NumPy is optional: creating this class raises ImportError when it is not installed.
+    It has the same options as BitBoardSearch, and finds the same solutions after the same numbers of
+    tries and pieces put (except when stopped, as the tries of a square are counted at once).
+    """
+    def __init__(self,bitboard,findAll=False,printSol=True,startTime=None,name=None,prune=False,checkInterval=1024):
+        if np is None:
+            raise ImportError("NumpyBitBoardSearch requires NumPy")
+        super().__init__(bitboard,findAll,printSol,startTime,name,prune,checkInterval)
+        nbPieces = len(bitboard.pieces)
+        # Placements cover no square before the one they are anchored on, so the lines of a square only
+        # keep the squares from it, after the pieces: nbWords is the number of 64 bits words they need
+        width = max([nbPieces+(mask >> square).bit_length() for square,candidates in enumerate(bitboard.candidates) for pieceIdx,pieceBit,mask in candidates]+[1])
+        self._nbWords = (width+63)//64
+        # arrays[square] is (covers,counts,candidates,tries) for the placements of bitboard.candidates[square]:
+        # the piece and the squares each one covers, as one line of nbWords words (a single word when
+        # nbWords is 1), the number of placements of each piece as (pieceBit,count), the placements as an
+        # array, and the number of placements of the remaining pieces by remaining, filled by the search
+        self._arrays = []
+        for square,candidates in enumerate(bitboard.candidates):
+            covers = np.array([self._words(pieceBit | ((mask >> square) << nbPieces)) for pieceIdx,pieceBit,mask in candidates],dtype=np.uint64).reshape(len(candidates),self._nbWords)
+            if self._nbWords == 1:
+                covers = covers[:,0].copy()
+            counts = {}
+            for pieceIdx,pieceBit,mask in candidates:
+                counts[pieceBit] = counts.get(pieceBit,0)+1
+            placements = np.empty(len(candidates),dtype=object)
+            placements[:] = candidates
+            self._arrays.append((covers,list(counts.items()),placements,{}))
+        # The fitting candidates are all of remaining pieces, so the end of their runs is never used
+        self._ends = list(range(1,max([len(candidates) for candidates in bitboard.candidates]+[0])+1))
+
+    def _words(self,bits):
+        """
+        Return the list of the nbWords 64 bits words of bits, lowest first
+        """
+        return [(bits >> (64*word)) & 0xFFFFFFFFFFFFFFFF for word in range(self._nbWords)]
+
+    def _candidates(self,occupied,remaining):
+        bitboard = self.bitboard
+        free = bitboard.full & ~occupied
+        if not free:
+            return None
+        square = (free & -free).bit_length()-1
+        covers,counts,placements,tries = self._arrays[square]
+        # Pieces put and squares filled, a placement fits when it covers none of them
+        state = (bitboard.allPieces & ~remaining) | ((occupied >> square) << len(bitboard.pieces))
+        if self._nbWords == 1:
+            fitting = placements[np.logical_not(covers & (state & 0xFFFFFFFFFFFFFFFF))].tolist()
+        else:
+            fitting = placements[np.logical_not((covers & np.array(self._words(state),dtype=np.uint64)).any(axis=1))].tolist()
+        # The placements which don't fit are counted as tries at once, _next() counts the other ones
+        nbTries = tries.get(remaining)
+        if nbTries is None:
+            nbTries = tries[remaining] = sum(count for pieceBit,count in counts if remaining & pieceBit)
+        self.tries += nbTries-len(fitting)
+        return fitting,self._ends
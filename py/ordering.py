@@ -0,0 +1,174 @@
+from bitboard import BitBoard, BitBoardSearch, MeteredBitBoardSearch, runEnds
+from numpysearch import NumpyBitBoardSearch
+from placement import PlacementIndex
+from pruning import RegionPruner
+
+# Ordering strategies of the solvers:
+# - "first" : the pieces are tried in the order of their list on the first available square
+# - "largest" : the largest pieces are tried first, the ones with fewer placements first when of the same size
+# - "rarest" : the pieces with the fewest placements on the board are tried first
+# - "learned" : the pieces which fit the least often during a short probe search are tried first
+# - "constrained" : the pieces are tried in the order of their list, on the available square which has
+#                   the fewest placements fitting, instead of the first one (see ConstrainedBitBoardSearch)
+STRATEGIES = ("first","largest","rarest","learned","constrained")
+
+def orderPieces(board,pieces,sides="front",strategy="first",probeTries=5000):
+    """
+    Return the list of pieces in the order in which the strategy tries them
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError("Unknown strategy option '{}'".format(strategy))
+    if strategy in ("first","constrained"):
+        return list(pieces)
+    if strategy == "learned":
+        fitRates = probeFitRates(board,pieces,sides,probeTries)
+        order = sorted(range(len(pieces)),key=lambda pieceIdx: fitRates[pieceIdx])
+    else:
+        index = PlacementIndex(board,pieces,sides)
+        nbPlacements = [0]*len(pieces)
+        for placement in index.allPlacements():
+            nbPlacements[placement.piece] += 1
+        if strategy == "largest":
+            order = sorted(range(len(pieces)),key=lambda pieceIdx: (-len(pieces[pieceIdx]),nbPlacements[pieceIdx]))
+        else:
+            order = sorted(range(len(pieces)),key=lambda pieceIdx: (nbPlacements[pieceIdx],-len(pieces[pieceIdx])))
+    return [pieces[pieceIdx] for pieceIdx in order]
+
+# MeteredBitBoardSearch combined with the other searches, by search class
+_meteredClasses = {BitBoardSearch:MeteredBitBoardSearch}
+
+def newSearch(bitboard,engine="bitboard",strategy="first",metrics=None,findAll=False,printSol=True,startTime=None,name=None,prune=False,checkInterval=1024):
+    """
+    Return the search of bitboard of the solvers: a NumpyBitBoardSearch for the "numpy" engine, a
+    ConstrainedBitBoardSearch for the "constrained" strategy and a BitBoardSearch otherwise, collecting
+    metrics in the SearchMetrics if given (see MeteredBitBoardSearch), with the options of BitBoardSearch
+    """
+    if engine == "numpy":
+        if strategy == "constrained":
+            raise ValueError("The constrained strategy requires the bitboard engine")
+        searchClass = NumpyBitBoardSearch
+    elif strategy == "constrained":
+        searchClass = ConstrainedBitBoardSearch
+    else:
+        searchClass = BitBoardSearch
+    if metrics is None:
+        return searchClass(bitboard,findAll,printSol,startTime,name,prune,checkInterval)
+    if searchClass not in _meteredClasses:
+        # The metrics are collected by the steps of MeteredBitBoardSearch, around the ones of the search
+        _meteredClasses[searchClass] = type("Metered"+searchClass.__name__,(MeteredBitBoardSearch,searchClass),{})
+    return _meteredClasses[searchClass](bitboard,metrics,findAll,printSol,startTime,name,prune,checkInterval)
+
+def probeFitRates(board,pieces,sides="front",probeTries=5000):
+    """
+    Run the search for about probeTries tries, and return for each piece the part of its tries
+    in which it fitted: the pieces which fit the least often are the hardest ones to put
+    """
+    search = _ProbeSearch(BitBoard(board,pieces,sides),findAll=True,printSol=False,checkInterval=min(probeTries,1024))
+    search.stopCheck = lambda: search.tries >= probeTries
+    search.solve()
+    return [puts/tries if tries else 1 for tries,puts in zip(search.pieceTries,search.piecePuts)]
+
+class _ProbeSearch(BitBoardSearch):
+    """
+    BitBoardSearch counting the tries and pieces put of each piece, for probeFitRates()
+    """
+    def __init__(self,bitboard,findAll=False,printSol=True,startTime=None,name=None,prune=False,checkInterval=1024):
+        super().__init__(bitboard,findAll,printSol,startTime,name,prune,checkInterval)
+        self.pieceTries = [0]*len(bitboard.pieces)
+        self.piecePuts = [0]*len(bitboard.pieces)
+
+    def _next(self,frame):
+        occupied,remaining,candidates,ends,start = frame[:5]
+        candidate = super()._next(frame)
+        for pieceIdx,pieceBit,mask in candidates[start:frame[4]]:
+            if remaining & pieceBit:
+                self.pieceTries[pieceIdx] += 1
+                if not occupied & mask:
+                    self.piecePuts[pieceIdx] += 1
+        return candidate
+
+class ConstrainedBitBoardSearch(BitBoardSearch):
+    """
+    This class is the BitBoardSearch of the "constrained" strategy: instead of the first available
+    square, it fills the available square on which the fewest placements of the remaining pieces fit,
+    and gives up a board as soon as a square has none.
+    For each square, all the placements covering it (and not only the ones anchored on it) are listed
+    once, so counting the ones which fit costs much more than a try, but the search tree is much smaller,
+    which mostly pays off to find the first solution.
+    The pieces have to fill all the board squares, otherwise ValueError is raised.
+    It has the same options as BitBoardSearch, and its prefixes() tuples are of (pieceIdx,placementIdx)
+    where placementIdx is the number of the placement among the ones covering the square filled.
+    """
+    def __init__(self,bitboard,findAll=False,printSol=True,startTime=None,name=None,prune=False,checkInterval=1024):
+        if not RegionPruner.isRelevant(bitboard.pieces,len(bitboard.positions)):
+            raise ValueError("The constrained strategy requires the pieces to fill all the board squares")
+        super().__init__(bitboard,findAll,printSol,startTime,name,prune,checkInterval)
+        # covering[square] is the list of (pieceIdx,pieceBit,mask) of the placements covering square
+        self.covering = [[] for pos in bitboard.positions]
+        for candidates in bitboard.candidates:
+            for candidate in candidates:
+                for square in bitboard.maskSquares(candidate[2]):
+                    self.covering[square].append(candidate)
+        for covering in self.covering:
+            covering.sort(key=lambda candidate: candidate[0])
+        self.coveringEnds = [runEnds(covering) for covering in self.covering]
+
+    def _square(self,occupied,remaining):
+        """
+        Return the available square with the fewest placements fitting, None if one has none
+        """
+        best = None
+        bestCount = None
+        free = self.bitboard.full & ~occupied
+        while free:
+            bit = free & -free
+            free ^= bit
+            square = bit.bit_length()-1
+            count = 0
+            for pieceIdx,pieceBit,mask in self.covering[square]:
+                if remaining & pieceBit and not occupied & mask:
+                    count += 1
+                    if count == bestCount:
+                        break
+            if bestCount is None or count < bestCount:
+                if not count:
+                    return None
+                best = square
+                bestCount = count
+        return best
+
+    def _putPrefix(self,prefix):
+        occupied = 0
+        remaining = self.bitboard.allPieces
+        for pieceIdx,placementIdx in prefix:
+            mask = self.covering[self._square(occupied,remaining)][placementIdx][2]
+            self._placed.append((pieceIdx,mask))
+            occupied |= mask
+            remaining &= ~(1 << pieceIdx)
+        self._nextCheck = self.tries
+        return occupied,remaining
+
+    def _prefixes(self,occupied,remaining,depth,prefix,ret):
+        if not depth or not remaining:
+            ret.append(prefix)
+            return
+        square = self._square(occupied,remaining)
+        if square is None:
+            return
+        for placementIdx,(pieceIdx,pieceBit,mask) in enumerate(self.covering[square]):
+            if remaining & pieceBit:
+                self.tries += 1
+                if not occupied & mask:
+                    self.nbPcsPut += 1
+                    if self.pruner is not None and self.pruner.isDead(self.bitboard.regionSizes(occupied | mask),remaining & ~pieceBit):
+                        continue
+                    self._prefixes(occupied | mask,remaining & ~pieceBit,depth-1,prefix+((pieceIdx,placementIdx),),ret)
+
+    def _candidates(self,occupied,remaining):
+        square = self._square(occupied,remaining)
+        if square is None:
+            return None
+        return self.covering[square],self.coveringEnds[square]
+
+    def _move(self,occupied,remaining,pieceIdx,mask):
+        return (pieceIdx,[candidate[2] for candidate in self.covering[self._square(occupied,remaining)]].index(mask))
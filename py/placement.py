@@ -0,0 +1,80 @@
+from collections import namedtuple
+
+# One way to put a piece on the board:
+# - piece : number of the piece in the list of pieces
+# - trans and origin : the Trans and origin to set on the Piece to put it this way with Board.putPiece
+# - squares : numbers of the board squares covered, as numbered by PlacementIndex
+# - mask : the same squares as bits of an integer
+Placement = namedtuple("Placement",["piece","trans","origin","squares","mask"])
+
+class PlacementIndex():
+    """
+    This class lists, once for a given board, all the ways each piece can be put on it
+    The available squares of the board are numbered in the order Board.nextAvailablePos()
+    runs through them, and the placements are indexed by the square they are anchored on,
+    which is the first of their squares in this order.
+    When the solver puts a piece on the first available square, all the squares before it
+    are already filled, so the only placements which can fit are the ones anchored on it:
+    for each transformation of a piece, only one origin (its first square) has to be tried,
+    and placements hitting a square out of the board are never listed.
+    As the pieces are always put on the first available square, the placements depend only
+    on the board geometry and can be computed before solving instead of at each try.
+    - anchored[square][pieceIdx] is the list of Placement of the piece anchored on square
+    - positions[square] is the board position (as given by Board.nextAvailablePos()) of square
+    """
+    def __init__(self,board,pieces,sides="front"):
+        self.pieces = pieces
+        self.sides = sides
+        self.positions = board.availablePositions()
+        self._squares = {(pos.x,pos.y):square for square,pos in enumerate(self.positions)}
+        self.anchored = [[[] for piece in pieces] for pos in self.positions]
+        for pieceIdx,piece in enumerate(pieces):
+            self._listPlacements(pieceIdx,piece)
+
+    def _listPlacements(self,pieceIdx,piece):
+        shapes = []
+        for trans in piece.relevantTrans():
+            if trans.isOnSide(self.sides):
+                squares = piece.squares(trans)
+                # The anchor is the first square in the lines order of the board
+                origin = min(range(len(squares)),key=lambda idx: (squares[idx].y,squares[idx].x))
+                shapes.append((origin,trans,piece.squares(trans,origin)))
+        shapes.sort(key=lambda shape: (shape[0],shape[1].value))
+        for anchor,pos in enumerate(self.positions):
+            covered = set()
+            for origin,trans,offsets in shapes:
+                squares = self.squaresAt(offsets,pos)
+                if squares is not None and frozenset(squares) not in covered:
+                    covered.add(frozenset(squares))
+                    mask = 0
+                    for square in squares:
+                        mask |= 1 << square
+                    self.anchored[anchor][pieceIdx].append(Placement(pieceIdx,trans,origin,squares,mask))
+
+    def squaresAt(self,offsets,pos):
+        """
+        Return the tuple of square numbers of the offsets moved to pos, or None if one of them is not available
+        """
+        squares = []
+        for offset in offsets:
+            square = self._squares.get((pos.x+offset.x,pos.y+offset.y))
+            if square is None:
+                return None
+            squares.append(square)
+        return tuple(squares)
+
+    def square(self,pos):
+        """
+        Return the number of the available square at pos, or None if it is not an available square
+        """
+        return self._squares.get((pos.x,pos.y))
+
+    def allPlacements(self):
+        """
+        Return the list of all the placements of all pieces on the board
+        Each placement is anchored on exactly one square, so none is listed twice
+        """
+        return [placement for square in self.anchored for placements in square for placement in placements]
+
+    def __len__(self):
+        return len(self.positions)
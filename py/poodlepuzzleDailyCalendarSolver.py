@@ -59,6 +59,6 @@ if __name__ == "__main__":
         solver = PuzzleSolver(puzzle,pieces)
         print("Start multithreads solving puzzle for {}".format(prettyDate))
         starttime = datetime.now()
-        solutions,tries,nbPcsPut= solver.solve(findAll=True,printSol=True,sides="both")
+        solutions,tries,nbPcsPut= solver.solve(findAll=True,printSol=True,sides="both",engine="bitboard")
         print("{} solutions found for {} in {} after {} tries and placing {} pieces".format(len(solutions),prettyDate,datetime.now() - starttime,tries,nbPcsPut))
      
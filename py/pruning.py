@@ -0,0 +1,52 @@
+class RegionPruner():
+    """
+    This class tells when a partially filled board can no longer be solved because of its holes
+    The available squares of a board are split into regions (groups of squares connected by
+    their sides), and as a piece can't be split between two regions, each region has to be
+    exactly filled by some of the remaining pieces: a board is dead as soon as one region is
+    smaller than the smallest remaining piece, or if its size is not a sum of remaining pieces sizes.
+    This check is only relevant when all the pieces shall be put to fill all the board squares,
+    see isRelevant().
+    Pieces are given by their numbers, and remaining pieces as a mask of piece numbers.
+    The sums of sizes reachable with each remaining pieces mask are computed once and cached.
+    """
+    def __init__(self,pieces):
+        self._sizes = [len(piece) for piece in pieces]
+        self._sums = {}
+        self.prunes = 0
+
+    @staticmethod
+    def isRelevant(pieces,nbSquares):
+        """
+        Tell if the pieces have to fill exactly the nbSquares available squares of the board
+        """
+        return sum(len(piece) for piece in pieces) == nbSquares
+
+    def _reachableSums(self,remaining):
+        """
+        Return the smallest remaining piece size, and the sums of remaining pieces sizes as
+        an integer in which bit number n is set when n is reachable
+        """
+        ret = self._sums.get(remaining)
+        if ret is None:
+            sums = 1
+            smallest = None
+            for pieceIdx,size in enumerate(self._sizes):
+                if remaining & (1 << pieceIdx):
+                    sums |= sums << size
+                    if smallest is None or size < smallest:
+                        smallest = size
+            ret = (smallest,sums)
+            self._sums[remaining] = ret
+        return ret
+
+    def isDead(self,regionSizes,remaining):
+        """
+        Tell if the regions of the given sizes can't be filled by the remaining pieces
+        """
+        smallest,sums = self._reachableSums(remaining)
+        for size in regionSizes:
+            if smallest is None or size < smallest or not (sums >> size) & 1:
+                self.prunes += 1
+                return True
+        return False
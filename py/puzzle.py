@@ -1,27 +1,73 @@
 from enum import Enum
 from copy import deepcopy
+import warnings
 
 class Coordinate():
     """
     Class representing a coordinate on the puzzle board
+    Coordinates are immutable and interned: Coordinate(x,y) returns the same object each time it is
+    called with the same x and y, so the positions walked by the solvers are never allocated again,
+    and are compared by identity before their x and y. They are hashable, and a Vector is equal to
+    the Coordinate with the same x and y, with the same hash. moved() returns the Coordinate moved by a
+    vector, and move() is its deprecated alias, as it can't move the coordinate itself anymore.
     """
-    def __init__(self,x=0,y=0):
-        self.x = x
-        self.y = y
-        
+    __slots__ = ("x","y","_hash")
+    # (x,y) -> Coordinate, each subclass having its own
+    _interned = {}
+
+    def __init_subclass__(cls,**kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._interned = {}
+
+    def __new__(cls,x=0,y=0):
+        ret = cls._interned.get((x,y))
+        if ret is None:
+            ret = object.__new__(cls)
+            object.__setattr__(ret,"x",x)
+            object.__setattr__(ret,"y",y)
+            object.__setattr__(ret,"_hash",hash((x,y)))
+            cls._interned[(x,y)] = ret
+        return ret
+
+    def __setattr__(self,name,value):
+        raise AttributeError("{} objects are immutable".format(type(self).__name__))
+
+    def __delattr__(self,name):
+        raise AttributeError("{} objects are immutable".format(type(self).__name__))
+
     def __eq__(self,other):
         """
         required to be able to use == operator on Coordinate object
         """
-        if other is not None and self.x == other.x and self.y == other.y:
-            return True
-        else:
-            return False
-        
+        return self is other or (other is not None and self.x == other.x and self.y == other.y)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Unpickled coordinates are interned in the process reading them
+        return (type(self),(self.x,self.y))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self,memo):
+        return self
+
     def move(self,vector):
-        self.x+=vector.x
-        self.y+=vector.y
-               
+        """
+        Deprecated: return the Coordinate moved by vector, use moved() instead
+        move() used to move the coordinate itself, which an immutable one can't do
+        """
+        warnings.warn("Coordinate.move() does not move the coordinate anymore, use moved()",DeprecationWarning,stacklevel=2)
+        return self.moved(vector)
+
+    def moved(self,vector):
+        """
+        Return the Coordinate moved by vector
+        """
+        return type(self)(self.x+vector.x,self.y+vector.y)
+
     def __repr__(self):
         return "(x={},y={})".format(self.x,self.y)
 
@@ -29,8 +75,7 @@ class Vector(Coordinate):
     """
     Class representing a vector, and used to define a puzzle piece
     """
-    def __init__(self,x=0,y=0):
-        super().__init__(x,y)
+    __slots__ = ()
 
 class Trans(Enum):
     """
@@ -59,6 +104,67 @@ class Trans(Enum):
         else:
             return False
 
+    def isOnSide(self,sides):
+        """
+        Tell if this transformation can be used when solving with the given sides option
+        ("front", "back" or "both")
+        """
+        return (sides=="front" and self.isFront()) or (sides=="back" and self.isBack()) or sides=="both"
+
+    def apply(self,x,y):
+        """
+        Return the x,y coordinates once transformed
+        """
+        xx,xy,yx,yy = _TRANS_MATRICES[self]
+        return xx*x+xy*y,yx*x+yy*y
+
+# Coefficients of the transformations: new x = xx*x+xy*y, new y = yx*x+yy*y
+_TRANS_MATRICES = {
+    Trans.UpFront: (1,0,0,1),
+    Trans.RightFront: (0,1,-1,0),
+    Trans.DownFront: (-1,0,0,-1),
+    Trans.LeftFront: (0,-1,1,0),
+    Trans.UpBack: (-1,0,0,1),
+    Trans.RightBack: (0,1,1,0),
+    Trans.DownBack: (1,0,0,-1),
+    Trans.LeftBack: (0,-1,-1,0),
+}
+
+# Orientations of the piece shapes, computed once per process and shared by all the Piece
+# objects with the same shape, whatever the puzzle they come from:
+# normalized cells of the shape -> tuple of (Trans, normalized cells) of its distinct orientations
+_orientationsCache = {}
+# (vectors of the shape, sides) -> Piece.shapes(sides)
+_shapesCache = {}
+# vectors of the shape -> {Trans: tuple of Vector}, see Piece._transform()
+_transformedCache = {}
+
+def normalizedCells(cells):
+    """
+    Return the frozenset of the (x,y) cells moved so that their smallest x and y are 0,
+    which is the same for all the cells sets only differing by a translation
+    """
+    minX = min(x for x,y in cells)
+    minY = min(y for x,y in cells)
+    return frozenset((x-minX,y-minY) for x,y in cells)
+
+def shapeOrientations(cells):
+    """
+    Return the tuple of (Trans, normalized cells) of the distinct orientations of the shape
+    made of the (x,y) cells, keeping the first Trans giving each of them
+    """
+    key = normalizedCells(cells)
+    ret = _orientationsCache.get(key)
+    if ret is None:
+        orientations = {}
+        for trans in Trans:
+            transCells = normalizedCells([trans.apply(x,y) for x,y in key])
+            if transCells not in orientations:
+                orientations[transCells] = trans
+        ret = tuple((trans,transCells) for transCells,trans in orientations.items())
+        _orientationsCache[key] = ret
+    return ret
+
 class Piece():
     """
     Class used to represent a puzzle piece
@@ -77,10 +183,10 @@ class Piece():
         self._currShape = shape
         self.name = name
         self._origin = 0
-        if len(self._baseShape):
-            self._relevantTrans = self._listRelevantTransform()
-        else:
-            self._relevantTrans = [Trans.UpFront]
+        self._orientations = self._listOrientations()
+        self._relevantTrans = tuple(trans for trans,cells in self._orientations)
+        # Trans -> tuple of the Vector of the shape once transformed, shared by all the pieces of this shape
+        self._transformed = _transformedCache.setdefault(tuple((vect.x,vect.y) for vect in shape),{})
 
     def __repr__(self):
         return "(base={}\ncurrent={}\nname={}\norigin=({})\nrelevantTrans={})".format(self._baseShape,self._currShape,self.name,self._origin,self._relevantTrans)
@@ -117,62 +223,71 @@ class Piece():
     def relevantTrans(self):
         return self._relevantTrans
         
-    def _listRelevantTransform(self):
-        transformedPiecesFrames = []
-        relevantTransform = []
-        for trans in Trans:
-            transPiece = self._transform(trans)
-            minX = 0
-            minY = 0
-            maxX = 0
-            maxY = 0
-            pos  = Coordinate()
-            for vect in transPiece:
-                pos.move(vect)
-                if pos.x>maxX:
-                    maxX=pos.x
-                if pos.x<minX:
-                    minX=pos.x
-                if pos.y>maxY:
-                    maxY=pos.y
-                if pos.y<minY:
-                    minY=pos.y
-            xSpan=maxX-minX
-            ySpan=maxY-minY
-            pos=Coordinate(-minX,-minY)
-            transPieceFrame=[[0 for x in range(xSpan+1)] for y in range(ySpan+1)]
-            transPieceFrame[pos.y][pos.x]=1
-            for vect in transPiece:
-                pos.move(vect)
-                transPieceFrame[pos.y][pos.x]=1
-            if transPieceFrame not in transformedPiecesFrames:
-                transformedPiecesFrames.append(transPieceFrame)
-                relevantTransform.append(trans)
-        return relevantTransform
-        
+    def orientations(self):
+        """
+        Return the tuple of (Trans, normalized cells) of the distinct orientations of the piece,
+        the cells being (x,y) tuples, in the order of relevantTrans()
+        """
+        return self._orientations
+
+    def _listOrientations(self):
+        pos = (0,0)
+        cells = [pos]
+        for vect in self._baseShape:
+            pos = (pos[0]+vect.x,pos[1]+vect.y)
+            cells.append(pos)
+        return shapeOrientations(cells)
+
+    def __deepcopy__(self,memo):
+        """
+        Copy the piece shape, but share its orientations, which are never modified
+        """
+        ret = Piece.__new__(Piece)
+        ret.__dict__.update(self.__dict__)
+        ret._baseShape = deepcopy(self._baseShape,memo)
+        ret._currShape = ret._baseShape if self._currShape is self._baseShape else deepcopy(self._currShape,memo)
+        return ret
+
     def transform(self,transformation):
         self._currShape = self._transform(transformation)
+
+    def squares(self,transformation,origin=0):
+        """
+        Return the coordinates of all the squares of the piece once transformed,
+        relative to its square number origin (the one put on the position given to Board.putPiece)
+        """
+        x = y = 0
+        cells = [(x,y)]
+        for vect in self._transform(transformation):
+            x += vect.x
+            y += vect.y
+            cells.append((x,y))
+        originX,originY = cells[origin]
+        return [Coordinate(x-originX,y-originY) for x,y in cells]
+
+    def shapes(self,sides="front"):
+        """
+        Return shapes such as shapes[origin][transIdx] is the tuple of squares returned by
+        squares(relevantTrans()[transIdx],origin), or None if this transformation is not on sides
+        Computed once before solving, it gives all the piece positions without modifying the piece
+        with setOrigin() and transform()
+        """
+        key = (tuple((vect.x,vect.y) for vect in self._baseShape),sides)
+        ret = _shapesCache.get(key)
+        if ret is None:
+            ret = tuple(tuple(tuple(self.squares(trans,origin)) if trans.isOnSide(sides) else None for trans in self._relevantTrans) for origin in range(len(self)))
+            _shapesCache[key] = ret
+        return ret
         
     def _transform(self,transformation):
-        newShape = []
-        for coord in self._baseShape:
-            if transformation == Trans.UpFront :
-                newShape.append(coord)
-            if transformation == Trans.RightFront:
-                newShape.append(Vector(coord.y,-coord.x))
-            if transformation == Trans.DownFront:
-                newShape.append(Vector(-coord.x,-coord.y))
-            if transformation == Trans.LeftFront:
-                newShape.append(Vector(-coord.y,coord.x))
-            if transformation == Trans.UpBack :
-                newShape.append(Vector(-coord.x,coord.y))
-            if transformation == Trans.RightBack:
-                newShape.append(Vector(coord.y,coord.x))
-            if transformation == Trans.DownBack:
-                newShape.append(Vector(coord.x,-coord.y))
-            if transformation == Trans.LeftBack:
-                newShape.append(Vector(-coord.y,-coord.x))
-        return newShape
+        """
+        Return the tuple of the Vector of the shape once transformed, computed once per shape
+        """
+        ret = self._transformed.get(transformation)
+        if ret is None:
+            ret = tuple(Vector(*transformation.apply(vect.x,vect.y)) for vect in self._baseShape)
+            self._transformed[transformation] = ret
+        return ret
      
 class Board():
     """
@@ -200,8 +315,8 @@ class Board():
     """
     def __init__(self,board):
         if isinstance(board,Board):
-            #Copy constructor
-            self._board = deepcopy(board._board)
+            #Copy constructor, the squares holding names and labels, which are never modified
+            self._board = [row[:] for row in board._board]
             self._origin = board._origin
         else:
             self._board = board
@@ -287,6 +402,114 @@ class Board():
             vect = piece[idx]
         return newBoard
         
+    def putSquares(self,name,positions):
+        """
+        Return a new Board on which all the squares at positions are filled with name,
+        or None if one of them is not available
+        """
+        newBoard = Board(self)
+        for pos in positions:
+            newBoard = newBoard._putPieceSquare(name,pos)
+            if newBoard is None:
+                return None
+        return newBoard
+
+    def squareAt(self,pos):
+        """
+        Return the content of the square at pos: None if available, or the name of the piece put on it
+        """
+        return self._board[self._origin.y+pos.y][self._origin.x+pos.x]
+
+    def squaresAt(self,positions):
+        """
+        Return the list of the contents of the squares at positions, see squareAt()
+        """
+        board = self._board
+        x,y = self._origin.x,self._origin.y
+        return [board[y+pos.y][x+pos.x] for pos in positions]
+
+    def putNames(self,positions,names):
+        """
+        Return a new Board on which the square at each position is filled with the name at the same index
+        of names, the squares whose name is None being left as they are
+        Unlike putSquares(), the squares are not checked to be available
+        """
+        newBoard = Board(self)
+        board = newBoard._board
+        x,y = self._origin.x,self._origin.y
+        for pos,name in zip(positions,names):
+            if name is not None:
+                board[y+pos.y][x+pos.x] = name
+        return newBoard
+
+    def labelledPositions(self):
+        """
+        Return the list of (position,label) of the squares neither available nor out of the board,
+        i.e. the date squares of a calendar puzzle before any piece is put
+        """
+        ret = []
+        for y in range(len(self._board)):
+            for x in range(len(self._board[y])):
+                if self._board[y][x] is not None and self._board[y][x] != 0:
+                    ret.append((Coordinate(x-self._origin.x,y-self._origin.y),self._board[y][x]))
+        return ret
+
+    def fillSquares(self,name,pos,squares):
+        """
+        Fill with name, on this board, the squares whose coordinates are given relative to pos,
+        if they are all available. Return True if they have been filled, and False if the board is unchanged
+        """
+        x = self._origin.x+pos.x
+        y = self._origin.y+pos.y
+        for square in squares:
+            if self._board[y+square.y][x+square.x] is not None:
+                return False
+        for square in squares:
+            self._board[y+square.y][x+square.x] = name
+        return True
+
+    def clearSquares(self,pos,squares):
+        """
+        Make available again the squares filled by fillSquares()
+        """
+        x = self._origin.x+pos.x
+        y = self._origin.y+pos.y
+        for square in squares:
+            self._board[y+square.y][x+square.x] = None
+
+    def emptyRegionSizes(self):
+        """
+        Return the sizes of all the regions of available squares connected by their sides
+        """
+        sizes = []
+        seen = set()
+        for y in range(len(self._board)):
+            for x in range(len(self._board[y])):
+                if self._board[y][x] is None and (x,y) not in seen:
+                    seen.add((x,y))
+                    toVisit = [(x,y)]
+                    size = 0
+                    while toVisit:
+                        sx,sy = toVisit.pop()
+                        size += 1
+                        for nx,ny in ((sx+1,sy),(sx-1,sy),(sx,sy+1),(sx,sy-1)):
+                            if self._board[ny][nx] is None and (nx,ny) not in seen:
+                                seen.add((nx,ny))
+                                toVisit.append((nx,ny))
+                    sizes.append(size)
+        return sizes
+
+    def availablePositions(self):
+        """
+        Return the positions of all available squares, in the order nextAvailablePos() runs through them
+        """
+        ret = []
+        for y in range(self._origin.y,len(self._board)):
+            for x in range(len(self._board[y])):
+                if self._board[y][x] is None:
+                    ret.append(Coordinate(x-self._origin.x,y-self._origin.y))
+        return ret
+
     def nextAvailablePos(self):
         ret = None
         x=self._origin.x
@@ -0,0 +1,246 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+from importlib import import_module
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import signal
+import sqlite3
+from solver import PuzzleSolver
+from encoding import decodeSolutions
+from batchsolver import PUZZLES, SOLUTIONS_TABLE
+
+def solveBoard(moduleName,day,sides,prune):
+    """
+    Solve one date of a puzzle module with the bitboard engine, and return the number of solutions,
+    tries and pieces put, and the solutions encoded by encodeSolutions()
+    """
+    module = import_module(moduleName)
+    solver = PuzzleSolver(module.GenerateBoard(day),module.CreatePieces())
+    solutions = list(solver.iterSolutions(sides=sides,prune=prune))
+    return len(solutions),solver.tries,solver.nbPcsPut,b"".join(solutions)
+
+def _ignoreInterrupt():
+    # Ctrl-C stops the server, which then stops its processes
+    signal.signal(signal.SIGINT,signal.SIG_IGN)
+
+class SolutionServer():
+    """
+    This class answers queries of the solutions of a date of a calendar puzzle, for a long running
+    local service: query() returns them from an in-memory LRU cache of cacheSize dates, or else from
+    the database (an on-disk cache, in the format written by BatchSolver, so that dates solved by it
+    are served at once), or else solves the date on a pool of nbProcesses processes and stores its
+    solutions in both caches. Concurrent queries of a date being solved wait for the same solve.
+    Its creation takes the following options:
+    - database : None by default, the SQLite database file used as on-disk cache, no disk cache if None
+    - nbProcesses : number of processes solving the dates, the number of CPU cores by default
+    - cacheSize : 256 by default, number of dates kept in memory
+    - prune : True by default, use dead regions pruning when solving, see PuzzleSolver.solve()
+    - puzzles : the puzzles which can be queried, as a dictionary in the format of batchsolver.PUZZLES
+                giving for each puzzle name the module providing GenerateBoard(date) and CreatePieces()
+                and the strftime format of the date parts shown on its board, PUZZLES by default
+    Dates giving the same board (e.g. the same day of two years) share their solutions.
+    count() and solutions() return the number of solutions and their Board, and serve() answers the
+    HTTP requests GET /<puzzle>/<YYYY-MM-DD>/count and GET /<puzzle>/<YYYY-MM-DD>/solutions, with the
+    optional sides (front by default) and limit (number of solutions returned) parameters, and GET /stats.
+    Answers are JSON objects, the solutions being the printed Board, and errors give their message,
+    with status 400 for invalid queries and 500 for failures of the server.
+    The caches and the pool are used from the event loop of the server only, and the database from a
+    thread of its own, so that neither it nor the decoding of the solutions blocks the other queries.
+    """
+    def __init__(self,database=None,nbProcesses=None,cacheSize=256,prune=True,puzzles=PUZZLES):
+        self._puzzles = puzzles
+        self._prune = prune
+        self._cacheSize = cacheSize
+        self._cache = OrderedDict()
+        self._inflight = {}
+        # Processes forked by the server would keep open the connections accepted before, so that
+        # clients would not see them closed: they are started from a fork server when available
+        context = mp.get_context("forkserver") if "forkserver" in mp.get_all_start_methods() else None
+        self._pool = ProcessPoolExecutor(nbProcesses,mp_context=context,initializer=_ignoreInterrupt)
+        self._db = None
+        # A SQLite connection is used from the thread which created it only
+        self._dbThread = ThreadPoolExecutor(1)
+        if database is not None:
+            self._db = self._dbThread.submit(self._connect,database).result()
+        self.hits = 0
+        self.diskHits = 0
+        self.solves = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _connect(database):
+        db = sqlite3.connect(database)
+        db.execute(SOLUTIONS_TABLE)
+        db.commit()
+        return db
+
+    def close(self):
+        self._pool.shutdown()
+        if self._db is not None:
+            self._dbThread.submit(self._db.close).result()
+        self._dbThread.shutdown()
+
+    def stats(self):
+        return {"hits":self.hits,"diskHits":self.diskHits,"solves":self.solves,"coalesced":self.coalesced,"entries":len(self._cache),"inflight":len(self._inflight)}
+
+    def _key(self,puzzle,day,sides):
+        if puzzle not in self._puzzles:
+            raise ValueError("Unknown puzzle '{}'".format(puzzle))
+        if sides not in ("front","back","both"):
+            raise ValueError("Unknown sides '{}'".format(sides))
+        return (puzzle,sides,day.strftime(self._puzzles[puzzle][1]))
+
+    async def query(self,puzzle,day,sides="front"):
+        """
+        Return the number of solutions of the date day of puzzle, and its solutions encoded by encodeSolutions()
+        """
+        key = self._key(puzzle,day,sides)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return entry
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key,day))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        # A query cancelled by its client does not cancel the solve the other queries wait for
+        return await asyncio.shield(task)
+
+    def _read(self,key):
+        return self._db.execute("SELECT nbSolutions,solutions FROM solutions WHERE puzzle=? AND sides=? AND date=?",key).fetchone()
+
+    def _write(self,row):
+        self._db.execute("INSERT OR REPLACE INTO solutions VALUES (?,?,?,?,?,?,?)",row)
+        self._db.commit()
+
+    async def _load(self,key,day):
+        try:
+            entry = None
+            loop = asyncio.get_running_loop()
+            if self._db is not None:
+                row = await loop.run_in_executor(self._dbThread,self._read,key)
+                if row is not None:
+                    self.diskHits += 1
+                    entry = (row[0],row[1])
+            if entry is None:
+                self.solves += 1
+                puzzle,sides,dateKey = key
+                nbSol,tries,nbPcsPut,data = await loop.run_in_executor(self._pool,solveBoard,self._puzzles[puzzle][0],day,sides,self._prune)
+                entry = (nbSol,data)
+                if self._db is not None:
+                    await loop.run_in_executor(self._dbThread,self._write,(puzzle,sides,dateKey,nbSol,tries,nbPcsPut,data))
+            self._cache[key] = entry
+            if len(self._cache) > self._cacheSize:
+                self._cache.popitem(last=False)
+            return entry
+        finally:
+            del self._inflight[key]
+
+    async def count(self,puzzle,day,sides="front"):
+        nbSol,data = await self.query(puzzle,day,sides)
+        return nbSol
+
+    async def solutions(self,puzzle,day,sides="front",limit=None):
+        """
+        Return the list of Board of the solutions of the date day of puzzle, or only the first limit ones
+        """
+        self._checkLimit(limit)
+        nbSol,data = await self.query(puzzle,day,sides)
+        return await asyncio.get_running_loop().run_in_executor(None,self._decode,puzzle,day,data,limit)
+
+    @staticmethod
+    def _checkLimit(limit):
+        if limit is not None and limit < 0:
+            raise ValueError("The limit must not be negative")
+
+    def _decode(self,puzzle,day,data,limit=None):
+        module = import_module(self._puzzles[puzzle][0])
+        board = module.GenerateBoard(day)
+        if limit is not None:
+            data = data[:limit*len(board.availablePositions())]
+        return decodeSolutions(board,module.CreatePieces(),data)
+
+    async def answer(self,path):
+        """
+        Return the HTTP status and the JSON object answering a GET request of path
+        """
+        url = urlsplit(path)
+        params = {name:values[-1] for name,values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["stats"]:
+            return 200,self.stats()
+        if len(parts) != 3 or parts[2] not in ("count","solutions"):
+            return 404,{"error":"Unknown path '{}'".format(url.path)}
+        puzzle,day,what = parts
+        sides = params.get("sides","front")
+        try:
+            day = date.fromisoformat(day)
+            limit = int(params["limit"]) if "limit" in params else None
+            self._checkLimit(limit)
+            nbSol,data = await self.query(puzzle,day,sides)
+        except ValueError as e:
+            return 400,{"error":str(e)}
+        body = {"puzzle":puzzle,"date":day.isoformat(),"sides":sides,"count":nbSol}
+        if what == "solutions":
+            solutions = await asyncio.get_running_loop().run_in_executor(None,self._decode,puzzle,day,data,limit)
+            body["solutions"] = [str(solution) for solution in solutions]
+        return 200,body
+
+    async def _handle(self,reader,writer):
+        try:
+            request = (await reader.readline()).decode("latin-1").split()
+            # Headers are read and ignored
+            while (await reader.readline()) not in (b"\r\n",b"\n",b""):
+                pass
+            if len(request) < 2 or request[0] != "GET":
+                status,body = 405,{"error":"Only GET requests are answered"}
+            else:
+                try:
+                    status,body = await self.answer(request[1])
+                except Exception as e:
+                    # The client is answered whatever went wrong, e.g. a solve failing in its process
+                    status,body = 500,{"error":"{}: {}".format(type(e).__name__,e)}
+            data = json.dumps(body).encode()
+            reason = {200:"OK",400:"Bad Request",404:"Not Found",405:"Method Not Allowed",500:"Internal Server Error"}[status]
+            writer.write("HTTP/1.0 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close\r\n\r\n".format(status,reason,len(data)).encode()+data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self,host="127.0.0.1",port=8080):
+        """
+        Start answering HTTP requests on host and port, and return the asyncio server
+        """
+        return await asyncio.start_server(self._handle,host,port)
+
+    async def serve(self,host="127.0.0.1",port=8080):
+        """
+        Answer HTTP requests on host and port until cancelled
+        """
+        server = await self.start(host,port)
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer HTTP queries of the solutions of the calendar puzzles dates, e.g. GET /poodle/2024-03-05/count?sides=both")
+    parser.add_argument("--host",default="127.0.0.1")
+    parser.add_argument("--port",type=int,default=8080)
+    parser.add_argument("--database",help="SQLite database keeping the solutions found, as written by batchsolver.py")
+    parser.add_argument("--processes",type=int,default=None,help="number of processes, number of CPU cores by default")
+    parser.add_argument("--cache-size",type=int,default=256,help="number of dates kept in memory")
+    args = parser.parse_args()
+    server = SolutionServer(args.database,args.processes,args.cache_size)
+    print("Serving on http://{}:{}/".format(args.host,args.port))
+    try:
+        asyncio.run(server.serve(args.host,args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
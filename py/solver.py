@@ -1,6 +1,12 @@
-from copy import deepcopy
 from datetime import datetime
 from sys import stdout
+from time import monotonic
+from puzzle import Board
+from bitboard import BitBoardSearch
+from pruning import RegionPruner
+from ordering import orderPieces, newSearch
+from checkpoint import Checkpoint, fingerprint
+from compiledpuzzle import bitBoard
 
 class PuzzleSolver():
     """
@@ -14,16 +20,73 @@ class PuzzleSolver():
     - sides : "front" by default, set to "back" or "both" depending on how the pieces shall
               be used to solve the puzzle. "front" and "back" definition are related to
               the way each pieces have been defined and the coordinate system of the board
+    - engine : "board" by default, set to "bitboard" to solve the puzzle on a BitBoard, where all
+               pieces positions are computed once as masks before solving, which is much faster.
+               Both engines find the same solutions, but the "bitboard" one only tries the pieces
+               positions listed by a PlacementIndex, and doesn't print progress.
+               Set to "numpy" to solve on a BitBoard testing with NumPy all the positions of the pieces
+               on a square at once (see NumpyBitBoardSearch), which requires NumPy to be installed
+    - prune : False by default, set to True to give up a board as soon as it has a hole that can't be
+              filled by the remaining pieces (see RegionPruner), instead of when no piece fits anymore
+              on its first available square. Only used when the pieces shall fill all the board squares
+    - timeout : None by default, number of seconds after which the solving stops, returning only
+                the solutions found so far. The time is checked every checkInterval (1024 by default) tries
+    - symmetry : None by default, set to "classes" to search only once the solutions which are the same
+                 once the board is rotated or flipped, returning one solution of each class, or to "all"
+                 to search them the same way, but return all the solutions (see BoardSymmetry).
+                 Only available with the "bitboard" engine
+    - metrics : None by default, a SearchMetrics collecting statistics of the search per depth and per
+                branch, and reporting its progress. Only available with the "bitboard" and "numpy" engines
+    - memo : None by default, a TranspositionCache in which the boards from which no solution can be found
+             are recorded, to give them up at once when the search finds them again, and whose hit rate tells
+             if it is worth using for a puzzle. Only available with the "bitboard" and "numpy" engines
+    - strategy : "first" by default, the order in which the pieces and squares are tried, which mostly changes
+                 how fast the first solution is found. Set to "largest" or "rarest" to try first the largest
+                 pieces or the ones with the fewest placements, to "learned" to try first the pieces which fit
+                 the least often during a short probe search, or to "constrained" to fill the square on which
+                 the fewest placements fit instead of the first available one (see ConstrainedBitBoardSearch).
+                 Only available with the "bitboard" and "numpy" engines, and "constrained" only with the
+                 "bitboard" one
+    - checkpoint : None by default, the file to which the state of the search (its frontier, the solutions
+                   found and the numbers of tries and pieces put) is written every checkpointInterval seconds
+                   (60 by default), when stopped by the timeout, and once solved (see Checkpoint)
+    - resume : None by default, a checkpoint file written by a previous solve() of the same puzzle with the same
+               options, from which the search goes on where it was: the solutions found before are returned
+               (but not printed) with the new ones, without being found again, and the tries and pieces put
+               are counted from the ones of the checkpoint. It can be the same file as checkpoint.
+      The checkpoint and resume options are only available with the "bitboard" and "numpy" engines, and the
+      search then runs on BitBoardSearch.iterSolve(), so that metrics does not time its branches
+    - cacheDir : None by default, a directory in which the placements of the pieces on the board are
+                 compiled once to a file named by the content hash of the puzzle, read back by the next
+                 solves of the same puzzle instead of being computed again (see CompiledBitBoard).
+                 Only used by the "bitboard" and "numpy" engines
       The solve() method returns a tuple containing:
           - The solutions as list of Board objects
           - The number of tries used (tries to put a piece on a square)
           - The number of pieces successfully put on the puzzle board
+    The count() method takes the sides, prune, timeout, checkInterval, memo and cacheDir options, and only counts
+    the solutions with the "bitboard" engine, without building nor printing them, and returns a tuple
+    containing the number of solutions (found before the timeout), the number of tries and the
+    number of pieces put. With a TranspositionCache given as memo, the number of solutions from each
+    board is recorded, and reused when the board is found again.
+    The numbers of tries and pieces put returned by solve() and count() are the ones of all the calls of
+    both methods on the solver.
+    The iterSolutions() generator takes the same options, except findAll, printSol, engine and metrics,
+    and solves with the "bitboard" engine, yielding each solution as soon as it is found, encoded by
+    BitBoard.encode() as one byte per available square (see decode()), so that solutions are not kept
+    in memory. The caller can stop at any time, and the numbers of tries and pieces put are then
+    in the tries and nbPcsPut attributes.
     """
     def __init__(self,board,pieces):
         self._board = board
         self._pieces = pieces
         self._sides = "front"
         self._nbPieces = len(self._pieces)
+        self._allPieces = (1 << self._nbPieces)-1
+        self._shapes = None
+        self._pruner = None
+        self._deadline = None
+        self._checkInterval = 1024
         self._startTime = None
         self._nbTries = 0
         self._nbPcsPut = 0
@@ -31,47 +94,168 @@ class PuzzleSolver():
         self._stop = False
         self._print=True
         
-    def solve(self,findAll=False,printSol=True,sides="front"):
+    def solve(self,findAll=False,printSol=True,sides="front",engine="board",prune=False,timeout=None,checkInterval=1024,symmetry=None,metrics=None,memo=None,strategy="first",checkpoint=None,checkpointInterval=60,resume=None,cacheDir=None):
         self._findAll = findAll
         self._print = printSol
         self._sides = sides       
         solutions = []
         self._startTime = datetime.now()
-        solutions=self._solve(self._board,self._pieces,solutions)
+        self._checkInterval = checkInterval
+        self._deadline = None
+        if timeout is not None:
+            self._deadline = monotonic()+timeout
+        checkpointed = checkpoint is not None or resume is not None
+        if engine in ("bitboard","numpy"):
+            bitboard = bitBoard(self._board,orderPieces(self._board,self._pieces,self._sides,strategy),self._sides,symmetry,cacheDir)
+            search = newSearch(bitboard,engine,strategy,metrics,self._findAll,self._print,self._startTime,prune=prune,checkInterval=checkInterval)
+            if metrics is not None:
+                metrics.start()
+            if self._deadline is not None:
+                search.stopCheck = lambda: monotonic() >= self._deadline
+            search.memo = memo
+            if checkpointed:
+                solutions = self._checkpointedSolve(search,fingerprint(bitboard,prune,engine,strategy == "constrained"),checkpoint,checkpointInterval,resume)
+            else:
+                solutions = search.solve()
+            if metrics is not None:
+                metrics.end(len(solutions))
+            self._nbTries += search.tries
+            self._nbPcsPut += search.nbPcsPut
+        elif engine == "board":
+            if symmetry is not None:
+                raise ValueError("The symmetry option requires the bitboard engine")
+            if metrics is not None:
+                raise ValueError("The metrics option requires the bitboard engine")
+            if strategy != "first":
+                raise ValueError("The strategy option requires the bitboard or numpy engine")
+            if memo is not None or checkpointed:
+                raise ValueError("The memo, checkpoint and resume options require the bitboard or numpy engine")
+            self._shapes = [piece.shapes(self._sides) for piece in self._pieces]
+            if prune and RegionPruner.isRelevant(self._pieces,len(self._board.availablePositions())):
+                self._pruner = RegionPruner(self._pieces)
+            solutions=self._solve(Board(self._board),0,solutions)
+        else:
+            raise ValueError("Unknown solving engine '{}'".format(engine))
         return solutions,self._nbTries,self._nbPcsPut
+
+    def count(self,sides="front",prune=False,timeout=None,checkInterval=1024,memo=None,cacheDir=None):
+        self._sides = sides
+        search = BitBoardSearch(bitBoard(self._board,self._pieces,self._sides,None,cacheDir),prune=prune,checkInterval=checkInterval)
+        if timeout is not None:
+            deadline = monotonic()+timeout
+            search.stopCheck = lambda: monotonic() >= deadline
+        search.memo = memo
+        nbSolutions = search.count()
+        self._nbTries += search.tries
+        self._nbPcsPut += search.nbPcsPut
+        return nbSolutions,self._nbTries,self._nbPcsPut
+
+    def iterSolutions(self,sides="front",prune=False,timeout=None,checkInterval=1024,symmetry=None,cacheDir=None):
+        self._sides = sides
+        self._bitboard = bitBoard(self._board,self._pieces,self._sides,symmetry,cacheDir)
+        search = BitBoardSearch(self._bitboard,True,False,prune=prune,checkInterval=checkInterval)
+        if timeout is not None:
+            deadline = monotonic()+timeout
+            search.stopCheck = lambda: monotonic() >= deadline
+        self.tries = 0
+        self.nbPcsPut = 0
+        try:
+            for solution in search.iterSolve():
+                self.tries = search.tries
+                self.nbPcsPut = search.nbPcsPut
+                yield solution
+        finally:
+            self.tries = search.tries
+            self.nbPcsPut = search.nbPcsPut
+
+    def _checkpointedSolve(self,search,searchFingerprint,checkpoint,checkpointInterval,resume):
+        """
+        Run search with BitBoardSearch.iterSolve(), resuming it from the resume checkpoint file if given, and
+        writing its state to the checkpoint file if given, and return the list of Board of its solutions
+        """
+        bitboard = search.bitboard
+        state = Checkpoint(searchFingerprint,len(bitboard.positions))
+        if resume is not None:
+            saved = Checkpoint.load(resume)
+            if saved.fingerprint != state.fingerprint:
+                raise ValueError("'{}' is not a checkpoint of this search".format(resume))
+            state = saved
+            search.tries = state.tries
+            search.nbPcsPut = state.nbPcsPut
+            search.restoreSolutions(state.solutions)
+        solutions = [bitboard.decode(solution) for solution in state.solutions]
+        nextSave = monotonic()+checkpointInterval
+        def save(frontier,tries,nbPcsPut,stop):
+            nonlocal nextSave
+            if checkpoint is not None and (stop or monotonic() >= nextSave):
+                state.frontiers[()] = frontier
+                state.tries = tries
+                state.nbPcsPut = nbPcsPut
+                state.save(checkpoint)
+                nextSave = monotonic()+checkpointInterval
+        search.checkpoint = save
+        if () in state.done:
+            return solutions
+        for solution in search.iterSolve(resume=state.frontiers.get(())):
+            state.solutions.append(solution)
+            solutions.append(bitboard.decode(solution))
+            if self._print:
+                print("\nSolution found in {} after testing {} combinations and putting {} pieces:".format(str(datetime.now()-self._startTime)[:-7],search.tries,search.nbPcsPut))
+                print(solutions[-1],flush=True)
+            if not self._findAll:
+                break
+        if self._findAll and not search.stop:
+            state.done.add(())
+            state.tries = search.tries
+            state.nbPcsPut = search.nbPcsPut
+            if checkpoint is not None:
+                state.save(checkpoint)
+        return solutions
+
+    def decode(self,solution):
+        """
+        Return the Board of a solution yielded by iterSolutions()
+        """
+        return self._bitboard.decode(solution)
         
-    def _solve(self,board,pieces,solutions):
-        nbPcs = len(pieces)
-        if nbPcs:
+    def _solve(self,board,used,solutions):
+        """
+        Recursively put the pieces not set in the used mask on the first available square of board
+        Pieces are put and removed in place on a single board, using the squares precomputed by
+        Piece.shapes(), so neither the board nor the pieces are copied until a solution is found
+        """
+        if used != self._allPieces:
             pos = board.nextAvailablePos()
-            for piece in pieces:
-                for origin in range(len(piece)):
-                    piece.setOrigin(origin)
-                    relTrans = piece.relevantTrans()
-                    for trans in relTrans:
-                        if nbPcs == self._nbPieces and not self._stop:
+            for pieceIdx,piece in enumerate(self._pieces):
+                pieceBit = 1 << pieceIdx
+                if used & pieceBit:
+                    continue
+                relTrans = piece.relevantTrans()
+                for origin,shapes in enumerate(self._shapes[pieceIdx]):
+                    for transIdx,squares in enumerate(shapes):
+                        if not used and not self._stop:
                             execDuration = str(datetime.now()-self._startTime)
                             if execDuration.rfind('.') != -1:
                                 execDuration = execDuration[:execDuration.rfind('.')]
                             stdout.write("\r{0} - {1:.2f}% - {2} sol. over {3} pcs put with {4} tested combi.".format(\
                                     execDuration,\
-                                    ((pieces.index(piece)*len(piece)*len(relTrans))+(origin*len(relTrans))+relTrans.index(trans))/(nbPcs*len(piece)*len(relTrans))*100,\
+                                    ((pieceIdx*len(piece)*len(relTrans))+(origin*len(relTrans))+transIdx)/(self._nbPieces*len(piece)*len(relTrans))*100,\
                                     len(solutions),\
                                     self._nbPcsPut,
                                     self._nbTries\
                                     )\
                                 )
                             stdout.flush()
-                        if  not self._stop and ( (self._sides=="front" and trans.isFront()) or (self._sides=="back" and trans.isBack()) or self._sides=="both"):
-                            piece.transform(trans)
-                            newBoard = board.putPiece(piece,pos)
+                        if not self._stop and squares is not None:
                             self._nbTries += 1
-                            if newBoard is not None:
+                            if self._deadline is not None and not self._nbTries % self._checkInterval and monotonic() >= self._deadline:
+                                self._stop = True
+                            elif board.fillSquares(piece.name,pos,squares):
                                 self._nbPcsPut += 1
-                                newPieces=deepcopy(pieces)
-                                newPieces.remove(piece)
-                                solutions=self._solve(newBoard,newPieces,solutions)
-            if nbPcs == self._nbPieces:
+                                if self._pruner is None or not self._pruner.isDead(board.emptyRegionSizes(),self._allPieces & ~(used | pieceBit)):
+                                    solutions=self._solve(board,used | pieceBit,solutions)
+                                board.clearSquares(pos,squares)
+            if not used:
                     print("\n")#to cleanely end same line print above
         else:
             if self._print == True:
@@ -79,5 +263,5 @@ class PuzzleSolver():
                 print(board,flush=True)
             if not self._findAll:
                 self._stop = True
-            solutions.append(board)
-        return solutions
\ No newline at end of file
+            solutions.append(Board(board))
+        return solutions
@@ -0,0 +1,90 @@
+from puzzle import Coordinate, Trans
+
+class BoardSymmetry():
+    """
+    This class finds the symmetries of a board, to search only once each class of solutions
+    which are the same once the board is rotated or flipped
+    A symmetry is a transformation moving the available squares of the board onto themselves,
+    and is kept as the permutation of the square numbers of a PlacementIndex it gives.
+    Flipping the board also flips the pieces, so flipping symmetries are only used when the pieces
+    can be put on both sides.
+    The search of each class of solutions is done only once by keeping, for one piece, only one
+    placement among each set of placements moved onto each other by the symmetries (the one with
+    the smallest mask): any solution can be moved by a symmetry to put this piece on a kept placement.
+    The piece is chosen with the most orientations, which makes this exact when it has no symmetry
+    itself, otherwise the solutions found twice are recognized with key().
+    - symmetries is the list of (Trans, permutation) of the board symmetries, except the identity
+    - piece is the number of the piece whose placements are restricted
+    """
+    def __init__(self,index,sides="front"):
+        self.index = index
+        self.symmetries = []
+        cells = [(pos.x,pos.y) for pos in index.positions]
+        minX = min(x for x,y in cells)
+        minY = min(y for x,y in cells)
+        for trans in Trans:
+            if trans == Trans.UpFront or (sides != "both" and not trans.isFront()):
+                continue
+            moved = [trans.apply(x,y) for x,y in cells]
+            dx = minX-min(x for x,y in moved)
+            dy = minY-min(y for x,y in moved)
+            permutation = []
+            for x,y in moved:
+                square = index.square(Coordinate(x+dx,y+dy))
+                if square is None:
+                    break
+                permutation.append(square)
+            else:
+                self.symmetries.append((trans,permutation))
+        self.piece = max(range(len(index.pieces)),key=lambda pieceIdx: (len([trans for trans in index.pieces[pieceIdx].relevantTrans() if trans.isOnSide(sides)]),-pieceIdx))
+
+    def __len__(self):
+        """
+        Return the number of symmetries of the board, including the identity
+        """
+        return len(self.symmetries)+1
+
+    def moveMask(self,mask,permutation):
+        """
+        Return the mask of the squares of mask moved by a symmetry permutation
+        """
+        ret = 0
+        while mask:
+            bit = mask & -mask
+            ret |= 1 << permutation[bit.bit_length()-1]
+            mask ^= bit
+        return ret
+
+    def isKept(self,mask):
+        """
+        Tell if the placement of mask is the one kept among the placements moved onto each other by the symmetries
+        """
+        return all(mask <= self.moveMask(mask,permutation) for trans,permutation in self.symmetries)
+
+    def restrict(self,placements):
+        """
+        Return the placements of a BitBoard (placements[square][pieceIdx] list of (mask,trans,origin)),
+        where only the kept placements of the restricted piece are left
+        """
+        return [[[placement for placement in masks if pieceIdx != self.piece or self.isKept(placement[0])] for pieceIdx,masks in enumerate(square)] for square in placements]
+
+    def images(self,placed):
+        """
+        Return the list of the distinct solutions obtained by moving the solution placed, list of
+        (pieceIdx,mask), with all the board symmetries, starting with placed itself
+        """
+        ret = [list(placed)]
+        seen = set([tuple(sorted(placed))])
+        for trans,permutation in self.symmetries:
+            image = [(pieceIdx,self.moveMask(mask,permutation)) for pieceIdx,mask in placed]
+            key = tuple(sorted(image))
+            if key not in seen:
+                seen.add(key)
+                ret.append(image)
+        return ret
+
+    def key(self,placed):
+        """
+        Return a key identifying the class of the solution placed, the same for all its images
+        """
+        return min(tuple(sorted(image)) for image in self.images(placed))
@@ -0,0 +1,38 @@
+from datetime import date
+from puzzle import Vector, Trans, Piece, Board, Coordinate
+from solver import PuzzleSolver
+from alldates import AllDatesSolver
+from batchsolver import solveAllDates, dateGroups
+from encoding import encodeSolutions
+import dragonFjordDailyCalendarSolver
+
+def testSolve():
+    A = Piece(shape=[Vector(0,1),Vector(1,0)],name="A")
+    B = Piece(shape=[],name="B")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    print("===== Solving a 3x2 board leaving one square of each line uncovered")
+    groups = [[Coordinate(x,0) for x in range(3)],[Coordinate(x,1) for x in range(3)]]
+    solutions = AllDatesSolver(puzzle,[A,B],groups).solve(sides="both",printProgress=False)
+    for holes,encoded in solutions.items():
+        datePuzzle = puzzle.putSquares("D",[Coordinate(x,y) for x,y in holes])
+        refSolutions,tries,nbPcsPut = PuzzleSolver(datePuzzle,[A,B]).solve(findAll=True,printSol=False,sides="both")
+        assert sorted(encoded) == sorted(encodeSolutions(datePuzzle,[A,B],[sol]) for sol in refSolutions)
+    # Uncovered squares in the middle column leave no room for the L piece
+    assert ((1,0),(1,1)) not in solutions
+    assert len(solutions[((0,0),(0,1))]) == 4
+
+def testSolveCalendar():
+    print("===== Solving all dates of Dragon Fjord puzzle at once")
+    board,groups = dateGroups("dragonFjord")
+    assert [len(group) for group in groups] == [12,31]
+    solutions = solveAllDates("dragonFjord","front",printProgress=False)
+    assert len(solutions) == 366
+    pieces = dragonFjordDailyCalendarSolver.CreatePieces()
+    for day in (date(2024,1,1),date(2024,3,27),date(2024,12,31)):
+        datePuzzle = dragonFjordDailyCalendarSolver.GenerateBoard(day)
+        refSolutions,tries,nbPcsPut = PuzzleSolver(datePuzzle,pieces).solve(findAll=True,printSol=False,engine="bitboard")
+        assert sorted(solutions[day.strftime("%m/%d")]) == sorted(encodeSolutions(datePuzzle,pieces,[sol]) for sol in refSolutions)
+
+if __name__ == "__main__":
+    testSolve()
+    testSolveCalendar()
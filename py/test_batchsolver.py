@@ -0,0 +1,44 @@
+import os
+import tempfile
+from datetime import date
+from batchsolver import BatchSolver, puzzleDates
+from solver import PuzzleSolver
+from encoding import SolutionFile, decodeSolutions
+import dragonFjordDailyCalendarSolver
+
+def testDates():
+    print("===== All dates of calendar puzzles")
+    assert len(puzzleDates("dragonFjord")) == 366
+    assert len(puzzleDates("poodle")) == 366*7
+
+def testRun():
+    dates = [date(2024,2,29),date(2024,12,25)]
+    with tempfile.TemporaryDirectory() as tmpDir:
+        database = os.path.join(tmpDir,"solutions.db")
+        print("===== Solving 2 dates of Dragon Fjord puzzle in a database")
+        solver = BatchSolver("dragonFjord",database)
+        assert solver.count(dates[0]) is None
+        assert solver.run(nbProcesses=2,dates=dates[:1]) == 1
+        solver.close()
+        print("===== Resuming with the 2 dates, expecting only the second one to be solved")
+        solver = BatchSolver("dragonFjord",database)
+        assert solver.run(nbProcesses=2,dates=dates) == 1
+        assert solver.run(nbProcesses=2,dates=dates) == 0
+        for day in dates:
+            refSolutions,tries,nbPcsPut = PuzzleSolver(dragonFjordDailyCalendarSolver.GenerateBoard(day),dragonFjordDailyCalendarSolver.CreatePieces()).solve(findAll=True,printSol=False,engine="bitboard")
+            assert solver.count(day) == len(refSolutions)
+            assert [str(sol) for sol in solver.solutions(day)] == [str(sol) for sol in refSolutions]
+        print("===== Exporting the 2 dates to a solutions file")
+        solutionFile = os.path.join(tmpDir,"solutions.bin")
+        assert solver.export(solutionFile) == 2
+        with SolutionFile(solutionFile) as solutions:
+            assert solutions.keys() == ["02/29","12/25"]
+            for day in dates:
+                board = dragonFjordDailyCalendarSolver.GenerateBoard(day)
+                encoded = solutions.solutions(day.strftime("%m/%d"))
+                assert [str(sol) for sol in decodeSolutions(board,dragonFjordDailyCalendarSolver.CreatePieces(),b"".join(encoded))] == [str(sol) for sol in solver.solutions(day)]
+        solver.close()
+
+if __name__ == "__main__":
+    testDates()
+    testRun()
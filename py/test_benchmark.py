@@ -0,0 +1,51 @@
+import os
+import tempfile
+from benchmark import benchmarkCases, runCase, runBenchmarks, compareResults, writeResults, readResults
+
+def testCases():
+    print("===== Benchmark cases")
+    cases = benchmarkCases()
+    # 3 dates of 3 calendar puzzles and HEMA, with 7 solvers and modes
+    assert len(cases) == 70
+    assert len(set((case["puzzle"],case["date"],case["solver"],case["mode"]) for case in cases)) == 70
+    cases = benchmarkCases(["hema","poodle"],["dlx"],["all"])
+    assert [(case["puzzle"],case["solver"],case["mode"]) for case in cases] == [("poodle","dlx","all")]*3+[("hema","dlx","all")]
+
+def testRun():
+    case = benchmarkCases(["dragonFjord"],["puzzle"],["first"])[0]
+    print("===== Benchmark of {}".format(case))
+    result = runCase(case,2)
+    print(result)
+    assert result["name"] == "dragonFjord 2024-01-01 puzzle first"
+    assert result["solutions"] == 1
+    assert result["tries"] > 0
+    assert result["time"] > 0
+    print("===== Peak memory of the run only, not of the benchmark process")
+    ballast = b"x"*(256 << 20)
+    result = runCase(case)
+    del ballast
+    assert result["peakMemoryKB"] is None or result["peakMemoryKB"] < 256 << 10
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory,"results.json")
+        results = runBenchmarks([case],verbose=False)
+        writeResults(path,results)
+        assert readResults(path) == results
+
+def testCompare():
+    print("===== Comparing results with a baseline")
+    baseline = {"results":[{"name":"a","solutions":2,"time":1.0,"tries":100,"peakMemoryKB":1000},
+                           {"name":"b","solutions":1,"time":0.01,"tries":10,"peakMemoryKB":None}]}
+    results = {"results":[{"name":"a","solutions":2,"time":1.1,"tries":100,"peakMemoryKB":1300},
+                          {"name":"b","solutions":0,"time":0.05,"tries":20,"peakMemoryKB":1000},
+                          {"name":"c","solutions":1,"time":5.0,"tries":10,"peakMemoryKB":1000}]}
+    regressions = compareResults(results,baseline,0.2)
+    print(regressions)
+    # b is too fast to compare its time, and c is not in the baseline
+    assert [(regression["name"],regression["measure"]) for regression in regressions] == [("a","peakMemoryKB"),("b","solutions"),("b","tries")]
+    assert [(regression["name"],regression["measure"]) for regression in compareResults(results,baseline,0.05)][0] == ("a","time")
+    assert compareResults(baseline,baseline) == []
+
+if __name__ == "__main__":
+    testCases()
+    testRun()
+    testCompare()
@@ -0,0 +1,94 @@
+from puzzle import Vector, Trans, Piece, Board
+from bitboard import BitBoard, BitBoardSearch
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+
+def createPuzzle():
+    A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
+    B = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="B")
+    C = Piece(shape=[],name="C")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    return puzzle,[A,B,C]
+
+def testMasks():
+    puzzle,pieces = createPuzzle()
+    bitboard = BitBoard(puzzle,pieces)
+    print("===== BitBoard of 9 squares")
+    assert bitboard.full == 0b111111111
+    # The single square piece fits everywhere, once
+    assert [len(placements[2]) for placements in bitboard.placements] == [1]*9
+    # Nothing but the single square piece can start on the bottom right square
+    assert bitboard.placements[8][0] == []
+    assert bitboard.placements[8][2] == [(1 << 8,Trans.UpFront,0)]
+
+def testSolve():
+    puzzle,pieces = createPuzzle()
+    for sides,expected in (("front",4),("both",8)):
+        print("===== BitBoard solving with 3 pieces, sides {}, expecting {} solutions".format(sides,expected))
+        solutions,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides=sides,engine="bitboard")
+        refSolutions,refTries,refPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides=sides)
+        assert len(solutions) == expected
+        assert [str(sol) for sol in solutions] == [str(sol) for sol in refSolutions]
+        assert nbPcsPut == refPcsPut
+        assert nbTries <= refTries
+
+def testSolveFirst():
+    puzzle,pieces = createPuzzle()
+    search = BitBoardSearch(BitBoard(puzzle,pieces),findAll=False,printSol=False)
+    assert len(search.solve()) == 1
+
+def testMultiThreadSolve():
+    puzzle,pieces = createPuzzle()
+    print("===== MultiTread BitBoard solving with 3 pieces, expecting 4 solutions")
+    solutions,tries,nbPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,engine="bitboard")
+    assert len(solutions) == 4
+
+def testIterSolutions():
+    puzzle,pieces = createPuzzle()
+    print("===== Streaming the solutions with 3 pieces, sides both, expecting 8 solutions")
+    refSolutions,refTries,refPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard")
+    solver = PuzzleSolver(puzzle,pieces)
+    encoded = list(solver.iterSolutions(sides="both"))
+    assert len(encoded) == 8
+    assert all(len(solution) == 9 for solution in encoded)
+    assert [str(solver.decode(solution)) for solution in encoded] == [str(solution) for solution in refSolutions]
+    assert (solver.tries,solver.nbPcsPut) == (refTries,refPcsPut)
+    # Stopping early stops the search
+    solutions = solver.iterSolutions(sides="both")
+    next(solutions)
+    solutions.close()
+    assert solver.tries < refTries
+
+def testMultiThreadIterSolutions():
+    puzzle,pieces = createPuzzle()
+    print("===== Streaming the solutions from 2 processes, expecting 8 solutions")
+    refSolutions,refTries,refPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard")
+    solver = MultiThreadPuzzleSolver(puzzle,pieces)
+    encoded = list(solver.iterSolutions(sides="both",nbProcesses=2,splitDepth=1))
+    assert sorted(str(solver.decode(solution)) for solution in encoded) == sorted(str(solution) for solution in refSolutions)
+    assert (solver.tries,solver.nbPcsPut) == (refTries,refPcsPut)
+    for solution in solver.iterSolutions(sides="both",nbProcesses=2,splitDepth=1):
+        break
+    assert solver._processes == []
+
+def testCount():
+    puzzle,pieces = createPuzzle()
+    for sides,expected in (("front",4),("both",8)):
+        print("===== Counting the solutions with 3 pieces, sides {}, expecting {}".format(sides,expected))
+        refSolutions,refTries,refPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides=sides,engine="bitboard")
+        assert PuzzleSolver(puzzle,pieces).count(sides=sides) == (expected,refTries,refPcsPut)
+        nbSolutions,tries,nbPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).count(sides=sides,nbProcesses=2)
+        assert (nbSolutions,tries,nbPcsPut) == (expected,refTries,refPcsPut)
+        # As solve(), count() returns the numbers of all the calls
+        solver = PuzzleSolver(puzzle,pieces)
+        solver.solve(findAll=True,printSol=False,sides=sides,engine="bitboard")
+        assert solver.count(sides=sides) == (expected,2*refTries,2*refPcsPut)
+
+if __name__ == "__main__":
+    testMasks()
+    testSolve()
+    testSolveFirst()
+    testMultiThreadSolve()
+    testIterSolutions()
+    testMultiThreadIterSolutions()
+    testCount()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+from datetime import date
+from bitboard import BitBoard
+from ordering import newSearch
+from numpysearch import np
+from transposition import TranspositionCache
+from checkpoint import Checkpoint
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+from poodlepuzzleDailyCalendarSolver import GenerateBoard, CreatePieces
+from hemapuzzleSolver import GenerateHemaBoard, CreateHemaPieces
+
+def testSaveLoad():
+    print("===== Checkpoint written and read back")
+    state = Checkpoint(b"x"*32,3)
+    state.frontiers[((1,2),(0,5))] = [3,1,4]
+    state.frontiers[((2,0),)] = [7]
+    state.done.add(((0,0),))
+    state.solutions = [b"abc",b"def"]
+    state.tries = 1 << 40
+    state.nbPcsPut = 12
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory,"search.ckpt")
+        state.save(path)
+        loaded = Checkpoint.load(path)
+    assert loaded.fingerprint == state.fingerprint
+    assert loaded.frontiers == state.frontiers
+    assert loaded.done == state.done
+    assert loaded.solutions == state.solutions
+    assert (loaded.tries,loaded.nbPcsPut) == (state.tries,state.nbPcsPut)
+
+def testResumeSearch():
+    bitboard = BitBoard(GenerateHemaBoard(),CreateHemaPieces(),"front","classes")
+    # The other searches only override the steps of the first one, so they are resumed from one frontier only
+    for engine,strategy,memo in (("bitboard","first",False),("numpy","first",False),("bitboard","constrained",False),("bitboard","first",True)):
+        if engine == "numpy" and np is None:
+            continue
+        print("===== {} search with {} strategy and memo {} resumed from its frontiers".format(engine,strategy,memo))
+        def newResumable(checkInterval=1024):
+            search = newSearch(bitboard,engine,strategy,None,True,False,prune=True,checkInterval=checkInterval)
+            if memo:
+                search.memo = TranspositionCache()
+            return search
+        search = newResumable(20000)
+        frontiers = []
+        solutions = []
+        search.checkpoint = lambda frontier,tries,nbPcsPut,stop: frontiers.append((frontier,tries,nbPcsPut,len(solutions)))
+        for solution in search.iterSolve():
+            solutions.append(solution)
+        print("{} solutions, {} frontiers".format(len(solutions),len(frontiers)))
+        assert len(frontiers) > 10
+        resumes = frontiers[::len(frontiers)//5] if (engine,strategy,memo) == ("bitboard","first",False) else frontiers[len(frontiers)//2:][:1]
+        for frontier,tries,nbPcsPut,nbSol in resumes:
+            resumed = newResumable()
+            resumed.tries = tries
+            resumed.nbPcsPut = nbPcsPut
+            resumed.restoreSolutions(solutions[:nbSol])
+            assert list(resumed.iterSolve(resume=frontier)) == solutions[nbSol:]
+            if not memo:
+                assert (resumed.tries,resumed.nbPcsPut) == (search.tries,search.nbPcsPut)
+
+def resumeUntilSolved(solve,path,nbTries):
+    """
+    Call solve() with a short timeout, resuming from path, until it has made the nbTries tries of
+    the full search, and return its last result
+    """
+    result = solve(None)
+    for run in range(100):
+        if result[1] == nbTries:
+            break
+        result = solve(path)
+    return result
+
+def testSolverResume():
+    board,pieces = GenerateBoard(date(2024,3,5)),CreatePieces()
+    expected,nbTries,nbPcsPut = PuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True)
+    expected = sorted(str(solution) for solution in expected)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory,"search.ckpt")
+        print("===== Solving in several runs stopped by a timeout")
+        solve = lambda resume: PuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True,timeout=0.05,checkpoint=path,checkpointInterval=0.01,resume=resume)
+        solutions,tries,put = resumeUntilSolved(solve,path,nbTries)
+        assert sorted(str(solution) for solution in solutions) == expected
+        assert (tries,put) == (nbTries,nbPcsPut)
+        # Resuming a solved search returns its solutions at once
+        solutions,tries,put = PuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True,resume=path)
+        assert len(solutions) == len(expected)
+        assert tries == nbTries
+        print("===== Solving on 2 processes in several runs stopped by a timeout")
+        os.remove(path)
+        solve = lambda resume: MultiThreadPuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True,nbProcesses=2,timeout=0.1,checkpoint=path,checkpointInterval=0.02,resume=resume)
+        solutions,tries,put = resumeUntilSolved(solve,path,nbTries)
+        assert sorted(str(solution) for solution in solutions) == expected
+        assert Checkpoint.load(path).tries == nbTries
+        try:
+            PuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",resume=path)
+            assert False
+        except ValueError:
+            pass
+        try:
+            PuzzleSolver(board,pieces).solve(printSol=False,checkpoint=path)
+            assert False
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    testSaveLoad()
+    testResumeSearch()
+    testSolverResume()
@@ -0,0 +1,93 @@
+import os
+import pickle
+import tempfile
+import timeit
+from datetime import date
+from bitboard import BitBoard
+from compiledpuzzle import CompiledBitBoard, compilePuzzle, compileKey
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+from puzzle import Vector, Piece, Board
+from poodlepuzzleDailyCalendarSolver import GenerateBoard, CreatePieces
+
+def testCompile():
+    board,pieces = GenerateBoard(date(2024,3,5)),CreatePieces()
+    with tempfile.TemporaryDirectory() as directory:
+        print("===== Compiled puzzle giving the same BitBoard")
+        for sides,symmetry in (("front",None),("both",None),("both","classes")):
+            bitboard = BitBoard(board,pieces,sides,symmetry)
+            compiled = CompiledBitBoard(board,pieces,sides,symmetry,directory)
+            assert compiled.index.allPlacements() == bitboard.index.allPlacements()
+            assert compiled.positions == bitboard.positions
+            assert compiled.neighbours == bitboard.neighbours
+            assert compiled.placements == bitboard.placements
+            assert compiled.candidates == bitboard.candidates
+        print("===== Compiled once per puzzle definition, shared by the same date of another year")
+        path = compilePuzzle(board,pieces,"both",directory)
+        modified = os.path.getmtime(path)
+        assert compilePuzzle(GenerateBoard(date(2019,3,5)),CreatePieces(),"both",directory) == path
+        assert os.path.getmtime(path) == modified
+        assert compileKey(GenerateBoard(date(2024,3,6)),pieces,"both") != compileKey(board,pieces,"both")
+        assert compileKey(board,pieces,"front") != compileKey(board,pieces,"both")
+        assert len(os.listdir(directory)) == 2
+        print("===== Compiled puzzle of more than 64 squares")
+        pieces = [Piece(shape=[Vector(0,1)]*length,name=name) for name,length in (("A",21),("B",21),("C",10),("D",10))]
+        border = [[0]*45]*21
+        board = Board(border+[[0]*21+[None]*3+[0]*21 for y in range(22)]+border)
+        for symmetry in (None,"classes"):
+            bitboard = BitBoard(board,pieces,"both",symmetry)
+            compiled = CompiledBitBoard(board,pieces,"both",symmetry,directory)
+            assert len(compiled.positions) == 66
+            assert compiled.index.allPlacements() == bitboard.index.allPlacements()
+            assert (compiled.neighbours,compiled.placements,compiled.candidates,compiled.candidateEnds) == (bitboard.neighbours,bitboard.placements,bitboard.candidates,bitboard.candidateEnds)
+
+def testPickle():
+    print("===== CompiledBitBoard pickled as its compiled file")
+    board,pieces = GenerateBoard(date(2024,3,5)),CreatePieces()
+    with tempfile.TemporaryDirectory() as directory:
+        compiled = CompiledBitBoard(board,pieces,"both","all",directory)
+        data = pickle.dumps(compiled)
+        assert len(data) < len(pickle.dumps(BitBoard(board,pieces,"both","all")))//5
+        loaded = pickle.loads(data)
+        assert loaded.candidates == compiled.candidates
+        assert loaded.expandSymmetry
+        # Compiled again if the file is not there
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory,name))
+        assert pickle.loads(data).candidates == compiled.candidates
+
+def testLoadTime():
+    board,pieces = GenerateBoard(date(2024,3,5)),CreatePieces()
+    with tempfile.TemporaryDirectory() as directory:
+        for symmetry in (None,"all"):
+            print("===== CompiledBitBoard unpickled faster than BitBoard, symmetry {}".format(symmetry))
+            data = pickle.dumps(BitBoard(board,pieces,"both",symmetry))
+            compiledData = pickle.dumps(CompiledBitBoard(board,pieces,"both",symmetry,directory))
+            loaded = pickle.loads(compiledData)
+            # The tables are read from the file without building the Placement objects
+            assert "anchored" not in vars(loaded.index)
+            assert loaded.candidateEnds == BitBoard(board,pieces,"both",symmetry).candidateEnds
+            times = [min(timeit.repeat(lambda: pickle.loads(pickled),number=10,repeat=5)) for pickled in (data,compiledData)]
+            print("{:.2f} ms instead of {:.2f} ms".format(times[1]*100,times[0]*100))
+            assert times[1] < times[0]
+
+def testSolvers():
+    board,pieces = GenerateBoard(date(2024,3,5)),CreatePieces()
+    expected,nbTries,nbPcsPut = PuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True)
+    expected = sorted(str(solution) for solution in expected)
+    with tempfile.TemporaryDirectory() as directory:
+        print("===== Solving with the compiled puzzle, expecting {} solutions".format(len(expected)))
+        for run in range(2):
+            solutions,tries,put = PuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True,cacheDir=directory)
+            assert sorted(str(solution) for solution in solutions) == expected
+            assert (tries,put) == (nbTries,nbPcsPut)
+        solutions,tries,put = MultiThreadPuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True,nbProcesses=2,cacheDir=directory)
+        assert sorted(str(solution) for solution in solutions) == expected
+        assert PuzzleSolver(board,pieces).count(prune=True,cacheDir=directory)[0] == len(expected)
+        assert len(os.listdir(directory)) == 1
+
+if __name__ == "__main__":
+    testCompile()
+    testPickle()
+    testLoadTime()
+    testSolvers()
@@ -0,0 +1,82 @@
+import socket
+import threading
+from datetime import date
+from time import sleep
+from multiprocessing.connection import Client
+from solver import PuzzleSolver
+from distributedsolver import DistributedPuzzleSolver, runWorker
+from poodlepuzzleDailyCalendarSolver import GenerateBoard, CreatePieces
+
+AUTHKEY = b"test"
+
+def freeAddress():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1",0))
+        return sock.getsockname()
+
+def fakeWorker(address,silent,tasks):
+    """
+    Worker taking a part of the search, and then disconnecting, or sending nothing if silent
+    """
+    while True:
+        try:
+            conn = Client(address,authkey=AUTHKEY)
+            break
+        except OSError:
+            sleep(0.01)
+    conn.recv()
+    tasks.append(conn.recv()["task"])
+    if silent:
+        try:
+            while conn.recv() is not None:
+                pass
+        except EOFError:
+            pass
+    conn.close()
+
+def testSolve():
+    board,pieces = GenerateBoard(date(2024,3,5)),CreatePieces()
+    expected,nbTries,nbPcsPut = PuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True)
+    print("===== Solving with 2 local workers, expecting {} solutions".format(len(expected)))
+    solver = DistributedPuzzleSolver(board,pieces,AUTHKEY,("127.0.0.1",0))
+    solutions,tries,put = solver.solve(findAll=True,printSol=False,prune=True,nbLocalWorkers=2)
+    assert sorted(str(solution) for solution in solutions) == sorted(str(solution) for solution in expected)
+    assert (tries,put) == (nbTries,nbPcsPut)
+    assert solver.reassigned == 0
+    print("===== Solving until the first solution")
+    solutions,tries,put = solver.solve(printSol=False,prune=True,nbLocalWorkers=2)
+    assert len(solutions) == 1
+    assert tries < nbTries
+    try:
+        solver.solve(printSol=False,strategy="constrained")
+        assert False
+    except ValueError:
+        pass
+
+def testReassign():
+    board,pieces = GenerateBoard(date(2024,3,5)),CreatePieces()
+    expected,nbTries,nbPcsPut = PuzzleSolver(board,pieces).solve(findAll=True,printSol=False,engine="bitboard",prune=True)
+    print("===== Solving with a worker disconnecting and a silent worker, whose parts are given to another worker")
+    address = freeAddress()
+    tasks = []
+    threads = [threading.Thread(target=fakeWorker,args=(address,silent,tasks)) for silent in (False,True)]
+    for thread in threads:
+        thread.start()
+    def worker():
+        while len(tasks) < 2:
+            sleep(0.01)
+        runWorker(address,AUTHKEY)
+    threads.append(threading.Thread(target=worker))
+    threads[-1].start()
+    solver = DistributedPuzzleSolver(board,pieces,AUTHKEY,address)
+    solutions,tries,put = solver.solve(findAll=True,printSol=False,prune=True,workerTimeout=1)
+    for thread in threads:
+        thread.join()
+    print("{} parts of the search given to another worker".format(solver.reassigned))
+    assert solver.reassigned >= 2
+    assert sorted(str(solution) for solution in solutions) == sorted(str(solution) for solution in expected)
+    assert (tries,put) == (nbTries,nbPcsPut)
+
+if __name__ == "__main__":
+    testSolve()
+    testReassign()
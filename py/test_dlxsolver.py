@@ -0,0 +1,38 @@
+from puzzle import Vector, Trans, Piece, Board
+from solver import PuzzleSolver
+from dlxsolver import DLXPuzzleSolver
+
+def createPuzzle():
+    A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,-1)],name="A")
+    B = Piece(shape=[Vector(0,1)],name="B")
+    C = Piece(shape=[Vector(0,1),Vector(1,0)],name="C")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    return puzzle,[A,B,C]
+
+def testSolve():
+    puzzle,pieces = createPuzzle()
+    for sides in ("front","back","both"):
+        print("===== DLX solving with 3 pieces, sides {}".format(sides))
+        solutions,nbTries,nbPcsPut = DLXPuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides=sides)
+        refSolutions,refTries,refPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides=sides)
+        print("{} solutions found, expected {}".format(len(solutions),len(refSolutions)))
+        assert sorted(str(sol) for sol in solutions) == sorted(str(sol) for sol in refSolutions)
+        assert nbTries == nbPcsPut
+
+def testSolveFirst():
+    puzzle,pieces = createPuzzle()
+    print("===== DLX solving with 3 pieces, stopping at first solution")
+    solutions,nbTries,nbPcsPut = DLXPuzzleSolver(puzzle,pieces).solve(printSol=True)
+    assert len(solutions) == 1
+
+def testSolvePartial():
+    A = Piece(shape=[Vector(0,1),Vector(1,0)],name="A")
+    puzzle=Board([[0,0,0,0,0],[0,0,0,0,0],[0,0,None,None,0],[0,0,None,None,0],[0,0,0,0,0],[0,0,0,0,0]])
+    print("===== DLX solving with a piece smaller than the board, expecting 4 solutions")
+    solutions,nbTries,nbPcsPut = DLXPuzzleSolver(puzzle,[A]).solve(findAll=True,printSol=False,sides="both")
+    assert len(solutions) == 4
+
+if __name__ == "__main__":
+    testSolve()
+    testSolveFirst()
+    testSolvePartial()
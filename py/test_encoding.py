@@ -0,0 +1,61 @@
+import os
+import tempfile
+from puzzle import Vector, Piece, Board
+from solver import PuzzleSolver
+from encoding import EMPTY, encodeSolutions, decodeSolutions, writeSolutionFile, SolutionFile
+
+def createPuzzle():
+    A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
+    B = Piece(shape=[Vector(0,1)],name="B")
+    puzzle=Board([[0,0,0,0,0,0],[0,0,0,0,0,0],[0,0,None,None,0,0],[0,0,None,None,0,0],[0,0,None,None,0,0],[0,0,0,0,0,0],[0,0,0,0,0,0]])
+    return puzzle,[A,B]
+
+def testEncoding():
+    puzzle,pieces = createPuzzle()
+    solutions,tries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False)
+    print("===== Encoding {} solutions as one byte per square".format(len(solutions)))
+    encoded = encodeSolutions(puzzle,pieces,solutions)
+    assert len(encoded) == 6*len(solutions)
+    assert [str(sol) for sol in decodeSolutions(puzzle,pieces,encoded)] == [str(sol) for sol in solutions]
+    # Squares left empty
+    partial = puzzle.putSquares("B",puzzle.availablePositions()[:2])
+    assert encodeSolutions(puzzle,pieces,[partial]) == bytes([1,1]+[EMPTY]*4)
+    assert str(decodeSolutions(puzzle,pieces,bytes([1,1]+[EMPTY]*4))[0]) == str(partial)
+
+def testSolutionFile():
+    solutions = {"03/05":[b"\x00\x01\x02",b"\x02\x01\x00"],"01/10":b"","12/31 Sun":b"\x01\x01\x01"}
+    with tempfile.TemporaryDirectory() as tmpDir:
+        path = os.path.join(tmpDir,"solutions.bin")
+        print("===== Solutions file of 3 keys")
+        writeSolutionFile(path,solutions,3)
+        with SolutionFile(path) as solutionFile:
+            assert len(solutionFile) == 3
+            assert solutionFile.keys() == ["01/10","03/05","12/31 Sun"]
+            assert solutionFile.count("03/05") == 2
+            assert solutionFile.count("01/10") == 0
+            assert "03/05" in solutionFile and "02/30" not in solutionFile
+            assert solutionFile.solution("03/05",1) == b"\x02\x01\x00"
+            assert solutionFile.solutions("03/05") == solutions["03/05"]
+            assert solutionFile.solutions("12/31 Sun") == [b"\x01\x01\x01"]
+            try:
+                solutionFile.solution("03/05",2)
+                assert False
+            except IndexError:
+                pass
+            # A missing key is a KeyError for all the methods
+            for read in (solutionFile.count,solutionFile.solutions,lambda key: solutionFile.solution(key,0)):
+                try:
+                    read("02/30")
+                    assert False
+                except KeyError:
+                    pass
+        assert solutionFile._data.closed
+        try:
+            writeSolutionFile(path,{"01/01":b"\x00\x01"},3)
+            assert False
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    testEncoding()
+    testSolutionFile()
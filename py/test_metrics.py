@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+from puzzle import Vector, Piece, Board
+from metrics import SearchMetrics
+from numpysearch import np
+from transposition import TranspositionCache
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+
+def createPuzzle():
+    A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
+    B = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="B")
+    C = Piece(shape=[],name="C")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    return puzzle,[A,B,C]
+
+def testMetrics():
+    puzzle,pieces = createPuzzle()
+    events = []
+    metrics = SearchMetrics(callback=events.append,progressInterval=0)
+    print("===== Solving with metrics, expecting 8 solutions")
+    solutions,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard",prune=True,metrics=metrics,checkInterval=1)
+    summary = metrics.summary()
+    print("{} tries per depth, {} placements per depth".format(metrics.tries,metrics.placements))
+    assert len(solutions) == 8
+    assert summary["tries"] == nbTries
+    assert summary["placements"] == nbPcsPut
+    assert len(metrics.tries) == 4
+    # Pieces are put on the empty board and at depth 1 and 2, and the last depth only finds solutions
+    assert metrics.tries[3] == 0
+    assert summary["prunes"] > 0
+    # Each way to put the first piece is a branch, and all solutions are found in one of them
+    assert len(metrics.branches) == metrics.placements[0]-metrics.prunes[0]
+    assert sum(branch["solutions"] for branch in metrics.branches) == 8
+    assert sum(branch["tries"] for branch in metrics.branches) == nbTries-metrics.tries[0]
+    kinds = [event["event"] for event in events]
+    assert "progress" in kinds
+    assert kinds.count("branch") == len(metrics.branches)
+    assert kinds[-1] == "end"
+    assert events[-1]["solutions"] == 8
+
+def testJsonLines():
+    puzzle,pieces = createPuzzle()
+    with tempfile.TemporaryDirectory() as directory:
+        jsonLines = os.path.join(directory,"metrics.jsonl")
+        print("===== Metrics written as JSON lines")
+        PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,engine="bitboard",metrics=SearchMetrics(jsonLines=jsonLines))
+        with open(jsonLines) as jsonFile:
+            events = [json.loads(line) for line in jsonFile]
+        assert events[-1]["event"] == "end"
+        assert events[-1]["solutions"] == 4
+        assert events[-1]["depths"][0]["tries"] > 0
+
+def testMeteredSearches():
+    puzzle,pieces = createPuzzle()
+    expected = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard")[0]
+    expected = sorted(str(solution) for solution in expected)
+    for engine,strategy,memo in (("bitboard","constrained",None),("numpy","first",None),("bitboard","first",TranspositionCache())):
+        if engine == "numpy" and np is None:
+            continue
+        print("===== Solving with metrics, {} engine, {} strategy, memo {}".format(engine,strategy,memo is not None))
+        metrics = SearchMetrics()
+        solutions,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine=engine,prune=True,metrics=metrics,memo=memo,strategy=strategy)
+        assert sorted(str(solution) for solution in solutions) == expected
+        assert (metrics.summary()["tries"],metrics.summary()["placements"]) == (nbTries,nbPcsPut)
+        assert sum(branch["solutions"] for branch in metrics.branches) == 8
+    print("===== Solving on 2 processes with metrics and the constrained strategy")
+    metrics = SearchMetrics()
+    solutions,nbTries,nbPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard",nbProcesses=2,splitDepth=1,metrics=metrics,strategy="constrained")
+    assert sorted(str(solution) for solution in solutions) == expected
+    assert sum(branch["solutions"] for branch in metrics.branches) == 8
+
+def testMultiThreadMetrics():
+    puzzle,pieces = createPuzzle()
+    metrics = SearchMetrics()
+    print("===== Solving on 2 processes with metrics")
+    solutions,nbTries,nbPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard",nbProcesses=2,splitDepth=1,metrics=metrics)
+    assert len(solutions) == 8
+    assert len(metrics.workers) == 2
+    assert sum(worker["tries"] for worker in metrics.workers) == metrics.summary()["tries"]
+    # Each part of the search is a branch of one move
+    assert all(len(branch["branch"]) == 1 for branch in metrics.branches)
+    assert sum(branch["solutions"] for branch in metrics.branches) == 8
+    try:
+        PuzzleSolver(puzzle,pieces).solve(metrics=SearchMetrics())
+        assert False
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    testMetrics()
+    testJsonLines()
+    testMeteredSearches()
+    testMultiThreadMetrics()
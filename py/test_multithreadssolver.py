@@ -1,5 +1,6 @@
 from puzzle import Vector, Trans, Piece, Board
 from multithreadssolver  import MultiThreadPuzzleSolver
+from datetime import datetime
 
 def testSolve():
     A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
@@ -7,10 +8,42 @@ def testSolve():
     puzzle=Board([[0,0,0,0,0,0],[0,0,0,0,0,0],[0,0,None,None,0,0],[0,0,None,None,0,0],[0,0,None,None,0,0],[0,0,0,0,0,0],[0,0,0,0,0,0]])
     print("===== MultiTread Solving with 2 pieces without returning the pieces, expecting 2 solutions")
     solver=MultiThreadPuzzleSolver(puzzle,[A,B])
+    start=datetime.now()
     solutions,tries,nbPcsPut=solver.solve(findAll=True,printSol=True)
     print("{} solutions after {} tries and {} pieces put :".format(len(solutions),tries,nbPcsPut))
     for sol in solutions:
         print(sol)
+    # Results are collected as soon as processes send them
+    assert (datetime.now()-start).total_seconds() < 1
+
+def testSolvePool():
+    A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,-1)],name="A")
+    B = Piece(shape=[Vector(0,1)],name="B")
+    C = Piece(shape=[Vector(0,1),Vector(1,0)],name="C")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    print("===== MultiTread Solving with 3 pieces split in parts of the search on a pool of 2 processes, expecting 8 solutions")
+    for engine in ("board","bitboard"):
+        for splitDepth in (1,2,3):
+            solutions,tries,nbPcsPut=MultiThreadPuzzleSolver(puzzle,[A,B,C]).solve(findAll=True,printSol=False,engine=engine,nbProcesses=2,splitDepth=splitDepth)
+            print("{} solutions after {} tries and {} pieces put with {} engine splitting at depth {}".format(len(solutions),tries,nbPcsPut,engine,splitDepth))
+            assert len(solutions) == 8
+            if engine == "board":
+                assert (tries,nbPcsPut) == (352,29)
+
+def testTimeout():
+    print("===== MultiTread Solving of the poodle puzzle stopped after 0.5 second")
+    for engine in ("board","bitboard"):
+        start=datetime.now()
+        solutions,tries,nbPcsPut=MultiThreadPuzzleSolver(GenerateBoard(datetime(2023,3,27)),CreatePieces()).solve(findAll=True,printSol=False,sides="both",engine=engine,nbProcesses=2,timeout=0.5)
+        print("{} solutions found with {} engine after {} tries".format(len(solutions),engine,tries))
+        assert (datetime.now()-start).total_seconds() < 2
+        assert tries > 0
+
+def testFirstSolution():
+    print("===== MultiTread Solving of the poodle puzzle stopped at the first solution")
+    solutions,tries,nbPcsPut=MultiThreadPuzzleSolver(GenerateBoard(datetime(2023,3,27)),CreatePieces()).solve(printSol=False,sides="both",engine="bitboard",nbProcesses=4,checkInterval=1)
+    # Processes stop on the next try after the first solution, which is the only one returned
+    assert len(solutions) == 1
 
 def GenerateBoard(date):
     board = [
@@ -58,6 +91,9 @@ from datetime import datetime
 if __name__ == "__main__":
     # Simple puzzle solving test
     testSolve()
+    testSolvePool()
+    testTimeout()
+    testFirstSolution()
     # Complex Poodle puzzle daily calendar solving test
     date = datetime.strptime("06/05/2022","%d/%m/%Y")
     prettyDate = date.strftime("%A, %d %B %Y")
@@ -0,0 +1,59 @@
+from puzzle import Vector, Piece, Board
+from bitboard import BitBoard, BitBoardSearch
+from numpysearch import NumpyBitBoardSearch, np
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+
+def createPuzzle():
+    A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
+    B = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="B")
+    C = Piece(shape=[],name="C")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    return puzzle,[A,B,C]
+
+def testSolve():
+    if np is None:
+        print("===== NumPy is not installed, NumPy engine not tested")
+        return
+    puzzle,pieces = createPuzzle()
+    for sides,prune in (("front",False),("both",False),("both",True)):
+        print("===== NumPy solving with 3 pieces, sides {}, prune {}".format(sides,prune))
+        bitboard = BitBoard(puzzle,pieces,sides)
+        refSearch = BitBoardSearch(bitboard,findAll=True,printSol=False,prune=prune)
+        search = NumpyBitBoardSearch(bitboard,findAll=True,printSol=False,prune=prune)
+        assert [str(sol) for sol in search.solve()] == [str(sol) for sol in refSearch.solve()]
+        assert (search.tries,search.nbPcsPut) == (refSearch.tries,refSearch.nbPcsPut)
+    solutions,tries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="numpy")
+    assert len(solutions) == 8
+    assert len(PuzzleSolver(puzzle,pieces).solve(findAll=False,printSol=False,engine="numpy")[0]) == 1
+
+def testLongPieces():
+    if np is None:
+        print("===== NumPy is not installed, NumPy engine not tested")
+        return
+    print("===== NumPy solving with pieces covering more than 64 squares and pieces")
+    # Bars of 22 and 11 squares in a column 3 squares wide: with the 4 pieces, a bar of 22 (64 squares
+    # from its first one to its last one) needs 2 words
+    pieces = [Piece(shape=[Vector(0,1)]*length,name=name) for name,length in (("A",21),("B",21),("C",10),("D",10))]
+    border = [[0]*45]*21
+    puzzle = Board(border+[[0]*21+[None]*3+[0]*21 for y in range(22)]+border)
+    bitboard = BitBoard(puzzle,pieces,"front")
+    refSearch = BitBoardSearch(bitboard,findAll=True,printSol=False)
+    search = NumpyBitBoardSearch(bitboard,findAll=True,printSol=False)
+    assert [str(sol) for sol in search.solve()] == [str(sol) for sol in refSearch.solve()]
+    assert len(refSearch.solutions) == 12
+    assert (search.tries,search.nbPcsPut) == (refSearch.tries,refSearch.nbPcsPut)
+
+def testMultiThreadSolve():
+    if np is None:
+        print("===== NumPy is not installed, NumPy engine not tested")
+        return
+    puzzle,pieces = createPuzzle()
+    print("===== NumPy solving with 3 pieces on 2 processes")
+    solutions,tries,nbPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="numpy",nbProcesses=2)
+    assert len(solutions) == 8
+
+if __name__ == "__main__":
+    testSolve()
+    testLongPieces()
+    testMultiThreadSolve()
@@ -0,0 +1,67 @@
+from puzzle import Vector, Piece, Board
+from ordering import STRATEGIES, orderPieces, probeFitRates
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+
+def createPuzzle():
+    A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
+    B = Piece(shape=[Vector(1,0)],name="B")
+    C = Piece(shape=[Vector(0,1),Vector(1,0)],name="C")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    return puzzle,[A,B,C]
+
+def testOrderPieces():
+    puzzle,pieces = createPuzzle()
+    print("===== Pieces orders of the strategies")
+    assert [piece.name for piece in orderPieces(puzzle,pieces,"both","first")] == ["A","B","C"]
+    assert [piece.name for piece in orderPieces(puzzle,pieces,"both","largest")] == ["A","C","B"]
+    # B has 12 positions on the board, A and C 16, and A is larger
+    assert [piece.name for piece in orderPieces(puzzle,pieces,"both","rarest")] == ["B","A","C"]
+    fitRates = probeFitRates(puzzle,pieces,"both",100)
+    assert all(0 <= fitRate <= 1 for fitRate in fitRates)
+    learned = orderPieces(puzzle,pieces,"both","learned",100)
+    assert sorted(fitRates[pieces.index(piece)] for piece in learned) == [fitRates[pieces.index(piece)] for piece in learned]
+    try:
+        orderPieces(puzzle,pieces,"both","random")
+        assert False
+    except ValueError:
+        pass
+
+def testStrategies():
+    puzzle,pieces = createPuzzle()
+    expected,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard")
+    expected = sorted(str(solution) for solution in expected)
+    print("===== All strategies find the {} solutions".format(len(expected)))
+    for strategy in STRATEGIES:
+        for prune in (False,True):
+            solutions,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard",prune=prune,strategy=strategy)
+            print("{} strategy: {} tries".format(strategy,nbTries))
+            assert sorted(str(solution) for solution in solutions) == expected
+    solutions,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(printSol=False,sides="both",engine="bitboard",strategy="constrained")
+    assert str(solutions[0]) in expected
+    solutions,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard",symmetry="all",strategy="constrained")
+    assert sorted(str(solution) for solution in solutions) == expected
+    try:
+        PuzzleSolver(puzzle,pieces).solve(printSol=False,strategy="largest")
+        assert False
+    except ValueError:
+        pass
+    try:
+        PuzzleSolver(puzzle,pieces[:2]).solve(printSol=False,engine="bitboard",strategy="constrained")
+        assert False
+    except ValueError:
+        pass
+
+def testMultiThreadStrategies():
+    puzzle,pieces = createPuzzle()
+    expected,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard")
+    expected = sorted(str(solution) for solution in expected)
+    for strategy in ("rarest","constrained"):
+        print("===== Solving on 2 processes with the {} strategy".format(strategy))
+        solutions,nbTries,nbPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard",nbProcesses=2,splitDepth=1,strategy=strategy)
+        assert sorted(str(solution) for solution in solutions) == expected
+
+if __name__ == "__main__":
+    testOrderPieces()
+    testStrategies()
+    testMultiThreadStrategies()
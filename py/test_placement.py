@@ -0,0 +1,40 @@
+from puzzle import Vector, Trans, Piece, Board, Coordinate
+from placement import PlacementIndex
+
+def createPuzzle():
+    L = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="L")
+    I = Piece(shape=[Vector(1,0)],name="I")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,"D",None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    return puzzle,[L,I]
+
+def testIndex():
+    puzzle,pieces = createPuzzle()
+    index = PlacementIndex(puzzle,pieces,sides="both")
+    print("===== Placements on a 3x3 board with a date square in the middle")
+    assert len(index) == 8
+    assert index.square(Coordinate(1,1)) is None
+    assert index.square(Coordinate(2,1)) == 4
+    # The L piece only fits along the borders: 2 ways on each side of the board
+    assert len([placement for placement in index.allPlacements() if placement.piece == 0]) == 8
+    # The 2 squares piece fits on each of the 8 border pairs of squares
+    assert len([placement for placement in index.allPlacements() if placement.piece == 1]) == 8
+    for square,placements in enumerate(index.anchored):
+        for placement in placements[0]+placements[1]:
+            assert min(placement.squares) == square
+            assert placement.mask == sum(1 << sq for sq in placement.squares)
+
+def testAnchorOrigin():
+    puzzle,pieces = createPuzzle()
+    index = PlacementIndex(puzzle,pieces,sides="front")
+    print("===== Placements are put on their first square with Board.putPiece")
+    L = pieces[0]
+    for placement in index.allPlacements():
+        if placement.piece == 0:
+            L.setOrigin(placement.origin)
+            L.transform(placement.trans)
+            pos = index.positions[min(placement.squares)]
+            assert puzzle.putPiece(L,pos) is not None
+
+if __name__ == "__main__":
+    testIndex()
+    testAnchorOrigin()
@@ -0,0 +1,49 @@
+from puzzle import Vector, Trans, Piece, Board
+from pruning import RegionPruner
+from bitboard import BitBoard
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+
+def createPieces():
+    J = Piece(shape=[Vector(0,1),Vector(-1,0)],name="J")
+    L = Piece(shape=[Vector(0,1),Vector(1,0)],name="L")
+    O = Piece(shape=[Vector(0,1),Vector(1,0),Vector(0,-1)],name="O")
+    return [J,L,O]
+
+def testIsDead():
+    pruner = RegionPruner(createPieces())
+    print("===== Regions fillable by pieces of 3, 3 and 4 squares")
+    assert not pruner.isDead([10],0b111)
+    assert not pruner.isDead([3,7],0b111)
+    assert pruner.isDead([2,8],0b111)
+    assert pruner.isDead([5,5],0b111)
+    assert not pruner.isDead([4],0b100)
+    assert pruner.isDead([3],0b100)
+    assert pruner.prunes == 3
+
+def testRegionSizes():
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,"A","A","A",0,0],[0,0,None,0,None,0,0],[0,0,None,0,0,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    print("===== Regions of available squares")
+    assert sorted(puzzle.emptyRegionSizes()) == [1,2,3]
+    bitboard = BitBoard(puzzle,[])
+    assert sorted(bitboard.regionSizes(0)) == [1,2,3]
+    assert sorted(bitboard.regionSizes(0b11)) == [1,1,2]
+
+def testSolve():
+    pieces = createPieces()
+    puzzle=Board([[0,0,0,0,0,0,0,0],[0,0,0,0,0,0,0,0],[0,0,None,None,None,None,None,0,0],[0,0,None,None,None,None,None,0,0],[0,0,0,0,0,0,0,0],[0,0,0,0,0,0,0,0]])
+    for engine in ("board","bitboard"):
+        print("===== Solving with and without pruning, {} engine".format(engine))
+        solutions,nbTries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine=engine)
+        prunedSolutions,prunedTries,prunedPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine=engine,prune=True)
+        print("{} solutions found with {} tries, and with {} tries when pruning".format(len(solutions),nbTries,prunedTries))
+        assert len(solutions) > 0
+        assert [str(sol._board) for sol in prunedSolutions] == [str(sol._board) for sol in solutions]
+        assert prunedTries < nbTries
+        mtSolutions,mtTries,mtPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine=engine,prune=True)
+        assert len(mtSolutions) == len(solutions)
+
+if __name__ == "__main__":
+    testIsDead()
+    testRegionSizes()
+    testSolve()
@@ -0,0 +1,93 @@
+from copy import deepcopy
+import pickle
+import warnings
+from puzzle import Coordinate, Vector, Trans, Piece, Board, shapeOrientations
+
+
+def testOrientations():
+    print("===== Distinct orientations of pieces")
+    L = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="L")
+    O = Piece(shape=[Vector(1,0),Vector(0,1),Vector(-1,0)],name="O")
+    I = Piece(shape=[Vector(0,1),Vector(0,1)],name="I")
+    S = Piece(shape=[Vector(1,0),Vector(0,1),Vector(1,0)],name="S")
+    C = Piece(shape=[],name="C")
+    for piece,expected in ((L,8),(O,1),(I,2),(S,4),(C,1)):
+        print("{} : {} orientations, expected {}".format(piece.name,len(piece.relevantTrans()),expected))
+        assert len(piece.relevantTrans()) == expected
+        assert len(piece.orientations()) == expected
+    assert I.relevantTrans() == (Trans.UpFront,Trans.RightFront)
+    assert dict(I.orientations())[Trans.RightFront] == frozenset([(0,0),(1,0),(2,0)])
+
+def testOrientationsCache():
+    print("===== Orientations shared by identical shapes")
+    L1 = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
+    # Same shape, run through from another square
+    L2 = Piece(shape=[Vector(-1,0),Vector(0,-1),Vector(0,-1)],name="B")
+    assert L1.orientations() is L2.orientations()
+    assert shapeOrientations([(5,5),(5,6),(5,7),(6,7)]) is L1.orientations()
+    copy = deepcopy(L1)
+    assert copy.orientations() is L1.orientations()
+    assert copy._baseShape is not L1._baseShape
+    assert L1.shapes("both") is deepcopy(L1).shapes("both")
+
+def testCoordinates():
+    print("===== Interned and immutable coordinates")
+    assert Coordinate(2,3) is Coordinate(2,3)
+    assert Vector(0,1) is Vector(0,1)
+    assert Coordinate() is Coordinate(0,0)
+    assert Vector(2,3) == Coordinate(2,3) and Vector(2,3) is not Coordinate(2,3)
+    assert hash(Vector(2,3)) == hash(Coordinate(2,3))
+    assert Coordinate(2,3) != Coordinate(3,2)
+    assert Coordinate(2,3) != None
+    assert {Coordinate(1,1):"a"}[Vector(1,1)] == "a"
+    assert Coordinate(2,3).moved(Vector(1,-1)) is Coordinate(3,2)
+    try:
+        Coordinate(2,3).x = 4
+        assert False
+    except AttributeError:
+        pass
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert Coordinate(2,3).move(Vector(1,-1)) is Coordinate(3,2)
+    assert caught[0].category is DeprecationWarning
+    assert Coordinate(2,3).x == 2
+    assert deepcopy(Coordinate(2,3)) is Coordinate(2,3)
+    assert pickle.loads(pickle.dumps(Vector(-1,2))) is Vector(-1,2)
+    # A subclass interns its own instances
+    class Position(Coordinate):
+        __slots__ = ()
+    assert type(Coordinate(5,6)) is Coordinate
+    assert type(Position(5,6)) is Position and Position(5,6) is Position(5,6)
+
+def testSquares():
+    print("===== Squares read and filled at once")
+    board = Board([[0,0,0,0],[0,None,None,0],[0,None,None,0],[0,0,0,0]])
+    positions = board.availablePositions()
+    filled = board.putNames(positions,["A",None,"B","B"])
+    assert filled.squaresAt(positions) == ["A",None,"B","B"]
+    assert board.squaresAt(positions) == [None]*4
+    assert filled.putSquares("A",positions[1:2]).squaresAt(positions) == ["A","A","B","B"]
+
+def testShapesShared():
+    print("===== Transformed shapes computed once and shared by the same shapes")
+    L1 = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
+    L2 = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="B")
+    assert L1._transform(Trans.RightBack) is L2._transform(Trans.RightBack)
+    assert L1.squares(Trans.UpFront,3) == [Coordinate(-1,-2),Coordinate(-1,-1),Coordinate(-1,0),Coordinate(0,0)]
+    board = Board([[0,0,0,0,0],[0,None,None,0,0],[0,None,None,None,0],[0,None,None,None,0],[0,0,0,0,0]])
+    L1.transform(Trans.LeftFront)
+    nbPut = 0
+    for pos in board.availablePositions():
+        expected = board.putSquares("A",[pos.moved(square) for square in L1.squares(Trans.LeftFront)])
+        assert str(board.putPiece(L1,pos)) == str(expected)
+        nbPut += expected is not None
+    assert nbPut == 1
+    # The board copies don't share their squares
+    assert board.squareAt(Coordinate(0,1)) is None
+
+if __name__ == "__main__":
+    testOrientations()
+    testOrientationsCache()
+    testCoordinates()
+    testSquares()
+    testShapesShared()
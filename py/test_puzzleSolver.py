@@ -34,7 +34,32 @@ def testSolve3():
     solutions2,nbTries2,nbPcsPut2 = solver2.solve(findAll=True,printSol=False,sides="both")
     print("{} solutions found, expected 8".format(len(solutions2)))
 
+def testSolveInPlace():
+    A = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="A")
+    B = Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name="B")
+    C = Piece(shape=[],name="C")
+    puzzle=Board([[0,0,0,0,0,0,0],[0,0,0,0,0,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,None,None,None,0,0],[0,0,0,0,0,0,0],[0,0,0,0,0,0,0]])
+    print("===== Solving without modifying the board nor the pieces")
+    emptyBoard = str(puzzle)
+    solver=PuzzleSolver(puzzle,[A,B,C])
+    solutions,nbTries,nbPcsPut = solver.solve(findAll=True,printSol=False,sides="both")
+    assert str(puzzle) == emptyBoard
+    assert len(set(str(sol._board) for sol in solutions)) == 8
+    assert A._currShape is A._baseShape and A._origin == 0
+
+def testTimeout():
+    from poodlepuzzleDailyCalendarSolver import GenerateBoard, CreatePieces
+    from datetime import datetime
+    print("===== Solving the poodle puzzle stopped after 0.2 second")
+    for engine in ("board","bitboard"):
+        start=datetime.now()
+        solver=PuzzleSolver(GenerateBoard(datetime(2023,3,27)),CreatePieces())
+        solutions,nbTries,nbPcsPut = solver.solve(findAll=True,printSol=False,sides="both",engine=engine,timeout=0.2)
+        assert (datetime.now()-start).total_seconds() < 1
+
 if __name__ == "__main__":
     testSolve()
     testSolve2()
     testSolve3()
+    testSolveInPlace()
+    testTimeout()
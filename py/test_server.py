@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+import tempfile
+from datetime import date
+from server import SolutionServer
+
+# The Dragon Fjord puzzle is the fastest to solve
+PUZZLES = {"dragonFjord": ("dragonFjordDailyCalendarSolver","%m/%d",("%b","%d"))}
+# A puzzle whose solve fails, its module being missing
+BROKEN = dict(PUZZLES,broken=("noSuchPuzzleModule","%m/%d",("%b","%d")))
+
+async def queryServer(server):
+    day = date(2024,7,14)
+    print("===== 5 concurrent queries of the same date, solved once")
+    counts = await asyncio.gather(*[server.count("dragonFjord",day,"both") for idx in range(5)])
+    assert counts == [48]*5
+    assert server.solves == 1
+    assert server.coalesced == 4
+    print("===== Same board of another year, from the memory cache")
+    solutions = await server.solutions("dragonFjord",date(2023,7,14),"both",limit=3)
+    assert len(solutions) == 3
+    assert server.hits == 1
+    assert server.solves == 1
+    try:
+        await server.count("poodle",day)
+        assert False
+    except ValueError:
+        pass
+    try:
+        await server.solutions("dragonFjord",day,"both",limit=-1)
+        assert False
+    except ValueError:
+        pass
+
+def testQuery():
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory,"solutions.db")
+        server = SolutionServer(database,nbProcesses=2,puzzles=PUZZLES)
+        asyncio.run(queryServer(server))
+        server.close()
+        print("===== New server, from the disk cache")
+        server = SolutionServer(database,nbProcesses=1,puzzles=PUZZLES)
+        assert asyncio.run(server.count("dragonFjord",date(2024,7,14),"both")) == 48
+        assert server.stats()["diskHits"] == 1
+        assert server.solves == 0
+        server.close()
+
+async def httpGet(port,path):
+    reader,writer = await asyncio.open_connection("127.0.0.1",port)
+    writer.write("GET {} HTTP/1.0\r\nHost: localhost\r\n\r\n".format(path).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head,body = response.split(b"\r\n\r\n",1)
+    return int(head.split()[1]),json.loads(body)
+
+async def requestServer(server):
+    httpServer = await server.start("127.0.0.1",0)
+    port = httpServer.sockets[0].getsockname()[1]
+    print("===== HTTP requests on port {}".format(port))
+    status,body = await httpGet(port,"/dragonFjord/2024-07-14/count?sides=both")
+    assert status == 200
+    assert body["count"] == 48
+    status,body = await httpGet(port,"/dragonFjord/2024-07-14/solutions?sides=both&limit=2")
+    assert status == 200
+    assert len(body["solutions"]) == 2
+    print(body["solutions"][0])
+    assert (await httpGet(port,"/dragonFjord/2024-13-01/count"))[0] == 400
+    assert (await httpGet(port,"/poodle/2024-07-14/count"))[0] == 400
+    assert (await httpGet(port,"/dragonFjord/2024-07-14"))[0] == 404
+    assert (await httpGet(port,"/dragonFjord/2024-07-14/solutions?limit=-1"))[0] == 400
+    status,body = await httpGet(port,"/stats")
+    assert body["solves"] == 1
+    print("===== A failing solve is answered with an error")
+    status,body = await httpGet(port,"/broken/2024-07-14/count")
+    assert status == 500
+    assert "noSuchPuzzleModule" in body["error"]
+    httpServer.close()
+    await httpServer.wait_closed()
+
+def testHttp():
+    server = SolutionServer(nbProcesses=1,puzzles=BROKEN)
+    asyncio.run(requestServer(server))
+    server.close()
+
+if __name__ == "__main__":
+    testQuery()
+    testHttp()
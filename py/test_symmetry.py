@@ -0,0 +1,54 @@
+from puzzle import Vector, Trans, Piece, Board
+from placement import PlacementIndex
+from symmetry import BoardSymmetry
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+
+def createBoard(width,height):
+    lines = [[0]*(width+6) for y in range(3)]
+    lines += [[0,0,0]+[None]*width+[0,0,0] for y in range(height)]
+    lines += [[0]*(width+6) for y in range(3)]
+    return Board(lines)
+
+def createLPieces():
+    return [Piece(shape=[Vector(0,1),Vector(0,1),Vector(1,0)],name=name) for name in "ABCD"]
+
+def testSymmetries():
+    pieces = createLPieces()
+    for width,height,sides,expected in ((4,4,"front",4),(4,4,"both",8),(5,4,"front",2),(5,4,"both",4)):
+        symmetry = BoardSymmetry(PlacementIndex(createBoard(width,height),pieces,sides),sides)
+        print("===== Symmetries of a {}x{} board with sides {}: {}, expected {}".format(width,height,sides,len(symmetry),expected))
+        assert len(symmetry) == expected
+    # A board with a single unavailable corner square has only one flipping symmetry
+    board = createBoard(4,4)
+    board._board[3][3] = 0
+    symmetry = BoardSymmetry(PlacementIndex(board,pieces,"both"),"both")
+    assert [trans for trans,permutation in symmetry.symmetries] == [Trans.RightBack]
+
+def testSolve():
+    pieces = createLPieces()
+    for sides,expected in (("front",18),("both",30)):
+        print("===== Solving a 4x4 board with 4 L pieces, sides {}, expecting {} classes of solutions".format(sides,expected))
+        refSolutions,refTries,refPcsPut = PuzzleSolver(createBoard(4,4),pieces).solve(findAll=True,printSol=False,sides=sides,engine="bitboard")
+        classes,tries,nbPcsPut = PuzzleSolver(createBoard(4,4),pieces).solve(findAll=True,printSol=False,sides=sides,engine="bitboard",symmetry="classes")
+        solutions,allTries,allPcsPut = PuzzleSolver(createBoard(4,4),pieces).solve(findAll=True,printSol=False,sides=sides,engine="bitboard",symmetry="all")
+        print("{} classes after {} tries, {} solutions after {} tries without symmetry".format(len(classes),tries,len(refSolutions),refTries))
+        assert len(classes) == expected
+        assert tries < refTries
+        assert sorted(str(solution) for solution in solutions) == sorted(str(solution) for solution in refSolutions)
+
+def testMultiThreadSolve():
+    pieces = createLPieces()
+    print("===== Solving a 4x4 board with 4 L pieces on 2 processes, expecting 30 classes of solutions")
+    classes,tries,nbPcsPut = MultiThreadPuzzleSolver(createBoard(4,4),pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard",nbProcesses=2,symmetry="classes")
+    assert len(classes) == 30
+    try:
+        PuzzleSolver(createBoard(4,4),pieces).solve(symmetry="classes")
+        assert False
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    testSymmetries()
+    testSolve()
+    testMultiThreadSolve()
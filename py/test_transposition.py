@@ -0,0 +1,96 @@
+from datetime import date
+from puzzle import Vector, Piece, Board
+from transposition import TranspositionCache
+from solver import PuzzleSolver
+from multithreadssolver import MultiThreadPuzzleSolver
+from poodlepuzzleDailyCalendarSolver import GenerateBoard, CreatePieces
+
+def createPuzzle():
+    # Two pairs of identical pieces fill the same squares in several orders
+    A = Piece(shape=[Vector(0,1)],name="A")
+    B = Piece(shape=[Vector(0,1)],name="B")
+    C = Piece(shape=[Vector(1,0)],name="C")
+    D = Piece(shape=[Vector(1,0),Vector(0,1)],name="D")
+    puzzle=Board([[0,0,0,0,0,0,0,0],[0,0,0,0,0,0,0,0],[0,0,None,None,None,0,0,0],[0,0,None,None,None,0,0,0],[0,0,None,None,None,0,0,0],[0,0,0,0,0,0,0,0],[0,0,0,0,0,0,0,0]])
+    return puzzle,[A,B,C,D]
+
+def testCache():
+    print("===== LRU transposition cache of 2 entries")
+    cache = TranspositionCache(2*TranspositionCache.ENTRY_SIZE)
+    assert cache.get(0b1,0b10) is None
+    cache.put(0b1,0b10,0)
+    cache.put(0b11,0b1,0)
+    assert cache.get(0b1,0b10) == 0
+    # The least recently used board is forgotten
+    cache.put(0b111,0,3)
+    assert len(cache) == 2
+    assert cache.get(0b11,0b1) is None
+    assert cache.get(0b111,0) == 3
+    assert cache.stats() == {"hits":2,"misses":2,"stores":3,"evictions":1,"entries":2,"hitRate":0.5}
+
+def testSolve():
+    puzzle,pieces = createPuzzle()
+    for sides in ("front","both"):
+        refSolutions,refTries,refPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides=sides,engine="bitboard")
+        memo = TranspositionCache()
+        solutions,tries,nbPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides=sides,engine="bitboard",memo=memo)
+        print("===== Solving with sides {}: {} solutions after {} tries, {} tries without transposition cache, {}".format(sides,len(solutions),tries,refTries,memo.stats()))
+        assert [str(sol) for sol in solutions] == [str(sol) for sol in refSolutions]
+        assert memo.hits > 0
+        assert tries < refTries
+    try:
+        PuzzleSolver(puzzle,pieces).solve(memo=TranspositionCache())
+        assert False
+    except ValueError:
+        pass
+
+def testMultiThreadSolve():
+    puzzle,pieces = createPuzzle()
+    refSolutions,refTries,refPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard")
+    memo = TranspositionCache()
+    print("===== Solving on 2 processes with a transposition cache")
+    solutions,tries,nbPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard",nbProcesses=2,splitDepth=1,memo=memo)
+    assert sorted(str(sol) for sol in solutions) == sorted(str(sol) for sol in refSolutions)
+    assert memo.stores > 0
+
+def testCount():
+    puzzle,pieces = createPuzzle()
+    refSolutions,refTries,refPcsPut = PuzzleSolver(puzzle,pieces).solve(findAll=True,printSol=False,sides="both",engine="bitboard")
+    memo = TranspositionCache()
+    nbSolutions,tries,nbPcsPut = PuzzleSolver(puzzle,pieces).count(sides="both",memo=memo)
+    print("===== Counting with a transposition cache: {} solutions after {} tries, {} tries without it".format(nbSolutions,tries,refTries))
+    assert nbSolutions == len(refSolutions)
+    assert tries < refTries
+    # Counting again only uses the count of the empty board
+    assert PuzzleSolver(puzzle,pieces).count(sides="both",memo=memo) == (len(refSolutions),0,0)
+    nbSolutions,tries,nbPcsPut = MultiThreadPuzzleSolver(puzzle,pieces).count(sides="both",nbProcesses=2,splitDepth=1,memo=TranspositionCache())
+    assert nbSolutions == len(refSolutions)
+
+def testReuse():
+    board,pieces = GenerateBoard(date(2024,3,5)),CreatePieces()
+    expected = PuzzleSolver(board,pieces).count(sides="both")[0]
+    memo = TranspositionCache()
+    print("===== Transposition cache reused by the search of other sides and dates")
+    nbSolutions,tries,nbPcsPut = PuzzleSolver(board,pieces).count(sides="front",memo=memo)
+    for otherBoard,sides in ((board,"both"),(GenerateBoard(date(2024,3,6)),"front")):
+        try:
+            PuzzleSolver(otherBoard,pieces).count(sides=sides,memo=memo)
+            assert False
+        except ValueError:
+            pass
+        try:
+            PuzzleSolver(otherBoard,pieces).solve(findAll=True,printSol=False,sides=sides,engine="bitboard",memo=memo)
+            assert False
+        except ValueError:
+            pass
+    # The same search still uses it, and another one once it is cleared
+    assert PuzzleSolver(board,pieces).count(sides="front",memo=memo) == (nbSolutions,0,0)
+    memo.clear()
+    assert PuzzleSolver(board,pieces).count(sides="both",memo=memo)[0] == expected
+
+if __name__ == "__main__":
+    testCache()
+    testSolve()
+    testMultiThreadSolve()
+    testCount()
+    testReuse()
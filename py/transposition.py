@@ -0,0 +1,88 @@
+from collections import OrderedDict
+
+class TranspositionCache():
+    """
+    This class remembers the boards already searched, to avoid searching them again
+    Different ways to put the pieces can fill the same squares with the same pieces, and the
+    search from there is then the same: a board is identified by the mask of its filled squares and
+    the mask of its remaining pieces, and the cache keeps the number of solutions found from it.
+    Boards from which no solution was found (dead boards) are then given up immediately when
+    found again, and when only counting solutions, the count of any board found again is reused.
+    The cache is a LRU limited to about maxMemory bytes (64 MB by default), ENTRY_SIZE bytes
+    being counted per board. The hits, misses, stores and evictions are counted, see stats().
+    The boards are only the ones of a puzzle, pieces order and options: the searches bind() the cache to
+    their fingerprint when they start, and ValueError is raised if it is used by another search until
+    it is cleared with clear().
+    """
+    # Estimated size of an entry: the key tuple with its two integers, the count and the OrderedDict links
+    ENTRY_SIZE = 256
+
+    def __init__(self,maxMemory=64*1024*1024):
+        self.maxMemory = maxMemory
+        self.maxEntries = max(1,maxMemory//self.ENTRY_SIZE)
+        self._entries = OrderedDict()
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def bind(self,fingerprint):
+        """
+        Tie the cache to the search of fingerprint (see checkpoint.fingerprint()) if it is not tied yet,
+        otherwise raise ValueError if it is tied to another search
+        """
+        if self.fingerprint is None:
+            self.fingerprint = fingerprint
+        elif fingerprint != self.fingerprint:
+            raise ValueError("The transposition cache is used by another search, clear() it first")
+
+    def clear(self):
+        """
+        Forget all the boards, so that the cache can be used by another search
+        """
+        self._entries.clear()
+        self.fingerprint = None
+
+    def get(self,occupied,remaining):
+        """
+        Return the number of solutions found from the board, or None if it is not in the cache
+        """
+        key = (occupied,remaining)
+        count = self._entries.get(key)
+        if count is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return count
+
+    def put(self,occupied,remaining,count):
+        """
+        Remember the number of solutions found from the board, forgetting the least recently used
+        board if the cache is full
+        """
+        self._entries[(occupied,remaining)] = count
+        self.stores += 1
+        if len(self._entries) > self.maxEntries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def hitRate(self):
+        lookups = self.hits+self.misses
+        return self.hits/lookups if lookups else 0
+
+    def addStats(self,stats):
+        """
+        Add the stats() of another cache (e.g. the one of a process of MultiThreadPuzzleSolver)
+        """
+        self.hits += stats["hits"]
+        self.misses += stats["misses"]
+        self.stores += stats["stores"]
+        self.evictions += stats["evictions"]
+
+    def stats(self):
+        return {"hits":self.hits,"misses":self.misses,"stores":self.stores,"evictions":self.evictions,"entries":len(self._entries),"hitRate":self.hitRate()}